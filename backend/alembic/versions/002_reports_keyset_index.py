@@ -0,0 +1,19 @@
+"""Composite index for keyset pagination on reports
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_reports_created_at_id', 'reports', ['created_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_created_at_id', table_name='reports')
@@ -0,0 +1,52 @@
+"""Ward analytics rollup table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_reports_ward_id'), 'reports', ['ward_id'], unique=False)
+    
+    op.create_table('ward_stats',
+    sa.Column('ward_id', sa.Integer(), nullable=False),
+    sa.Column('total_reports', sa.Integer(), nullable=False),
+    sa.Column('open_reports', sa.Integer(), nullable=False),
+    sa.Column('resolved_reports', sa.Integer(), nullable=False),
+    sa.Column('resolution_hours_sum', sa.Float(), nullable=False),
+    sa.Column('resolution_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['ward_id'], ['wards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ward_id')
+    )
+    
+    op.execute("""
+        INSERT INTO ward_stats (
+            ward_id, total_reports, open_reports, resolved_reports,
+            resolution_hours_sum, resolution_count, updated_at
+        )
+        SELECT
+            ward_id,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE status = 'OPEN'),
+            COUNT(*) FILTER (WHERE status IN ('RESOLVED', 'CLOSED')),
+            COALESCE(SUM(EXTRACT(epoch FROM resolved_at - created_at) / 3600)
+                FILTER (WHERE resolved_at IS NOT NULL), 0),
+            COUNT(resolved_at),
+            now()
+        FROM reports
+        WHERE ward_id IS NOT NULL
+        GROUP BY ward_id
+    """)
+
+def downgrade() -> None:
+    op.drop_table('ward_stats')
+    op.drop_index(op.f('ix_reports_ward_id'), table_name='reports')
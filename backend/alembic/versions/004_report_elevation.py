@@ -0,0 +1,20 @@
+"""Elevation sampled at report creation
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('elevation', sa.Float(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('reports', 'elevation')
@@ -0,0 +1,28 @@
+"""Reference counts for the content-addressed image store
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('stored_objects',
+    sa.Column('id', sa.String(length=96), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stored_objects_unreferenced', 'stored_objects', ['updated_at'], unique=False,
+                    postgresql_where=sa.text('ref_count <= 0'))
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_objects_unreferenced', table_name='stored_objects')
+    op.drop_table('stored_objects')
@@ -0,0 +1,22 @@
+"""Composite index for keyset pagination on a report's comments
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_comments_report_id_created_at_id', 'comments', ['report_id', 'created_at', 'id'], unique=False)
+    # Its leading column makes the composite index serve report_id lookups too
+    op.drop_index('ix_comments_report_id', table_name='comments')
+
+def downgrade() -> None:
+    op.create_index('ix_comments_report_id', 'comments', ['report_id'], unique=False)
+    op.drop_index('ix_comments_report_id_created_at_id', table_name='comments')
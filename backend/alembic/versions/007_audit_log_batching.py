@@ -0,0 +1,26 @@
+"""Idempotent audit events and keyset pagination on audit history
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('audit_logs', sa.Column('event_id', sa.String(length=32), nullable=True))
+    op.create_index('ix_audit_logs_event_id', 'audit_logs', ['event_id'], unique=True)
+    op.create_index('ix_audit_logs_report_id_created_at_id', 'audit_logs', ['report_id', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_audit_logs_report_id', table_name='audit_logs')
+
+def downgrade() -> None:
+    op.create_index('ix_audit_logs_report_id', 'audit_logs', ['report_id'], unique=False)
+    op.drop_index('ix_audit_logs_report_id_created_at_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_event_id', table_name='audit_logs')
+    op.drop_column('audit_logs', 'event_id')
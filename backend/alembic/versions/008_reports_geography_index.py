@@ -0,0 +1,23 @@
+"""GiST indexes for meters-based radius and nearest-neighbour queries on reports
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute('CREATE INDEX IF NOT EXISTS idx_reports_location ON reports USING GIST (location)')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_reports_location_geography '
+        'ON reports USING GIST ((CAST(location AS geography(GEOMETRY,4326))))'
+    )
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_reports_location_geography')
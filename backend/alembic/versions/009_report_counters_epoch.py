@@ -0,0 +1,20 @@
+"""Epoch on report counters so reconciliation and buffered deltas never double count
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('counters_epoch', sa.Integer(), server_default='0', nullable=False))
+
+def downgrade() -> None:
+    op.drop_column('reports', 'counters_epoch')
@@ -1,17 +1,25 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Union
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from config import settings
+from services.query_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, query_metrics
 
 DATABASE_URL = settings.DATABASE_URL
 
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
     pool_size=3,
     max_overflow=1,
     pool_timeout=30,
     pool_recycle=1800,
 )
+query_metrics.instrument(engine)
 
 
 SessionLocal = sessionmaker(
@@ -28,3 +36,53 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+def create_async_session_factory(url: str, **engine_options) -> async_sessionmaker:
+    # Loaded objects are serialized after the session commits, outside any greenlet, so they
+    # must not expire and trigger a lazy load there
+    return async_sessionmaker(
+        create_async_engine(async_database_url(url), **engine_options),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+AsyncSessionLocal = None
+if settings.DB_SESSION_MODE == "async":
+    AsyncSessionLocal = create_async_session_factory(
+        settings.DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+    query_metrics.instrument(AsyncSessionLocal.kw["bind"].sync_engine)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+AnySession = Union[Session, AsyncSession]
+
+# Routes that can run in either mode depend on get_session and go through run_db; in sync
+# mode it is get_db itself, so a request never opens two sessions
+get_session = get_async_db if settings.DB_SESSION_MODE == "async" else get_db
+
+async def run_db(db, fn, *args, **kwargs):
+    """Call fn(session, *args) on either session kind.
+
+    On an AsyncSession the synchronous ORM code runs through run_sync, which suspends on every
+    database round trip instead of blocking the event loop. Everything else fn does still runs on
+    the loop thread, so blocking work that is not a query (raster sampling, journal fsyncs, rate
+    limit backends) belongs outside fn, in a thread.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
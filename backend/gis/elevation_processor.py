@@ -1,17 +1,20 @@
 import rasterio
-from rasterio.mask import mask
 import numpy as np
 from pathlib import Path
 from typing import Tuple, Optional
 import geopandas as gpd
 from shapely.geometry import box
+from gis.zonal_stats import ZonalStatsEngine
+from gis.elevation_sampler import ElevationSampler
 import httpx
 import time
 
 class ElevationProcessor:
-    def __init__(self, srtm_dir: str):
+    def __init__(self, srtm_dir: str, cache_dir: Optional[str] = None):
         self.srtm_dir = Path(srtm_dir)
         self.srtm_dir.mkdir(parents=True, exist_ok=True)
+        self.zonal_stats = ZonalStatsEngine(srtm_dir, cache_dir)
+        self.sampler = ElevationSampler(srtm_dir, cache_dir)
     
     def get_elevation_from_api(self, locations: list[tuple[float, float]]) -> list[float]:
         """Fetch elevation from OpenTopodata API."""
@@ -29,22 +32,15 @@ class ElevationProcessor:
             return []
 
     def get_elevation(self, longitude: float, latitude: float) -> Optional[float]:
+        return self.sample_elevations([(longitude, latitude)])[0]
+    
+    def sample_elevations(self, points: list[tuple[float, float]]) -> list[Optional[float]]:
         try:
-            srtm_files = list(self.srtm_dir.glob("*.tif"))
-            if not srtm_files:
-                return None
-            
-            for srtm_file in srtm_files:
-                with rasterio.open(srtm_file) as src:
-                    if self._point_in_bounds(src, longitude, latitude):
-                        row, col = src.index(longitude, latitude)
-                        elevation = src.read(1)[row, col]
-                        return float(elevation) if elevation != src.nodata else None
-            
-            return None
+            elevations = self.sampler.sample(points)
         except Exception as e:
-            print(f"Error getting elevation: {e}")
-            return None
+            print(f"Error sampling elevations: {e}")
+            return [None] * len(points)
+        return [None if np.isnan(value) else float(value) for value in elevations]
     
     def calculate_slope(self, dem_array: np.ndarray, cell_size: float = 30.0) -> np.ndarray:
         dy, dx = np.gradient(dem_array, cell_size)
@@ -53,37 +49,16 @@ class ElevationProcessor:
     
     def get_ward_elevation_stats(self, ward_geometry) -> Tuple[Optional[float], Optional[float]]:
         try:
-            srtm_files = list(self.srtm_dir.glob("*.tif"))
-            if not srtm_files:
+            stats = self.zonal_stats.compute([(0, ward_geometry)], use_cache=False).get(0)
+            if not stats:
                 return None, None
-            
-            for srtm_file in srtm_files:
-                with rasterio.open(srtm_file) as src:
-                    try:
-                        out_image, out_transform = mask(src, [ward_geometry], crop=True)
-                        elevation_data = out_image[0]
-                        
-                        valid_data = elevation_data[elevation_data != src.nodata]
-                        
-                        if len(valid_data) > 0:
-                            avg_elevation = float(np.mean(valid_data))
-                            
-                            slope_data = self.calculate_slope(elevation_data)
-                            valid_slope = slope_data[elevation_data != src.nodata]
-                            avg_slope = float(np.mean(valid_slope)) if len(valid_slope) > 0 else None
-                            
-                            return avg_elevation, avg_slope
-                    except ValueError:
-                        continue
-            
-            return None, None
+            return stats["elevation_mean"], stats["slope_mean"]
         except Exception as e:
             print(f"Error calculating ward elevation stats: {e}")
             return None, None
     
-    def _point_in_bounds(self, src, longitude: float, latitude: float) -> bool:
-        bounds = src.bounds
-        return bounds.left <= longitude <= bounds.right and bounds.bottom <= latitude <= bounds.top
+    def get_all_ward_elevation_stats(self, wards: list[tuple[int, object]]) -> dict[int, Optional[dict]]:
+        return self.zonal_stats.compute(wards)
     
     def create_mock_elevation_data(self, bounds: Tuple[float, float, float, float], 
                                    output_path: str):
@@ -0,0 +1,96 @@
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+import numpy as np
+import rasterio
+from config import settings
+
+class RasterTile(NamedTuple):
+    data: np.ndarray
+    transform: object
+
+class ElevationSampler:
+    """Keeps every DEM band memory-mapped and resolves batches of points against a tile bounds index."""
+
+    def __init__(self, srtm_dir: str, cache_dir: Optional[str] = None):
+        self.srtm_dir = Path(srtm_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._index: tuple[list[RasterTile], np.ndarray] = ([], np.empty((0, 4)))
+        self._paths: list[Path] = []
+        self._source: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def sample(self, points: list[tuple[float, float]]) -> np.ndarray:
+        """Elevations for (longitude, latitude) points, NaN where no DEM covers the point."""
+        tiles, bounds = self._current_tiles()
+        coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lon, lat = coords[:, 0], coords[:, 1]
+        elevations = np.full(len(coords), np.nan)
+        remaining = np.ones(len(coords), dtype=bool)
+
+        for tile, (left, bottom, right, top) in zip(tiles, bounds):
+            inside = remaining & (lon >= left) & (lon <= right) & (lat >= bottom) & (lat <= top)
+            if not inside.any():
+                continue
+            height, width = tile.data.shape
+            cols = np.floor((lon[inside] - tile.transform.c) / tile.transform.a).astype(np.int64)
+            rows = np.floor((lat[inside] - tile.transform.f) / tile.transform.e).astype(np.int64)
+            elevations[inside] = tile.data[rows.clip(0, height - 1), cols.clip(0, width - 1)]
+            remaining &= ~inside
+
+        return elevations
+
+    def sample_one(self, longitude: float, latitude: float) -> Optional[float]:
+        value = self.sample([(longitude, latitude)])[0]
+        return None if np.isnan(value) else float(value)
+
+    def _current_tiles(self) -> tuple[list[RasterTile], np.ndarray]:
+        source_key = self._source_key()
+        if source_key != self._source:
+            with self._lock:
+                if source_key != self._source:
+                    self._load_tiles()
+                    self._source = self._source_key()
+        return self._index
+
+    def _source_key(self) -> Optional[tuple]:
+        # A few stat calls per batch: the directory catches added tiles, file mtimes catch rewrites
+        try:
+            return (os.stat(self.srtm_dir).st_mtime_ns,) + tuple(
+                os.stat(path).st_mtime_ns for path in self._paths
+            )
+        except FileNotFoundError:
+            return None
+
+    def _load_tiles(self):
+        tiles, bounds = [], []
+        self._paths = sorted(self.srtm_dir.glob("*.tif"))
+        for path in self._paths:
+            with rasterio.open(path) as src:
+                data = self._band_array(path, src)
+                tiles.append(RasterTile(data=data, transform=src.transform))
+                bounds.append((src.bounds.left, src.bounds.bottom, src.bounds.right, src.bounds.top))
+        self._index = (tiles, np.array(bounds, dtype=np.float64).reshape(-1, 4))
+
+    def _band_array(self, path: Path, src) -> np.ndarray:
+        # Nodata is stored as NaN so lookups need no per-point comparison
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self.cache_dir / f"dem_{path.stem}_{path.stat().st_mtime_ns}.npy"
+            if cache_path.exists():
+                return np.load(cache_path, mmap_mode="r")
+
+        data = np.ma.filled(src.read(1, masked=True).astype(np.float32), np.nan)
+        if cache_path is None:
+            return data
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"dem_{path.stem}_*.npy"):
+            stale.unlink()
+        tmp_path = cache_path.with_suffix(".tmp.npy")
+        np.save(tmp_path, data)
+        os.replace(tmp_path, cache_path)
+        return np.load(cache_path, mmap_mode="r")
+
+elevation_sampler = ElevationSampler(settings.SRTM_DATA_DIR, settings.RASTER_CACHE_DIR)
@@ -1,16 +1,27 @@
+from sqlalchemy import cast
 from sqlalchemy.orm import Session
-from geoalchemy2.functions import ST_Contains, ST_MakePoint, ST_Distance
+from geoalchemy2 import Geography
+from geoalchemy2.functions import ST_MakePoint, ST_Distance, ST_DWithin, ST_SetSRID
 from models.ward import Ward
 from models.report import Report
+from gis.ward_index import ward_index
 from typing import List, Optional
 
+GEOGRAPHY = Geography(srid=4326)
+
+def as_geography(location):
+    """Meters-based view of a 4326 geometry; on reports.location it matches the GiST expression index."""
+    return cast(location, GEOGRAPHY)
+
+def geography_point(longitude: float, latitude: float):
+    return as_geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326))
+
 class SpatialQueries:
     @staticmethod
     def find_ward_by_point(db: Session, longitude: float, latitude: float) -> Optional[Ward]:
-        ward = db.query(Ward).filter(
-            ST_Contains(Ward.geometry, ST_MakePoint(longitude, latitude))
-        ).first()
-        return ward
+        ward_index.ensure_loaded(db)
+        ward_id = ward_index.find_ward_id(longitude, latitude)
+        return db.get(Ward, ward_id) if ward_id is not None else None
     
     @staticmethod
     def get_reports_in_ward(db: Session, ward_id: int) -> List[Report]:
@@ -20,11 +31,9 @@ class SpatialQueries:
     @staticmethod
     def get_reports_within_radius(db: Session, longitude: float, latitude: float, 
                                   radius_meters: float) -> List[Report]:
-        from geoalchemy2.functions import ST_DWithin
-        
-        point = ST_MakePoint(longitude, latitude)
+        point = geography_point(longitude, latitude)
         reports = db.query(Report).filter(
-            ST_DWithin(Report.location, point, radius_meters)
+            ST_DWithin(as_geography(Report.location), point, radius_meters)
         ).all()
         return reports
     
@@ -37,7 +46,7 @@ class SpatialQueries:
             return None
         
         distance = db.query(
-            ST_Distance(report1.location, report2.location)
+            ST_Distance(as_geography(report1.location), as_geography(report2.location))
         ).scalar()
         
         return distance
@@ -0,0 +1,100 @@
+import math
+import time
+from typing import Optional
+import numpy as np
+import shapely
+from shapely import STRtree, wkb
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.ward import Ward
+from config import settings
+
+METERS_PER_DEGREE = 111_320.0
+
+class WardIndex:
+    """In-memory STRtree over prepared ward polygons, keyed back to ward ids.
+
+    Each process builds its own index, so ensure_loaded() fingerprints the wards table at most
+    every check_interval_seconds and rebuilds when it changed, e.g. after load_ward_boundaries
+    ran from a script or wards were loaded after an empty start.
+    """
+
+    def __init__(self, nearest_max_distance_meters: float, check_interval_seconds: float = 30.0):
+        self.nearest_max_distance_meters = nearest_max_distance_meters
+        self.check_interval_seconds = check_interval_seconds
+        self._state: Optional[tuple[STRtree, np.ndarray]] = None
+        self._version: Optional[tuple] = None
+        self._next_check = 0.0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._state is not None
+
+    @staticmethod
+    def table_version(db: Session) -> tuple:
+        count, max_id, total_area = db.query(
+            func.count(Ward.id), func.max(Ward.id), func.sum(func.ST_Area(Ward.geometry))
+        ).one()
+        return count, max_id, round(total_area or 0.0, 9)
+
+    def rebuild(self, db: Session):
+        version = self.table_version(db)
+        rows = db.query(Ward.id, func.ST_AsBinary(Ward.geometry)).all()
+        self.build([(ward_id, wkb.loads(bytes(geometry))) for ward_id, geometry in rows])
+        self._version = version
+        self._next_check = time.monotonic() + self.check_interval_seconds
+
+    def build(self, wards: list[tuple[int, object]]):
+        geometries = np.array([geometry for _, geometry in wards], dtype=object)
+        shapely.prepare(geometries)
+        tree = STRtree(geometries)
+        ward_ids = np.array([ward_id for ward_id, _ in wards], dtype=np.int64)
+
+        self._state = (tree, ward_ids)
+
+    def ensure_loaded(self, db: Session):
+        if self._state is None:
+            self.rebuild(db)
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval_seconds
+        if self.table_version(db) != self._version:
+            self.rebuild(db)
+
+    def find_ward_id(self, longitude: float, latitude: float) -> Optional[int]:
+        if self._state is None:
+            return None
+        tree, ward_ids = self._state
+        if len(ward_ids) == 0:
+            return None
+
+        matches = tree.query(shapely.Point(longitude, latitude), predicate="intersects")
+        if len(matches) > 0:
+            return int(ward_ids[min(matches)])
+        if self.nearest_max_distance_meters > 0:
+            nearest = self._nearest_within(tree, longitude, latitude)
+            if nearest is not None:
+                return int(ward_ids[nearest])
+        return None
+
+    def _nearest_within(self, tree: STRtree, longitude: float, latitude: float) -> Optional[int]:
+        # A degree of longitude shrinks with cos(latitude), so distances are measured on a local
+        # equirectangular projection in meters rather than in raw degrees
+        scale = np.array([METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6), METERS_PER_DEGREE])
+        reach_lon, reach_lat = self.nearest_max_distance_meters / scale
+        candidates = tree.query(shapely.box(
+            longitude - reach_lon, latitude - reach_lat, longitude + reach_lon, latitude + reach_lat
+        ))
+        if len(candidates) == 0:
+            return None
+
+        projected = shapely.transform(tree.geometries.take(candidates), lambda coords: coords * scale)
+        distances = shapely.distance(projected, shapely.Point(longitude * scale[0], latitude * scale[1]))
+        best = np.lexsort((candidates, distances))[0]
+        if distances[best] > self.nearest_max_distance_meters:
+            return None
+        return int(candidates[best])
+
+ward_index = WardIndex(settings.WARD_NEAREST_MAX_DISTANCE_METERS, settings.WARD_INDEX_CHECK_SECONDS)
@@ -1,6 +1,9 @@
 import geopandas as gpd
 from sqlalchemy.orm import Session
 from models.ward import Ward
+from gis.ward_index import ward_index
+from services.tile_service import tile_cache
+from ml.heatmap_generator import hotspot_cache
 from pathlib import Path
 import json
 
@@ -36,6 +39,9 @@ def load_ward_boundaries(db: Session, geojson_path: str):
             db.add(ward)
     
     db.commit()
+    ward_index.rebuild(db)
+    tile_cache.invalidate_layer("wards")
+    hotspot_cache.invalidate()
     print(f"Loaded {len(gdf)} wards into database")
 
 def create_mock_delhi_wards(db: Session):
@@ -78,4 +84,7 @@ def create_mock_delhi_wards(db: Session):
             db.add(ward)
     
     db.commit()
+    ward_index.rebuild(db)
+    tile_cache.invalidate_layer("wards")
+    hotspot_cache.invalidate()
     print(f"Created {len(mock_wards)} mock wards")
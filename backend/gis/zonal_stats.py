@@ -0,0 +1,167 @@
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import rasterio
+from rasterio.features import rasterize
+from rasterio.merge import merge
+
+METERS_PER_DEGREE_LAT = 110_540.0
+METERS_PER_DEGREE_LON = 111_320.0
+PERCENTILES = (10, 50, 90)
+
+class ZonalStatsEngine:
+    """Per-ward elevation and slope statistics from a label grid rasterized once against the DEM.
+
+    The label grid is cached on disk keyed by the ward geometries and the DEM files, so it is
+    only rebuilt when either changes.
+    """
+
+    def __init__(self, srtm_dir: str, cache_dir: Optional[str] = None):
+        self.srtm_dir = Path(srtm_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._dem = None
+        self._dem_key = None
+        self._results: dict[str, dict[int, dict]] = {}
+        self._lock = threading.Lock()
+
+    def compute(self, wards: list[tuple[int, object]], use_cache: bool = True) -> dict[int, dict]:
+        dem_files = sorted(self.srtm_dir.glob("*.tif"))
+        if not dem_files or not wards:
+            return {}
+
+        with self._lock:
+            elevation, slope, transform = self._load_dem(dem_files)
+            key = self._cache_key(wards, dem_files)
+            if use_cache and key in self._results:
+                return self._results[key]
+
+            labels = self._label_grid(wards, elevation.shape, transform, key if use_cache else None)
+            stats = self._zonal_stats(labels, elevation, slope, [ward_id for ward_id, _ in wards])
+            if use_cache:
+                self._results = {key: stats}
+            return stats
+
+    def _load_dem(self, dem_files: list[Path]) -> tuple[np.ndarray, np.ndarray, object]:
+        dem_key = tuple((str(f), f.stat().st_mtime_ns) for f in dem_files)
+        if self._dem_key == dem_key:
+            return self._dem
+
+        if len(dem_files) == 1:
+            with rasterio.open(dem_files[0]) as src:
+                data = src.read(1, masked=True)
+                transform, crs = src.transform, src.crs
+        else:
+            sources = [rasterio.open(f) for f in dem_files]
+            try:
+                mosaic, transform = merge(sources, masked=True)
+                data, crs = mosaic[0], sources[0].crs
+            finally:
+                for src in sources:
+                    src.close()
+
+        elevation = np.ma.filled(data.astype(np.float64), np.nan)
+        slope = self._slope(elevation, transform, crs is None or crs.is_geographic)
+
+        self._dem = (elevation, slope, transform)
+        self._dem_key = dem_key
+        return self._dem
+
+    def _slope(self, elevation: np.ndarray, transform, geographic: bool) -> np.ndarray:
+        # Slope over the whole DEM with nodata as NaN, so ward edges never see a fake cliff
+        cell_x, cell_y = abs(transform.a), abs(transform.e)
+        if geographic:
+            rows = np.arange(elevation.shape[0])
+            latitudes = transform.f + (rows + 0.5) * transform.e
+            dx = (cell_x * METERS_PER_DEGREE_LON * np.cos(np.radians(latitudes)))[:, None]
+            dy = cell_y * METERS_PER_DEGREE_LAT
+        else:
+            dx, dy = cell_x, cell_y
+
+        grad_y, grad_x = np.gradient(elevation)
+        return np.degrees(np.arctan(np.hypot(grad_x / dx, grad_y / dy)))
+
+    def _cache_key(self, wards: list[tuple[int, object]], dem_files: list[Path]) -> str:
+        digest = hashlib.sha256()
+        for ward_id, geometry in sorted(wards, key=lambda w: w[0]):
+            digest.update(str(ward_id).encode())
+            digest.update(geometry.wkb)
+        for f in dem_files:
+            digest.update(f"{f}:{f.stat().st_mtime_ns}".encode())
+        return digest.hexdigest()[:24]
+
+    def _label_grid(self, wards: list[tuple[int, object]], shape: tuple[int, int], transform,
+                    key: Optional[str]) -> np.ndarray:
+        cache_path = self.cache_dir / f"ward_labels_{key}.npy" if self.cache_dir and key else None
+        if cache_path is not None and cache_path.exists():
+            return np.load(cache_path, mmap_mode="r")
+
+        dtype = np.uint16 if len(wards) < np.iinfo(np.uint16).max else np.uint32
+        labels = rasterize(
+            ((geometry, label) for label, (_, geometry) in enumerate(wards, start=1)),
+            out_shape=shape,
+            transform=transform,
+            fill=0,
+            dtype=dtype
+        )
+
+        if cache_path is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in self.cache_dir.glob("ward_labels_*.npy"):
+                stale.unlink()
+            np.save(cache_path, labels)
+        return labels
+
+    def _zonal_stats(self, labels: np.ndarray, elevation: np.ndarray, slope: np.ndarray,
+                     ward_ids: list[int]) -> dict[int, dict]:
+        n_labels = len(ward_ids) + 1
+        valid = (labels > 0) & ~np.isnan(elevation)
+        label_values = labels[valid].astype(np.int64)
+        elevation_values = elevation[valid]
+
+        counts = np.bincount(label_values, minlength=n_labels)
+        elevation_sums = np.bincount(label_values, weights=elevation_values, minlength=n_labels)
+
+        slope_valid = valid & ~np.isnan(slope)
+        slope_labels = labels[slope_valid].astype(np.int64)
+        slope_counts = np.bincount(slope_labels, minlength=n_labels)
+        slope_sums = np.bincount(slope_labels, weights=slope[slope_valid], minlength=n_labels)
+
+        if len(elevation_values) == 0:
+            return {ward_id: None for ward_id in ward_ids}
+
+        # Sorting by (label, value) lays each ward's pixels out contiguously in ascending order,
+        # so min, max and percentiles become index lookups at offsets from each ward's start
+        order = np.lexsort((elevation_values, label_values))
+        sorted_values = elevation_values[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        has_data = counts > 0
+        max_index = len(sorted_values) - 1
+        first = starts.clip(max=max_index)
+        last = (starts + counts - 1).clip(min=0, max=max_index)
+
+        percentiles = {}
+        for q in PERCENTILES:
+            position = starts + (counts - 1).clip(min=0) * (q / 100.0)
+            lower = np.floor(position).astype(np.int64).clip(max=max_index)
+            upper = np.ceil(position).astype(np.int64).clip(max=max_index)
+            fraction = position - np.floor(position)
+            percentiles[q] = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+        stats = {}
+        for label, ward_id in enumerate(ward_ids, start=1):
+            if not has_data[label]:
+                stats[ward_id] = None
+                continue
+            stats[ward_id] = {
+                "pixel_count": int(counts[label]),
+                "elevation_mean": float(elevation_sums[label] / counts[label]),
+                "elevation_min": float(sorted_values[first[label]]),
+                "elevation_max": float(sorted_values[last[label]]),
+                **{f"elevation_p{q}": float(percentiles[q][label]) for q in PERCENTILES},
+                "slope_mean": (
+                    float(slope_sums[label] / slope_counts[label]) if slope_counts[label] else None
+                )
+            }
+        return stats
@@ -2,7 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from config import settings
-from routes import auth, reports, authority, analytics
+from routes import auth, reports, authority, analytics, tiles, metrics, objects
+from database import SessionLocal
+from services.query_metrics import QueryMetricsMiddleware, query_metrics
+from gis.ward_index import ward_index
+from services.counter_aggregator import counter_aggregator
+from services.audit_log_writer import audit_log_writer
+from services.password_hasher import password_hasher
+from services.image_derivatives import image_derivative_service
+from services.user_cache import user_cache
 import os
 
 app = FastAPI(
@@ -18,15 +26,75 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryMetricsMiddleware, metrics=query_metrics, debug_headers=settings.DB_DEBUG_HEADERS)
 
 app.include_router(auth.router)
 app.include_router(reports.router)
 app.include_router(authority.router)
 app.include_router(analytics.router)
+app.include_router(tiles.router)
+app.include_router(metrics.router)
+app.include_router(objects.router)
 
 if os.path.exists(settings.UPLOAD_DIR):
     app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
+@app.on_event("startup")
+def load_ward_index():
+    db = SessionLocal()
+    try:
+        ward_index.rebuild(db)
+    except Exception as e:
+        print(f"Ward index not loaded at startup: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def start_counter_aggregator():
+    db = SessionLocal()
+    try:
+        counter_aggregator.reconcile(db, since_minutes=settings.COUNTER_RECONCILE_WINDOW_MINUTES)
+    except Exception as e:
+        print(f"Report counters not reconciled at startup: {e}")
+    finally:
+        db.close()
+    counter_aggregator.start(SessionLocal, settings.COUNTER_FLUSH_INTERVAL_SECONDS)
+
+@app.on_event("shutdown")
+async def stop_counter_aggregator():
+    await counter_aggregator.stop(SessionLocal)
+
+@app.on_event("startup")
+async def start_audit_log_writer():
+    db = SessionLocal()
+    try:
+        audit_log_writer.recover(db)
+    except Exception as e:
+        print(f"Audit journals not recovered at startup: {e}")
+    finally:
+        db.close()
+    audit_log_writer.start(SessionLocal, settings.AUDIT_FLUSH_INTERVAL_SECONDS)
+
+@app.on_event("shutdown")
+async def stop_audit_log_writer():
+    await audit_log_writer.stop(SessionLocal)
+
+@app.on_event("startup")
+async def start_user_cache_sync():
+    user_cache.start(SessionLocal, settings.USER_CACHE_SYNC_SECONDS)
+
+@app.on_event("shutdown")
+def stop_user_cache_sync():
+    user_cache.stop()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def stop_image_derivatives():
+    image_derivative_service.shutdown()
+
 @app.get("/")
 async def root():
     return {
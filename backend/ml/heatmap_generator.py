@@ -1,8 +1,14 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from models.ward import Ward
+from pathlib import Path
+from config import settings
+import gzip
+import hashlib
 import json
-from typing import Dict
+import os
+import threading
+from typing import Dict, NamedTuple, Optional
 
 class HeatmapGenerator:
     def __init__(self, db: Session):
@@ -57,7 +63,65 @@ class HeatmapGenerator:
     def save_heatmap_to_file(self, output_path: str):
         geojson = self.generate_risk_heatmap_geojson()
         
-        with open(output_path, 'w') as f:
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(geojson, f, indent=2)
+        os.replace(tmp_path, output_path)
         
         print(f"Saved heatmap to {output_path}")
+
+class HotspotPayload(NamedTuple):
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    gzip_etag: str
+
+class HotspotCache:
+    """Risk heatmap FeatureCollection, rebuilt only when a prediction run rewrites it."""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._payload: Optional[HotspotPayload] = None
+        self._seen_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def get(self, db: Session) -> HotspotPayload:
+        mtime = self._file_mtime()
+        payload = self._payload
+        if payload is not None and mtime == self._seen_mtime:
+            return payload
+        
+        # Built outside the lock: on an AsyncSession the query suspends this request on the event
+        # loop thread, and another request on that thread must not block on a lock it holds
+        if mtime is not None and mtime != self._seen_mtime:
+            with open(self.path) as f:
+                geojson = json.load(f)
+        else:
+            geojson = HeatmapGenerator(db).generate_risk_heatmap_geojson()
+        payload = self._build_payload(geojson)
+        
+        with self._lock:
+            self._payload = payload
+            self._seen_mtime = mtime
+        return payload
+    
+    def invalidate(self):
+        with self._lock:
+            self._payload = None
+    
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _build_payload(self, geojson: Dict) -> HotspotPayload:
+        body = json.dumps(geojson, separators=(",", ":")).encode()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Each encoding is its own representation, so the gzip body gets its own strong ETag
+        return HotspotPayload(
+            etag=f'"{digest}"', body=body,
+            gzip_body=gzip.compress(body, compresslevel=6), gzip_etag=f'"{digest}-gz"'
+        )
+
+hotspot_cache = HotspotCache(str(Path(settings.DATA_DIR) / "risk_heatmap.geojson"))
@@ -1,103 +1,126 @@
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import cast, func, text
+from geoalchemy2 import Geography
 from models.ward import Ward
 from models.report import Report
-from typing import Dict
 from gis.elevation_processor import ElevationProcessor
 from config import settings
-import geopandas as gpd
+from services.tile_service import tile_cache
+from ml.heatmap_generator import hotspot_cache
 from shapely import wkb
 
+ELEVATION_WEIGHT = 0.30
+SLOPE_WEIGHT = 0.25
+INCIDENT_WEIGHT = 0.45
+
 class HotspotPredictor:
     def __init__(self, db: Session):
         self.db = db
-        self.elevation_processor = ElevationProcessor(settings.SRTM_DATA_DIR)
-    
+        self.elevation_processor = ElevationProcessor(settings.SRTM_DATA_DIR, settings.RASTER_CACHE_DIR)
+
     def calculate_ward_risk_scores(self):
-        wards = self.db.query(Ward).all()
-        
-        for ward in wards:
-            risk_score = self._calculate_risk_score(ward)
-            ward.risk_score = risk_score
-        
+        self._update_elevation_stats()
+
+        report_counts = self.db.query(
+            Report.ward_id,
+            func.count(Report.id).label('report_count')
+        ).filter(Report.ward_id.isnot(None)).group_by(Report.ward_id).subquery()
+
+        rows = self.db.query(
+            Ward.id,
+            Ward.elevation_avg,
+            Ward.slope_avg,
+            func.coalesce(report_counts.c.report_count, 0),
+            (func.ST_Area(cast(Ward.geometry, Geography)) / 1e6).label('area_sq_km')
+        ).outerjoin(report_counts, report_counts.c.ward_id == Ward.id).all()
+
+        if not rows:
+            print("Updated risk scores for 0 wards")
+            return
+
+        ward_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        elevation = np.array([row[1] for row in rows], dtype=np.float64)
+        slope = np.array([row[2] for row in rows], dtype=np.float64)
+        report_count = np.array([row[3] for row in rows], dtype=np.float64)
+        area_sq_km = np.array([row[4] for row in rows], dtype=np.float64)
+
+        incident_density = report_count / np.maximum(np.nan_to_num(area_sq_km, nan=0.0), 0.1)
+        risk_scores = self.score_wards(elevation, slope, incident_density)
+
+        self.db.execute(text("""
+            UPDATE wards SET
+                risk_score = v.risk_score,
+                incident_density = v.incident_density
+            FROM unnest(CAST(:ids AS integer[]), CAST(:risk_scores AS double precision[]),
+                        CAST(:densities AS double precision[]))
+                AS v(id, risk_score, incident_density)
+            WHERE wards.id = v.id
+        """), {
+            "ids": ward_ids.tolist(),
+            "risk_scores": risk_scores.tolist(),
+            "densities": incident_density.tolist()
+        })
         self.db.commit()
-        print(f"Updated risk scores for {len(wards)} wards")
-    
-    def _calculate_risk_score(self, ward: Ward) -> float:
-        features = self._extract_features(ward)
-        
-        risk_score = 0.0
-        
-        if features['elevation_avg'] is not None:
-            elevation_score = self._normalize_elevation_risk(features['elevation_avg'])
-            risk_score += elevation_score * 0.3
-        
-        if features['slope_avg'] is not None:
-            slope_score = self._normalize_slope_risk(features['slope_avg'])
-            risk_score += slope_score * 0.25
-        
-        incident_score = self._normalize_incident_density(features['incident_density'])
-        risk_score += incident_score * 0.45
-        
-        return min(100.0, max(0.0, risk_score))
-    
-    def _extract_features(self, ward: Ward) -> Dict:
-        if ward.elevation_avg is None or ward.slope_avg is None:
-            try:
-                geometry_bytes = self.db.scalar(func.ST_AsBinary(ward.geometry))
-                geom = wkb.loads(bytes(geometry_bytes))
-                
-                avg_elevation, avg_slope = self.elevation_processor.get_ward_elevation_stats(geom)
-                
-                if avg_elevation is not None:
-                    ward.elevation_avg = avg_elevation
-                if avg_slope is not None:
-                    ward.slope_avg = avg_slope
-                
-                self.db.commit()
-            except Exception as e:
-                print(f"Error extracting elevation features for ward {ward.ward_number}: {e}")
-        
-        incident_count = self.db.query(Report).filter(Report.ward_id == ward.id).count()
-        
+        tile_cache.invalidate_layer("wards")
+        hotspot_cache.invalidate()
+        print(f"Updated risk scores for {len(rows)} wards")
+
+    def score_wards(self, elevation: np.ndarray, slope: np.ndarray,
+                    incident_density: np.ndarray) -> np.ndarray:
+        # Missing elevation or slope contributes nothing rather than a default score
+        risk_score = (
+            np.nan_to_num(self._normalize_elevation_risk(elevation), nan=0.0) * ELEVATION_WEIGHT
+            + np.nan_to_num(self._normalize_slope_risk(slope), nan=0.0) * SLOPE_WEIGHT
+            + self._normalize_incident_density(incident_density) * INCIDENT_WEIGHT
+        )
+        return np.clip(risk_score, 0.0, 100.0)
+
+    def _update_elevation_stats(self):
+        wards = [
+            (ward_id, wkb.loads(bytes(geometry)))
+            for ward_id, geometry in self.db.query(Ward.id, func.ST_AsBinary(Ward.geometry)).all()
+        ]
         try:
-            geometry_bytes = self.db.scalar(func.ST_AsBinary(ward.geometry))
-            geom = wkb.loads(bytes(geometry_bytes))
-            area_sq_km = geom.area * 111 * 111
-            incident_density = incident_count / max(area_sq_km, 0.1)
-        except:
-            incident_density = incident_count
-        
-        ward.incident_density = incident_density
-        
-        return {
-            'elevation_avg': ward.elevation_avg,
-            'slope_avg': ward.slope_avg,
-            'incident_density': incident_density
-        }
-    
-    def _normalize_elevation_risk(self, elevation: float) -> float:
+            stats = self.elevation_processor.get_all_ward_elevation_stats(wards)
+        except Exception as e:
+            print(f"Error extracting elevation features: {e}")
+            return
+
+        covered = [(ward_id, s) for ward_id, s in stats.items() if s is not None]
+        if not covered:
+            return
+
+        self.db.execute(text("""
+            UPDATE wards SET
+                elevation_avg = v.elevation_avg,
+                slope_avg = COALESCE(v.slope_avg, wards.slope_avg)
+            FROM unnest(CAST(:ids AS integer[]), CAST(:elevations AS double precision[]),
+                        CAST(:slopes AS double precision[]))
+                AS v(id, elevation_avg, slope_avg)
+            WHERE wards.id = v.id
+        """), {
+            "ids": [ward_id for ward_id, _ in covered],
+            "elevations": [s["elevation_mean"] for _, s in covered],
+            "slopes": [s["slope_mean"] for _, s in covered]
+        })
+
+    def _normalize_elevation_risk(self, elevation: np.ndarray) -> np.ndarray:
         # Delhi elevation ranges from ~200 to ~300m
         # Lower elevation = higher risk
-        if elevation < 200: return 100.0
-        if elevation > 300: return 0.0
-        return 100.0 - (elevation - 200.0)
-    
-    def _normalize_slope_risk(self, slope: float) -> float:
+        return np.clip(300.0 - elevation, 0.0, 100.0)
+
+    def _normalize_slope_risk(self, slope: np.ndarray) -> np.ndarray:
         # Flatter terrain = higher risk for water accumulation
-        if slope < 0.5: return 90.0
-        if slope > 5.0: return 10.0
-        return 90.0 - (slope / 5.0) * 80.0
-    
-    def _normalize_incident_density(self, density: float) -> float:
-        if density > 10:
-            return 100.0
-        elif density > 5:
-            return 70.0
-        elif density > 2:
-            return 40.0
-        elif density > 0.5:
-            return 20.0
-        else:
-            return 5.0
+        return np.select(
+            [slope < 0.5, slope > 5.0],
+            [90.0, 10.0],
+            default=90.0 - (slope / 5.0) * 80.0
+        )
+
+    def _normalize_incident_density(self, density: np.ndarray) -> np.ndarray:
+        return np.select(
+            [density > 10, density > 5, density > 2, density > 0.5],
+            [100.0, 70.0, 40.0, 20.0],
+            default=5.0
+        )
@@ -3,7 +3,9 @@ from .report import Report, ReportStatus, ReportSeverity, Agency
 from .comment import Comment
 from .upvote import Upvote
 from .ward import Ward
-from .audit_log import AuditLog
+from .ward_stats import WardStats
+from .stored_object import StoredObject
+from .audit_log import AuditLog, AuditAction
 
 __all__ = [
     "User",
@@ -15,5 +17,8 @@ __all__ = [
     "Comment",
     "Upvote",
     "Ward",
+    "WardStats",
+    "StoredObject",
     "AuditLog",
+    "AuditAction",
 ]
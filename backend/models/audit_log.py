@@ -1,13 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
+import enum
+
+class AuditAction(str, enum.Enum):
+    STATUS_UPDATE = "STATUS_UPDATE"
+    AGENCY_ASSIGNED = "AGENCY_ASSIGNED"
+    RESOLUTION_IMAGE_UPLOADED = "RESOLUTION_IMAGE_UPLOADED"
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index('ix_audit_logs_report_id_created_at_id', 'report_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Assigned when the event is journaled, so replaying a journal never inserts a row twice
+    event_id = Column(String(32), nullable=True, unique=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     action = Column(String, nullable=False)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Text, Index, cast
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geography, Geometry
 from database import Base
 import enum
 
@@ -37,8 +37,9 @@ class Report(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     address = Column(String, nullable=True)
+    elevation = Column(Float, nullable=True)
     
-    ward_id = Column(Integer, ForeignKey("wards.id"), nullable=True)
+    ward_id = Column(Integer, ForeignKey("wards.id"), nullable=True, index=True)
     
     status = Column(SQLEnum(ReportStatus), default=ReportStatus.OPEN, nullable=False, index=True)
     severity = Column(SQLEnum(ReportSeverity), default=ReportSeverity.MEDIUM, nullable=False)
@@ -49,6 +50,8 @@ class Report(Base):
     
     upvote_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
+    # Bumped by CounterAggregator.reconcile(); buffered deltas from an older epoch are discarded
+    counters_epoch = Column(Integer, nullable=False, default=0, server_default='0')
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -59,3 +62,10 @@ class Report(Base):
     comments = relationship("Comment", back_populates="report")
     upvotes = relationship("Upvote", back_populates="report")
     audit_logs = relationship("AuditLog", back_populates="report")
+    
+    __table_args__ = (
+        Index('ix_reports_created_at_id', 'created_at', 'id'),
+    )
+
+# Serves meters-based ST_DWithin and <-> nearest-neighbour ordering, which cast location to geography
+Index('ix_reports_location_geography', cast(Report.location, Geography(srid=4326)), postgresql_using='gist')
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class StoredObject(Base):
+    __tablename__ = "stored_objects"
+    __table_args__ = (
+        Index('ix_stored_objects_unreferenced', 'updated_at', postgresql_where='ref_count <= 0'),
+    )
+    
+    id = Column(String(96), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
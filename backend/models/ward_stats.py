@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from database import Base
+
+class WardStats(Base):
+    __tablename__ = "ward_stats"
+    
+    ward_id = Column(Integer, ForeignKey("wards.id", ondelete="CASCADE"), primary_key=True)
+    
+    total_reports = Column(Integer, nullable=False, default=0)
+    open_reports = Column(Integer, nullable=False, default=0)
+    resolved_reports = Column(Integer, nullable=False, default=0)
+    resolution_hours_sum = Column(Float, nullable=False, default=0.0)
+    resolution_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,32 @@
+import re
+from typing import Optional
+
+# Content-addressed object ids: the SHA-256 of the original upload, its extension, and for
+# derived renditions a further suffix such as ".thumb.webp"
+OBJECT_ID = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]+)+$")
+BASE_OBJECT_ID = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+")
+OBJECT_PATH_PREFIX = "objects/"
+
+def object_path(object_id: str) -> str:
+    """The path stored on reports and served under /objects."""
+    return OBJECT_PATH_PREFIX + object_id
+
+def object_id_from_path(path: Optional[str]) -> Optional[str]:
+    if not path or not path.startswith(OBJECT_PATH_PREFIX):
+        return None
+    object_id = path[len(OBJECT_PATH_PREFIX):]
+    return object_id if OBJECT_ID.match(object_id) else None
+
+def base_object_id(object_id: str) -> str:
+    """The uploaded original an object was derived from (itself for originals)."""
+    match = BASE_OBJECT_ID.match(object_id)
+    return match.group(0) if match else object_id
+
+def derivative_id(object_id: str, rendition: str) -> str:
+    return f"{object_id}.{rendition}.webp"
+
+def derivative_path(image_path: Optional[str], rendition: str) -> Optional[str]:
+    """Where a rendition of a stored image is served; the object route falls back to the original
+    until the worker has written it."""
+    object_id = object_id_from_path(image_path)
+    return object_path(derivative_id(object_id, rendition)) if object_id else None
@@ -1,114 +1,284 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, select
 from typing import Optional
-from database import get_db
+from config import settings
+from database import AnySession, get_session, run_db, SessionLocal
 from schemas.ward import WardResponse, WardAnalytics
 from models.ward import Ward
-from models.report import Report, ReportStatus
+from models.ward_stats import WardStats
+from models.report import Report, ReportStatus, ReportSeverity
+from ml.heatmap_generator import hotspot_cache
 from datetime import datetime
+import json
+import math
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+# Clusters are 64px cells on a 256px tile
+CLUSTER_CELLS_PER_TILE = 4
+MAX_CLUSTER_CELLS = 10_000
+
 @router.get("/wards", response_model=list[WardResponse])
-async def get_all_wards(db: Session = Depends(get_db)):
-    wards = db.query(Ward).all()
-    return wards
+async def get_all_wards(db: AnySession = Depends(get_session)):
+    return await run_db(db, _all_wards)
 
 @router.get("/wards/{ward_id}", response_model=WardAnalytics)
-async def get_ward_analytics(ward_id: int, db: Session = Depends(get_db)):
-    ward = db.query(Ward).filter(Ward.id == ward_id).first()
-    if not ward:
+async def get_ward_analytics(ward_id: int, db: AnySession = Depends(get_session)):
+    row = await run_db(db, _ward_with_stats, ward_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Ward not found")
     
-    total_reports = db.query(Report).filter(Report.ward_id == ward_id).count()
-    open_reports = db.query(Report).filter(
-        Report.ward_id == ward_id,
-        Report.status == ReportStatus.OPEN
-    ).count()
-    resolved_reports = db.query(Report).filter(
-        Report.ward_id == ward_id,
-        Report.status.in_([ReportStatus.RESOLVED, ReportStatus.CLOSED])
-    ).count()
-    
-    avg_resolution_time = db.query(
-        func.avg(
-            func.extract('epoch', Report.resolved_at - Report.created_at) / 3600
-        )
-    ).filter(
-        Report.ward_id == ward_id,
-        Report.resolved_at.isnot(None)
-    ).scalar()
+    ward, stats = row
+    if stats is None:
+        return {
+            "ward": ward,
+            "total_reports": 0,
+            "open_reports": 0,
+            "resolved_reports": 0,
+            "avg_resolution_time_hours": None
+        }
     
     return {
         "ward": ward,
-        "total_reports": total_reports,
-        "open_reports": open_reports,
-        "resolved_reports": resolved_reports,
-        "avg_resolution_time_hours": avg_resolution_time
+        "total_reports": stats.total_reports,
+        "open_reports": stats.open_reports,
+        "resolved_reports": stats.resolved_reports,
+        "avg_resolution_time_hours": (
+            stats.resolution_hours_sum / stats.resolution_count if stats.resolution_count else None
+        )
     }
 
 @router.get("/hotspots")
-async def get_hotspot_geojson(db: Session = Depends(get_db)):
-    from geoalchemy2.functions import ST_AsGeoJSON
+async def get_hotspot_geojson(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: AnySession = Depends(get_session)
+):
+    payload = await run_db(db, hotspot_cache.get)
+    use_gzip = _accepts_gzip(accept_encoding)
+    etag = payload.gzip_etag if use_gzip else payload.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
     
-    wards = db.query(
-        Ward.id,
-        Ward.ward_number,
-        Ward.ward_name,
-        Ward.risk_score,
-        ST_AsGeoJSON(Ward.geometry).label('geometry')
-    ).all()
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     
-    features = []
-    for ward in wards:
-        import json
-        features.append({
-            "type": "Feature",
-            "properties": {
-                "id": ward.id,
-                "ward_number": ward.ward_number,
-                "ward_name": ward.ward_name,
-                "risk_score": ward.risk_score
-            },
-            "geometry": json.loads(ward.geometry)
-        })
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=payload.gzip_body, media_type="application/geo+json", headers=headers)
     
+    return Response(content=payload.body, media_type="application/geo+json", headers=headers)
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True when Accept-Encoding gives gzip, or * without naming gzip, a non-zero q-value."""
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored; * matches any ETag."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def _all_wards(db: Session) -> list[Ward]:
+    return db.query(Ward).all()
+
+def _ward_with_stats(db: Session, ward_id: int):
+    return db.query(Ward, WardStats).outerjoin(
+        WardStats, WardStats.ward_id == Ward.id
+    ).filter(Ward.id == ward_id).first()
+
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+def _in_bbox(bbox: tuple[float, float, float, float]):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return Report.location.intersects(func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326))
+
+def _cluster_grid(bbox: tuple[float, float, float, float], zoom: int) -> tuple[float, tuple[float, float, float, float]]:
+    """Cell size in degrees at a zoom, and the bbox grown to whole cells.
+
+    Cells are aligned to a global grid, so growing the bbox means edge clusters count every report
+    in their cell and stay the same as the map pans.
+    """
+    cell = 360 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return cell, (
+        math.floor(min_lon / cell) * cell,
+        math.floor(min_lat / cell) * cell,
+        math.ceil(max_lon / cell) * cell,
+        math.ceil(max_lat / cell) * cell
+    )
+
+def _report_clusters(db: Session, bbox: tuple[float, float, float, float], cell: float,
+                     status: Optional[ReportStatus]):
+    # Inlined so the grouped expressions are textually identical in SELECT and GROUP BY
+    size = bindparam("cell", cell, literal_execute=True)
+    column = func.floor(Report.longitude / size)
+    row = func.floor(Report.latitude / size)
+    statement = select(
+        func.count().label("count"),
+        func.min(Report.id).label("report_id"),
+        func.avg(Report.longitude).label("longitude"),
+        func.avg(Report.latitude).label("latitude"),
+        *(func.count().filter(Report.severity == severity).label(severity.value) for severity in ReportSeverity)
+    ).where(_in_bbox(bbox)).group_by(column, row)
+    if status:
+        statement = statement.where(Report.status == status)
+    return db.execute(statement).all()
+
+def _report_points(db: Session, bbox: tuple[float, float, float, float],
+                   status: Optional[ReportStatus], limit: int):
+    statement = select(
+        Report.id, Report.status, Report.severity, Report.longitude, Report.latitude
+    ).where(_in_bbox(bbox)).order_by(Report.created_at.desc(), Report.id).limit(limit)
+    if status:
+        statement = statement.where(Report.status == status)
+    return db.execute(statement).all()
+
+def _cluster_feature(longitude: float, latitude: float, properties: dict) -> dict:
     return {
-        "type": "FeatureCollection",
-        "features": features
+        "type": "Feature",
+        "properties": properties,
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude]}
     }
 
-@router.get("/reports-geojson")
-async def get_reports_geojson(
+@router.get("/report-clusters")
+async def get_report_clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
     status: Optional[ReportStatus] = None,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    query = db.query(Report)
-    if status:
-        query = query.filter(Report.status == status)
+    """Report counts per grid cell with severity breakdowns, or the reports themselves at high zoom."""
+    bounds = _parse_bbox(bbox)
     
-    reports = query.all()
+    if zoom >= settings.REPORT_CLUSTER_MAX_ZOOM:
+        limit = settings.REPORT_CLUSTER_MAX_POINTS
+        # One row past the limit tells whether the viewport was cut short
+        rows = await run_db(db, _report_points, bounds, status, limit + 1)
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        features = [
+            _cluster_feature(row.longitude, row.latitude, {
+                "cluster": False,
+                "id": row.id,
+                "count": 1,
+                "status": row.status.value,
+                "severity": {row.severity.value: 1}
+            })
+            for row in rows
+        ]
+        return {"type": "FeatureCollection", "zoom": zoom, "clustered": False,
+                "truncated": truncated, "features": features}
     
+    cell, grid_bounds = _cluster_grid(bounds, zoom)
+    min_lon, min_lat, max_lon, max_lat = grid_bounds
+    if round((max_lon - min_lon) / cell) * round((max_lat - min_lat) / cell) > MAX_CLUSTER_CELLS:
+        raise HTTPException(status_code=400, detail="bbox is too large for this zoom")
+    
+    rows = await run_db(db, _report_clusters, grid_bounds, cell, status)
     features = []
-    for report in reports:
-        features.append({
-            "type": "Feature",
-            "properties": {
-                "id": report.id,
-                "title": report.title,
-                "status": report.status.value,
-                "severity": report.severity.value,
-                "upvote_count": report.upvote_count,
-                "created_at": report.created_at.isoformat()
-            },
-            "geometry": {
-                "type": "Point",
-                "coordinates": [report.longitude, report.latitude]
-            }
-        })
+    for row in rows:
+        properties = {
+            "cluster": row.count > 1,
+            "count": row.count,
+            "severity": {severity.value: getattr(row, severity.value) for severity in ReportSeverity}
+        }
+        if row.count == 1:
+            properties["id"] = row.report_id
+        features.append(_cluster_feature(row.longitude, row.latitude, properties))
+    return {"type": "FeatureCollection", "zoom": zoom, "clustered": True, "cell_degrees": cell,
+            "truncated": False, "features": features}
+
+def _stream_report_features(statement, batch_size: int = 1000):
+    db = SessionLocal()
+    try:
+        yield '{"type":"FeatureCollection","features":['
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+        first = True
+        for partition in result.partitions():
+            chunk = []
+            for row in partition:
+                chunk.append(json.dumps({
+                    "type": "Feature",
+                    "properties": {
+                        "id": row.id,
+                        "title": row.title,
+                        "status": row.status.value,
+                        "severity": row.severity.value,
+                        "upvote_count": row.upvote_count,
+                        "created_at": row.created_at.isoformat()
+                    },
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [row.longitude, row.latitude]
+                    }
+                }, separators=(",", ":")))
+            yield ("" if first else ",") + ",".join(chunk)
+            first = False
+        yield "]}"
+    finally:
+        db.close()
+
+@router.get("/reports-geojson")
+async def get_reports_geojson(
+    status: Optional[ReportStatus] = None,
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    statement = select(
+        Report.id,
+        Report.title,
+        Report.status,
+        Report.severity,
+        Report.upvote_count,
+        Report.created_at,
+        Report.longitude,
+        Report.latitude
+    )
+    if status:
+        statement = statement.where(Report.status == status)
+    if bbox:
+        statement = statement.where(_in_bbox(_parse_bbox(bbox)))
+    if since:
+        statement = statement.where(Report.created_at >= since)
+    if until:
+        statement = statement.where(Report.created_at < until)
     
-    return {
-        "type": "FeatureCollection",
-        "features": features
-    }
+    return StreamingResponse(
+        _stream_report_features(statement),
+        media_type="application/geo+json"
+    )
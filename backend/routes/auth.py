@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from typing import Optional
 from sqlalchemy.orm import Session
-from database import get_db
+from database import AnySession, get_session, run_db
 from schemas.auth import UserRegister, UserLogin, Token, UserResponse
 from models.user import User
-from services.auth_service import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
+from services.user_cache import user_cache
+from services.auth_service import create_access_token, create_refresh_token, decode_token
+from services.password_hasher import password_hasher, PasswordHasherBusy
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 async def get_current_user(
     authorization: str = Header(...),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ) -> User:
     if not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -33,7 +36,7 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await run_db(db, _load_user, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,16 +45,49 @@ async def get_current_user(
     
     return user
 
+def _load_user(db: Session, user_id: int) -> Optional[User]:
+    user = user_cache.get_user(db, user_id)
+    if user:
+        return user
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if user:
+        user_cache.set(user)
+    return user
+
+def _find_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+def _add_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def _update_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+async def _run_password_hasher(operation):
+    try:
+        return await operation
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+async def register(user_data: UserRegister, db: AnySession = Depends(get_session)):
+    existing_user = await run_db(db, _find_user_by_email, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await _run_password_hasher(password_hasher.hash(user_data.password))
     
     new_user = User(
         email=user_data.email,
@@ -61,22 +97,27 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         role=user_data.role
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
+    return await run_db(db, _add_user, new_user)
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == credentials.email).first()
+async def login(credentials: UserLogin, db: AnySession = Depends(get_session)):
+    user = await run_db(db, _find_user_by_email, credentials.email)
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await _run_password_hasher(
+            password_hasher.verify_and_update(credentials.password, user.hashed_password)
+        )
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    if new_hash:
+        await run_db(db, _update_password_hash, user, new_hash)
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
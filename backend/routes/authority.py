@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from database import get_db
 from schemas.report import ReportUpdate, ReportResponse
+from schemas.audit_log import AuditLogListResponse
 from models.user import User, UserRole
 from models.report import Report, ReportStatus, Agency
+from models.audit_log import AuditAction
 from services.report_service import ReportService
-from services.storage_service import storage_service
+from services.audit_log_writer import audit_log_writer
+from services.storage_service import StorageService, storage_service
+from services.image_derivatives import image_derivative_service
+from services.tile_service import tile_cache
 from routes.auth import get_current_user
 
 router = APIRouter(prefix="/authority", tags=["Authority"])
@@ -41,21 +46,22 @@ async def update_report(
     
     if update_data.severity:
         report.severity = update_data.severity
+        tile_cache.invalidate_point("reports", report.longitude, report.latitude)
     
     if update_data.assigned_agency:
         report.assigned_agency = update_data.assigned_agency
-        
-        from models.audit_log import AuditLog
-        audit_log = AuditLog(
+    
+    if update_data.assigned_agency:
+        with audit_log_writer.journaled(
             report_id=report_id,
             user_id=current_user.id,
-            action="AGENCY_ASSIGNED",
+            action=AuditAction.AGENCY_ASSIGNED,
             details={"agency": update_data.assigned_agency.value},
             notes=update_data.notes
-        )
-        db.add(audit_log)
-    
-    db.commit()
+        ):
+            db.commit()
+    else:
+        db.commit()
     db.refresh(report)
     
     return report
@@ -72,39 +78,51 @@ async def upload_resolution_image(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
     
     try:
-        image_path = await storage_service.save_upload(image, prefix="resolution")
+        image_path = await storage_service.save_upload(image, db)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    image_derivative_service.schedule(image_path)
     
+    StorageService.release(db, report.resolution_image_path)
+    StorageService.acquire(db, image_path)
     report.resolution_image_path = image_path
     
-    from models.audit_log import AuditLog
-    audit_log = AuditLog(
+    with audit_log_writer.journaled(
         report_id=report_id,
         user_id=current_user.id,
-        action="RESOLUTION_IMAGE_UPLOADED",
+        action=AuditAction.RESOLUTION_IMAGE_UPLOADED,
         details={"image_path": image_path}
-    )
-    db.add(audit_log)
-    
-    db.commit()
+    ):
+        db.commit()
     
     return {"message": "Resolution image uploaded successfully", "image_path": image_path}
 
-@router.get("/reports/{report_id}/audit-log")
+@router.get("/reports/{report_id}/audit-log", response_model=AuditLogListResponse)
 async def get_audit_log(
     report_id: int,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    action: Optional[AuditAction] = None,
     current_user: User = Depends(require_authority),
     db: Session = Depends(get_db)
 ):
-    from models.audit_log import AuditLog
-    
-    report = db.query(Report).filter(Report.id == report_id).first()
-    if not report:
+    if not db.query(Report.id).filter(Report.id == report_id).first():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
     
-    audit_logs = db.query(AuditLog).filter(
-        AuditLog.report_id == report_id
-    ).order_by(AuditLog.created_at.desc()).all()
+    try:
+        entries, next_cursor = ReportService.get_audit_log(
+            db, report_id, limit=limit, cursor=cursor, action=action
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not cursor:
+        # Events still waiting for the batch writer belong at the top of the first page
+        flushed = {entry["event_id"] for entry in entries}
+        pending = [
+            event for event in audit_log_writer.pending(report_id)
+            if event["event_id"] not in flushed and (action is None or event["action"] == action.value)
+        ]
+        entries = sorted(pending, key=lambda event: event["created_at"], reverse=True) + entries
     
-    return audit_logs
+    return {"entries": entries, "next_cursor": next_cursor}
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, status
+from services.user_cache import user_cache
+from services.password_hasher import password_hasher
+from services.query_metrics import query_metrics
+from database import engine, AsyncSessionLocal
+from models.user import User
+from routes.authority import require_authority
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/cache")
+async def get_cache_metrics(current_user: User = Depends(require_authority)):
+    return {
+        "users": user_cache.stats()
+    }
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics():
+    return password_hasher.stats()
+
+# Per-route stats include SQL text, so they are limited to authority users
+@router.get("/db")
+async def get_db_metrics(current_user: User = Depends(require_authority)):
+    pools = {"sync": _pool_status(engine.pool)}
+    if AsyncSessionLocal is not None:
+        pools["async"] = _pool_status(AsyncSessionLocal.kw["bind"].pool)
+    
+    return {
+        "pools": pools,
+        "n_plus_one_threshold": query_metrics.n_plus_one_threshold,
+        "routes": query_metrics.snapshot()
+    }
+
+@router.delete("/db", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_db_metrics(current_user: User = Depends(require_authority)):
+    query_metrics.reset()
+
+def _pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow()
+    }
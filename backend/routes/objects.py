@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from typing import Optional
+from services.object_store import OBJECT_ID, content_type_for
+from services.storage_service import base_object_id, storage_service
+
+router = APIRouter(prefix="/objects", tags=["Objects"])
+
+@router.api_route("/{object_id}", methods=["GET", "HEAD"])
+def get_object(
+    object_id: str,
+    request: Request,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    if not OBJECT_ID.match(object_id):
+        raise HTTPException(status_code=404, detail="Object not found")
+
+    info = storage_service.backend.stat(object_id)
+    if info is None:
+        original = base_object_id(object_id)
+        if original != object_id:
+            # Rendition not generated yet: the original is always a valid stand-in
+            return RedirectResponse(original, status_code=307)
+        raise HTTPException(status_code=404, detail="Object not found")
+
+    # Content-addressed, so an object never changes under its id
+    headers = {
+        "ETag": f'"{object_id}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes"
+    }
+    if if_none_match and headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, info.size - 1, 200
+    if range:
+        try:
+            byte_range = _parse_range(range, info.size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{info.size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    media_type = content_type_for(object_id)
+    if request.method == "HEAD" or info.size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    return StreamingResponse(
+        storage_service.backend.iter_range(object_id, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """The single byte range a Range header asks for, clamped to the object.
+
+    Returns None for headers to ignore (multi-range or malformed), which RFC 9110 answers with the
+    whole object, and raises ValueError for ranges that cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip() != "bytes" or "," in spec or not dash:
+        return None
+    if not (first.isdigit() or first == "") or not (last.isdigit() or last == "") or first == last == "":
+        return None
+
+    if first == "":
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return (max(size - suffix, 0), size - 1)
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return (start, min(end, size - 1))
@@ -1,23 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
 from sqlalchemy.orm import Session
-from typing import Optional
-from database import get_db
-from schemas.report import ReportCreate, ReportResponse, ReportListResponse
-from schemas.comment import CommentCreate, CommentResponse
+from sqlalchemy.exc import IntegrityError
+from typing import Literal, Optional
+from datetime import datetime
+from database import AnySession, get_db, get_session, run_db
+from schemas.report import ReportCreate, ReportResponse, ReportListResponse, NearbyReportResponse, BulkReportResponse
+from schemas.comment import CommentCreate, CommentResponse, CommentListResponse
 from models.user import User
-from models.report import Report, ReportStatus, ReportSeverity
-from models.comment import Comment
-from models.upvote import Upvote
+from models.report import ReportStatus, ReportSeverity
 from services.report_service import ReportService
+from services.bulk_ingest import BulkIngestService
 from services.storage_service import storage_service
+from services.image_derivatives import image_derivative_service
 from services.rate_limiter import rate_limiter
 from routes.auth import get_current_user
+from routes.authority import require_authority
 from config import settings
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 @router.post("/", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
+    response: Response,
     title: str = Form(...),
     description: str = Form(...),
     latitude: float = Form(...),
@@ -25,25 +30,39 @@ async def create_report(
     address: Optional[str] = Form(None),
     severity: ReportSeverity = Form(ReportSeverity.MEDIUM),
     image: Optional[UploadFile] = File(None),
+    allow_duplicate: bool = Form(False),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
     rate_key = f"report_{current_user.id}"
-    if not rate_limiter.is_allowed(rate_key, settings.RATE_LIMIT_REPORTS_PER_HOUR, 60):
+    if not await rate_limiter.is_allowed_async(rate_key, settings.RATE_LIMIT_REPORTS_PER_HOUR, 60):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded. Please try again later."
         )
     
+    if settings.DUPLICATE_DETECTION_ENABLED and not allow_duplicate:
+        duplicate = await run_db(db, ReportService.find_duplicate_report, latitude, longitude)
+        if duplicate is not None:
+            # Merged as an upvote on the open report instead of a new row for triage
+            report = await run_db(db, ReportService.merge_duplicate, duplicate, current_user.id)
+            response.status_code = status.HTTP_200_OK
+            response.headers["X-Duplicate-Of"] = str(report.id)
+            return report
+    
     image_path = None
     if image:
         try:
-            image_path = await storage_service.save_upload(image, prefix="report")
+            image_path = await storage_service.save_upload(image, db)
         except ValueError as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        image_derivative_service.schedule(image_path)
     
-    report = ReportService.create_report(
-        db=db,
+    # Raster reads block, so they stay out of run_db, which runs on the event loop in async mode
+    elevation = await asyncio.to_thread(ReportService.sample_elevation, latitude, longitude)
+    report = await run_db(
+        db,
+        ReportService.create_report,
         user_id=current_user.id,
         title=title,
         description=description,
@@ -51,11 +70,32 @@ async def create_report(
         longitude=longitude,
         address=address,
         severity=severity,
-        image_path=image_path
+        image_path=image_path,
+        elevation=elevation
     )
     
     return report
 
+@router.post("/bulk", response_model=BulkReportResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_reports(
+    file: UploadFile = File(...),
+    format: Optional[Literal["jsonl", "csv"]] = Form(None),
+    current_user: User = Depends(require_authority),
+    db: Session = Depends(get_db)
+):
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+        return BulkIngestService.ingest(
+            db=db,
+            user_id=current_user.id,
+            content=content,
+            fmt=format or BulkIngestService.detect_format(file.filename)
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be UTF-8 encoded")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.get("/", response_model=ReportListResponse)
 async def get_reports(
     skip: int = Query(0, ge=0),
@@ -63,27 +103,56 @@ async def get_reports(
     status: Optional[ReportStatus] = None,
     ward_id: Optional[int] = None,
     severity: Optional[ReportSeverity] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    total_mode: Literal["exact", "estimate", "cached", "none"] = "exact",
+    db: AnySession = Depends(get_session)
 ):
-    reports, total = ReportService.get_reports(
-        db=db,
-        skip=skip,
-        limit=limit,
-        status=status,
-        ward_id=ward_id,
-        severity=severity
-    )
+    try:
+        reports, total, next_cursor = await run_db(
+            db,
+            ReportService.get_reports,
+            skip=skip,
+            limit=limit,
+            status=status,
+            ward_id=ward_id,
+            severity=severity,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "reports": reports,
         "total": total,
-        "page": skip // limit + 1,
-        "page_size": limit
+        "page": None if cursor else skip // limit + 1,
+        "page_size": limit,
+        "next_cursor": next_cursor
     }
 
+@router.get("/nearby", response_model=list[NearbyReportResponse])
+async def get_nearby_reports(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[ReportStatus] = None,
+    radius_m: Optional[float] = Query(None, gt=0, le=50000),
+    db: AnySession = Depends(get_session)
+):
+    nearest = await run_db(
+        db,
+        ReportService.get_nearest_reports,
+        latitude,
+        longitude,
+        limit=limit,
+        status=status,
+        radius_m=radius_m
+    )
+    return [{"report": report, "distance_m": distance} for report, distance in nearest]
+
 @router.get("/{report_id}", response_model=ReportResponse)
-async def get_report(report_id: int, db: Session = Depends(get_db)):
-    report = db.query(Report).filter(Report.id == report_id).first()
+async def get_report(report_id: int, db: AnySession = Depends(get_session)):
+    report = await run_db(db, ReportService.get_report, report_id)
     if not report:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
     return report
@@ -92,63 +161,75 @@ async def get_report(report_id: int, db: Session = Depends(get_db)):
 async def upvote_report(
     report_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    report = db.query(Report).filter(Report.id == report_id).first()
-    if not report:
+    try:
+        upvote_count = await run_db(db, ReportService.add_upvote, report_id, current_user.id)
+    except IntegrityError:
+        await run_db(db, Session.rollback)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
     
-    existing_upvote = db.query(Upvote).filter(
-        Upvote.report_id == report_id,
-        Upvote.user_id == current_user.id
-    ).first()
-    
-    if existing_upvote:
+    if upvote_count is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already upvoted this report"
         )
     
-    upvote = Upvote(report_id=report_id, user_id=current_user.id)
-    db.add(upvote)
+    return {"message": "Upvoted successfully", "upvote_count": upvote_count}
+
+@router.delete("/{report_id}/upvote")
+async def remove_upvote(
+    report_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AnySession = Depends(get_session)
+):
+    upvote_count = await run_db(db, ReportService.remove_upvote, report_id, current_user.id)
     
-    report.upvote_count += 1
-    db.commit()
+    if upvote_count is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upvote not found")
     
-    return {"message": "Upvoted successfully"}
+    return {"message": "Upvote removed", "upvote_count": upvote_count}
 
 @router.post("/{report_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def add_comment(
     report_id: int,
     comment_data: CommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
     rate_key = f"comment_{current_user.id}"
-    if not rate_limiter.is_allowed(rate_key, settings.RATE_LIMIT_COMMENTS_PER_HOUR, 60):
+    if not await rate_limiter.is_allowed_async(rate_key, settings.RATE_LIMIT_COMMENTS_PER_HOUR, 60):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded. Please try again later."
         )
     
-    report = db.query(Report).filter(Report.id == report_id).first()
-    if not report:
+    try:
+        comment = await run_db(db, ReportService.add_comment, report_id, current_user.id, comment_data.content)
+    except IntegrityError:
+        await run_db(db, Session.rollback)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
     
-    comment = Comment(
-        report_id=report_id,
-        user_id=current_user.id,
-        content=comment_data.content
-    )
-    db.add(comment)
-    
-    report.comment_count += 1
-    db.commit()
-    db.refresh(comment)
-    
     return comment
 
-@router.get("/{report_id}/comments", response_model=list[CommentResponse])
-async def get_comments(report_id: int, db: Session = Depends(get_db)):
-    comments = db.query(Comment).filter(Comment.report_id == report_id).order_by(Comment.created_at.desc()).all()
-    return comments
+@router.get("/{report_id}/comments", response_model=CommentListResponse)
+async def get_comments(
+    report_id: int,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    db: AnySession = Depends(get_session)
+):
+    try:
+        comments, next_cursor = await run_db(
+            db,
+            ReportService.get_comments,
+            report_id,
+            limit=limit,
+            cursor=cursor,
+            since=since
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"comments": comments, "next_cursor": next_cursor}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+from typing import Literal
+from database import get_db
+from services.tile_service import TileService
+
+router = APIRouter(prefix="/tiles", tags=["Tiles"])
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(
+    layer: Literal["reports", "wards"],
+    z: int,
+    x: int,
+    y: int,
+    db: Session = Depends(get_db)
+):
+    try:
+        tile = TileService.get_tile(db, layer, z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": "public, max-age=60"}
+    )
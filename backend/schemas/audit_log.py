@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional
+
+class AuditLogResponse(BaseModel):
+    # None until a journaled event has been flushed to the database
+    id: Optional[int] = None
+    report_id: int
+    user_id: int
+    action: str
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    details: Optional[dict[str, Any]] = None
+    notes: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class AuditLogListResponse(BaseModel):
+    entries: list[AuditLogResponse]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 class CommentCreate(BaseModel):
     content: str = Field(..., min_length=1, max_length=1000)
@@ -13,3 +14,7 @@ class CommentResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class CommentListResponse(BaseModel):
+    comments: list[CommentResponse]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from typing import Optional
 from datetime import datetime
 from models.report import ReportStatus, ReportSeverity, Agency
+from object_paths import derivative_path
 
 class ReportCreate(BaseModel):
     title: str = Field(..., min_length=5, max_length=200)
@@ -25,6 +26,7 @@ class ReportResponse(BaseModel):
     latitude: float
     longitude: float
     address: Optional[str]
+    elevation: Optional[float] = None
     ward_id: Optional[int]
     status: ReportStatus
     severity: ReportSeverity
@@ -37,11 +39,47 @@ class ReportResponse(BaseModel):
     updated_at: Optional[datetime]
     resolved_at: Optional[datetime]
     
+    @computed_field
+    @property
+    def image_thumbnail_path(self) -> Optional[str]:
+        return derivative_path(self.image_path, "thumb")
+    
+    @computed_field
+    @property
+    def image_medium_path(self) -> Optional[str]:
+        return derivative_path(self.image_path, "medium")
+    
+    @computed_field
+    @property
+    def resolution_image_thumbnail_path(self) -> Optional[str]:
+        return derivative_path(self.resolution_image_path, "thumb")
+    
+    @computed_field
+    @property
+    def resolution_image_medium_path(self) -> Optional[str]:
+        return derivative_path(self.resolution_image_path, "medium")
+    
     class Config:
         from_attributes = True
 
+class NearbyReportResponse(BaseModel):
+    report: ReportResponse
+    distance_m: float
+
 class ReportListResponse(BaseModel):
     reports: list[ReportResponse]
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
+    next_cursor: Optional[str] = None
+
+class BulkReportResult(BaseModel):
+    row: int
+    report_id: Optional[int] = None
+    ward_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkReportResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: list[BulkReportResult]
@@ -0,0 +1,39 @@
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal
+from models.user import User
+from services.bulk_ingest import BulkIngestService
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load reports from a JSON lines or CSV file")
+    parser.add_argument("path", help="Path to a .jsonl or .csv file")
+    parser.add_argument("--user-email", required=True, help="Account the reports are filed under")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    
+    try:
+        user = db.query(User).filter(User.email == args.user_email).first()
+        if not user:
+            print(f"User not found: {args.user_email}")
+            sys.exit(1)
+        
+        content = Path(args.path).read_text(encoding="utf-8-sig")
+        fmt = args.format or BulkIngestService.detect_format(args.path)
+        summary = BulkIngestService.ingest(db, user.id, content, fmt)
+        
+        for result in summary["results"]:
+            if result.get("error"):
+                print(f"Row {result['row']}: {result['error']}")
+        
+        print(f"Inserted {summary['inserted']} reports, {summary['failed']} failed")
+        
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
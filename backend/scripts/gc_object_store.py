@@ -0,0 +1,32 @@
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings
+from database import SessionLocal
+from services.storage_service import StorageService, storage_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete unreferenced objects from the image store")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="recompute reference counts from the reports table first")
+    parser.add_argument("--grace-minutes", type=int, default=settings.OBJECT_GC_GRACE_MINUTES)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    
+    try:
+        if args.reconcile:
+            print("Reconciling object reference counts...")
+            print(f"Corrected {StorageService.reconcile_references(db)} reference counts")
+        
+        print(f"Collecting objects unreferenced for {args.grace_minutes} minutes...")
+        result = storage_service.collect_garbage(db, args.grace_minutes)
+        print(f"Deleted {result['unreferenced']} unreferenced objects and {result['orphans']} orphans")
+        
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
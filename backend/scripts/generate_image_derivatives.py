@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from concurrent.futures import as_completed
+from config import settings
+from services.image_derivatives import image_derivative_service
+from services.storage_service import base_object_id, object_path, storage_service
+
+def main():
+    originals = [
+        object_id for object_id, _ in storage_service.backend.iter_objects()
+        if base_object_id(object_id) == object_id and Path(object_id).suffix in settings.ALLOWED_EXTENSIONS
+    ]
+    print(f"Generating derivatives for {len(originals)} stored images...")
+    
+    written = failed = 0
+    try:
+        futures = [image_derivative_service.schedule(object_path(object_id)) for object_id in originals]
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                failed += 1
+            else:
+                written += len(future.result())
+    finally:
+        image_derivative_service.shutdown()
+    
+    print(f"Wrote {written} renditions ({failed} images failed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import or_
+from database import SessionLocal
+from models.report import Report
+from services.storage_service import OBJECT_PATH_PREFIX, StorageService, object_path, storage_service
+
+def store_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    object_id = f"{digest.hexdigest()}{path.suffix.lower()}"
+    
+    backend = storage_service.backend
+    if not backend.exists(object_id):
+        backend.staging_dir.mkdir(parents=True, exist_ok=True)
+        with open(path, "rb") as source, tempfile.NamedTemporaryFile(
+            dir=backend.staging_dir, suffix=".tmp", delete=False
+        ) as tmp:
+            shutil.copyfileobj(source, tmp)
+        backend.put_file(object_id, Path(tmp.name))
+    return object_path(object_id)
+
+def main():
+    db = SessionLocal()
+    
+    try:
+        reports = db.query(Report).filter(or_(
+            Report.image_path.notlike(OBJECT_PATH_PREFIX + "%"),
+            Report.resolution_image_path.notlike(OBJECT_PATH_PREFIX + "%")
+        )).all()
+        print(f"Moving images of {len(reports)} reports into the object store...")
+        
+        moved = missing = 0
+        for report in reports:
+            for column in ("image_path", "resolution_image_path"):
+                path = getattr(report, column)
+                if not path or path.startswith(OBJECT_PATH_PREFIX):
+                    continue
+                if not Path(path).is_file():
+                    print(f"  Report {report.id}: {path} not found, left as is")
+                    missing += 1
+                    continue
+                new_path = store_file(Path(path))
+                StorageService.acquire(db, new_path)
+                setattr(report, column, new_path)
+                moved += 1
+            db.commit()
+        
+        print(f"Moved {moved} images ({missing} missing). Originals in the upload directory were kept;")
+        print("run scripts/generate_image_derivatives.py to build their renditions.")
+        
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
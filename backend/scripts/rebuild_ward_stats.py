@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal
+from services.ward_stats_service import WardStatsService
+
+def main():
+    db = SessionLocal()
+    
+    try:
+        print("Rebuilding ward_stats from reports...")
+        WardStatsService.rebuild(db)
+        print("Ward stats rebuilt")
+        
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
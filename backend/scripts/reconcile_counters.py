@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal
+from services.counter_aggregator import counter_aggregator
+
+def main():
+    db = SessionLocal()
+    
+    try:
+        print("Reconciling report upvote and comment counts...")
+        updated = counter_aggregator.reconcile(db)
+        print(f"Recounted {updated} reports")
+        
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
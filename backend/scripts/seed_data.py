@@ -8,6 +8,7 @@ from models.report import Report, ReportStatus, ReportSeverity, Agency
 from services.auth_service import get_password_hash
 from gis.ward_loader import create_mock_delhi_wards
 from gis.elevation_processor import ElevationProcessor
+from services.ward_stats_service import WardStatsService
 from config import settings
 import random
 from datetime import datetime, timedelta
@@ -121,6 +122,7 @@ def seed_reports(db):
             db.add(report)
     
     db.commit()
+    WardStatsService.rebuild(db)
     print(f"Seeded {len(sample_locations)} reports")
 
 def main():
@@ -0,0 +1,231 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager, suppress
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from config import settings
+from models.audit_log import AuditAction, AuditLog
+
+JOURNAL_GLOB = "audit-*.jsonl"
+
+class _Journal:
+    """One append-only journal file, flocked for as long as its events are not in the database.
+
+    Events in `open` belong to transactions that have not committed yet. Once one commits, a
+    marker line with its event_id follows it; events without a marker are never replayed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Locked under a name recover() does not glob, so it never sees the journal unowned
+        staging = path.with_name(f".{path.name}.tmp")
+        self.fd = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o600)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            os.rename(staging, path)
+        except OSError:
+            os.close(self.fd)
+            with suppress(FileNotFoundError):
+                os.unlink(staging)
+            raise
+        self.events: list[dict] = []
+        self.open: set[str] = set()
+
+    def _write(self, line: dict):
+        os.write(self.fd, (json.dumps(line, separators=(",", ":")) + "\n").encode())
+        os.fsync(self.fd)
+
+    def append(self, event: dict):
+        self._write({**event, "created_at": event["created_at"].isoformat()})
+        self.events.append(event)
+        self.open.add(event["event_id"])
+
+    def resolve(self, event_id: str, committed: bool):
+        self.open.discard(event_id)
+        if committed:
+            self._write({"committed": event_id})
+        else:
+            self.events = [event for event in self.events if event["event_id"] != event_id]
+
+    def discard(self):
+        # Unlink before unlocking so recover() in another process never sees it unowned
+        with suppress(FileNotFoundError):
+            os.unlink(self.path)
+        os.close(self.fd)
+
+def read_journal(file) -> list[dict]:
+    """Events of a journal whose transaction is marked as committed."""
+    events = []
+    committed = set()
+    for line in file:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # Only the last line can be torn, by a crash mid-write
+            continue
+        if "committed" in event:
+            committed.add(event["committed"])
+            continue
+        event["created_at"] = datetime.fromisoformat(event["created_at"])
+        events.append(event)
+    return [event for event in events if event["event_id"] in committed]
+
+class AuditLogWriter:
+    """Append-only audit trail written in batches.
+
+    Events are journaled before the transaction they describe commits, via journaled(), marked
+    committed right after it, and dropped if it rolls back. flush() bulk-inserts the events of
+    journals with no uncommitted events into audit_logs and only then deletes the journal. Every
+    event carries an event_id, so replaying a journal whose insert already committed adds nothing.
+    recover() replays the marked events of journals left behind by a dead process; a crash between
+    a commit and its marker loses that one event rather than inventing an action that never
+    happened.
+    """
+
+    def __init__(self, journal_dir: str, batch_size: int = 500):
+        self.journal_dir = Path(journal_dir)
+        self.batch_size = batch_size
+        self._active: Optional[_Journal] = None
+        self._sealed: list[_Journal] = []
+        self._open: dict[str, _Journal] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, report_id: int, user_id: int, action: AuditAction,
+               old_status: Optional[str] = None, new_status: Optional[str] = None,
+               details: Optional[dict] = None, notes: Optional[str] = None) -> str:
+        """Journal an action whose transaction has not committed yet; resolve() settles it."""
+        event = {
+            "event_id": uuid.uuid4().hex,
+            "report_id": report_id,
+            "user_id": user_id,
+            "action": action.value,
+            "old_status": old_status,
+            "new_status": new_status,
+            "details": details,
+            "notes": notes,
+            "created_at": datetime.now(timezone.utc)
+        }
+        with self._lock:
+            if self._active is None:
+                self.journal_dir.mkdir(parents=True, exist_ok=True)
+                self._active = _Journal(self.journal_dir / f"audit-{uuid.uuid4().hex}.jsonl")
+            self._active.append(event)
+            self._open[event["event_id"]] = self._active
+        return event["event_id"]
+
+    def resolve(self, event_id: str, committed: bool = True):
+        with self._lock:
+            journal = self._open.pop(event_id)
+            try:
+                journal.resolve(event_id, committed)
+            except OSError as e:
+                # The action already committed; flush() still inserts the event from memory
+                print(f"Error marking audit event {event_id}: {e}")
+
+    @contextmanager
+    def journaled(self, *args, **kwargs) -> Iterator[str]:
+        """Journal an event for the commit made inside the block, dropping it if the block raises."""
+        event_id = self.record(*args, **kwargs)
+        try:
+            yield event_id
+        except BaseException:
+            self.resolve(event_id, committed=False)
+            raise
+        self.resolve(event_id)
+
+    def pending(self, report_id: int) -> list[dict]:
+        """Committed events for a report that may not be in audit_logs yet."""
+        with self._lock:
+            journals = self._sealed + ([self._active] if self._active else [])
+            return [dict(event) for journal in journals for event in journal.events
+                    if event["report_id"] == report_id and event["event_id"] not in journal.open]
+
+    def flush(self, db: Session) -> int:
+        with self._flush_lock:
+            with self._lock:
+                if self._active is not None:
+                    self._sealed.append(self._active)
+                    self._active = None
+                # A journal still holding uncommitted events waits for a later flush
+                journals = [journal for journal in self._sealed if not journal.open]
+
+            written = 0
+            for journal in journals:
+                self._insert(db, journal.events)
+                with self._lock:
+                    self._sealed.remove(journal)
+                journal.discard()
+                written += len(journal.events)
+            return written
+
+    def recover(self, db: Session) -> int:
+        """Insert the events of journals no live process holds, then delete them."""
+        if not self.journal_dir.exists():
+            return 0
+        recovered = 0
+        for path in sorted(self.journal_dir.glob(JOURNAL_GLOB)):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                with open(fd, closefd=False) as file:
+                    events = read_journal(file)
+                if events:
+                    self._insert(db, events)
+                with suppress(FileNotFoundError):
+                    os.unlink(path)
+                recovered += len(events)
+            finally:
+                os.close(fd)
+        return recovered
+
+    def _insert(self, db: Session, events: list[dict]):
+        statement = insert(AuditLog).on_conflict_do_nothing(index_elements=[AuditLog.event_id])
+        try:
+            for start in range(0, len(events), self.batch_size):
+                db.execute(statement, events[start:start + self.batch_size])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def flush_with_session(self, session_factory: Callable[[], Session]):
+        db = session_factory()
+        try:
+            self.flush(db)
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session], interval_seconds: float):
+        async def run():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await asyncio.to_thread(self.flush_with_session, session_factory)
+                except Exception as e:
+                    print(f"Error flushing audit log: {e}")
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self, session_factory: Callable[[], Session]):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # On failure the journals stay on disk for recover() at the next start
+        await asyncio.to_thread(self.flush_with_session, session_factory)
+
+audit_log_writer = AuditLogWriter(settings.AUDIT_JOURNAL_DIR, settings.AUDIT_BATCH_SIZE)
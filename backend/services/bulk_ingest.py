@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import numpy as np
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from schemas.report import ReportCreate
+from gis.ward_index import METERS_PER_DEGREE
+from gis.elevation_sampler import elevation_sampler
+from services.tile_service import tile_cache
+from config import settings
+
+STAGING_COLUMNS = ("row_no", "title", "description", "latitude", "longitude", "address", "severity", "elevation")
+
+class BulkIngestService:
+    @staticmethod
+    def detect_format(filename: Optional[str]) -> str:
+        if filename and filename.lower().endswith(".csv"):
+            return "csv"
+        return "jsonl"
+
+    @staticmethod
+    def parse_rows(content: str, fmt: str) -> tuple[list[tuple[int, ReportCreate]], list[dict]]:
+        if fmt == "csv":
+            raw_rows = list(enumerate(csv.DictReader(io.StringIO(content)), start=1))
+        else:
+            raw_rows = [
+                (row_no, line) for row_no, line in enumerate(content.splitlines(), start=1)
+                if line.strip()
+            ]
+
+        if len(raw_rows) > settings.BULK_REPORT_MAX_ROWS:
+            raise ValueError(f"Too many rows. Max: {settings.BULK_REPORT_MAX_ROWS}")
+
+        valid, errors = [], []
+        for row_no, raw in raw_rows:
+            try:
+                data = json.loads(raw) if fmt == "jsonl" else {k: v for k, v in raw.items() if v != ""}
+                valid.append((row_no, ReportCreate.model_validate(data)))
+            except json.JSONDecodeError:
+                errors.append({"row": row_no, "error": "Invalid JSON"})
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"])
+                errors.append({"row": row_no, "error": f"{field}: {first['msg']}" if field else first["msg"]})
+
+        return valid, errors
+
+    @staticmethod
+    def insert_reports(db: Session, user_id: int, rows: list[tuple[int, ReportCreate]]) -> list[dict]:
+        if not rows:
+            return []
+
+        db.execute(text("""
+            CREATE TEMP TABLE report_staging (
+                row_no integer NOT NULL,
+                title text NOT NULL,
+                description text NOT NULL,
+                latitude double precision NOT NULL,
+                longitude double precision NOT NULL,
+                address text,
+                severity text NOT NULL,
+                elevation double precision,
+                report_id integer DEFAULT nextval(pg_get_serial_sequence('reports', 'id')),
+                ward_id integer
+            ) ON COMMIT DROP
+        """))
+        BulkIngestService._copy_into_staging(db, rows)
+
+        db.execute(text("""
+            UPDATE report_staging s SET ward_id = (
+                SELECT w.id FROM wards w
+                WHERE ST_DWithin(w.geometry, ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326), :max_distance)
+                ORDER BY ST_Distance(w.geometry, ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326)), w.id
+                LIMIT 1
+            )
+        """), {"max_distance": settings.WARD_NEAREST_MAX_DISTANCE_METERS / METERS_PER_DEGREE})
+
+        db.execute(text("""
+            INSERT INTO reports (
+                id, user_id, title, description, location, latitude, longitude, address,
+                elevation, ward_id, status, severity, upvote_count, comment_count
+            )
+            SELECT
+                s.report_id, :user_id, s.title, s.description,
+                ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326), s.latitude, s.longitude, s.address,
+                s.elevation, s.ward_id, 'OPEN'::reportstatus, s.severity::reportseverity, 0, 0
+            FROM report_staging s
+            ORDER BY s.row_no
+        """), {"user_id": user_id})
+
+        db.execute(text("""
+            INSERT INTO ward_stats (ward_id, total_reports, open_reports, resolved_reports,
+                                    resolution_hours_sum, resolution_count, updated_at)
+            SELECT ward_id, COUNT(*), COUNT(*), 0, 0, 0, now()
+            FROM report_staging
+            WHERE ward_id IS NOT NULL
+            GROUP BY ward_id
+            ON CONFLICT (ward_id) DO UPDATE SET
+                total_reports = ward_stats.total_reports + EXCLUDED.total_reports,
+                open_reports = ward_stats.open_reports + EXCLUDED.open_reports,
+                updated_at = now()
+        """))
+
+        results = db.execute(text(
+            "SELECT row_no, report_id, ward_id FROM report_staging ORDER BY row_no"
+        )).all()
+        db.commit()
+        tile_cache.invalidate_layer("reports")
+
+        return [{"row": row_no, "report_id": report_id, "ward_id": ward_id} for row_no, report_id, ward_id in results]
+
+    @staticmethod
+    def _sample_elevations(rows: list[tuple[int, ReportCreate]]) -> list[Optional[float]]:
+        try:
+            elevations = elevation_sampler.sample([(r.longitude, r.latitude) for _, r in rows])
+        except Exception as e:
+            # Elevation is optional, as for single reports, so a sampler failure does not fail the batch
+            print(f"Error sampling elevation: {e}")
+            return [None] * len(rows)
+        return [None if np.isnan(elevation) else float(elevation) for elevation in elevations]
+
+    @staticmethod
+    def _copy_into_staging(db: Session, rows: list[tuple[int, ReportCreate]]):
+        elevations = BulkIngestService._sample_elevations(rows)
+        values = [
+            (row_no, r.title, r.description, r.latitude, r.longitude, r.address, r.severity.value, elevation)
+            for (row_no, r), elevation in zip(rows, elevations)
+        ]
+        cursor = db.connection().connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(values)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY report_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            else:
+                placeholders = ", ".join(["%s"] * len(STAGING_COLUMNS))
+                cursor.executemany(
+                    f"INSERT INTO report_staging ({', '.join(STAGING_COLUMNS)}) VALUES ({placeholders})",
+                    values
+                )
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def ingest(db: Session, user_id: int, content: str, fmt: str) -> dict:
+        valid, errors = BulkIngestService.parse_rows(content, fmt)
+        inserted = BulkIngestService.insert_reports(db, user_id, valid)
+
+        return {
+            "inserted": len(inserted),
+            "failed": len(errors),
+            "results": sorted(inserted + errors, key=lambda r: r["row"])
+        }
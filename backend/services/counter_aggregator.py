@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+UPVOTES = 0
+COMMENTS = 1
+
+# pg_advisory_xact_lock key: shared by transactions that write upvotes or comments, exclusive for reconcile()
+RECONCILE_LOCK_KEY = 0x5245_434E
+
+class CounterAggregator:
+    """Buffers upvote/comment count deltas per report and applies them in periodic batched UPDATEs.
+
+    Buffered deltas are lost if the process dies, so reconcile() recomputes counts from the
+    upvotes and comments tables for recently touched reports at startup.
+
+    Other processes may hold deltas for rows reconcile() has just counted. Each delta is tagged
+    with the report's counters_epoch, read under lock_for_write() in the transaction that wrote the
+    row; reconcile() bumps the epoch of every report it recounts, even when the stored count looks
+    right (a lost -1 and a buffered +1 cancel out), and flush() only applies deltas whose epoch
+    still matches, so a recounted report never has the same rows added again.
+    """
+
+    def __init__(self):
+        self._deltas: dict[tuple[int, int], list[int]] = defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def lock_for_write(db: Session):
+        """Hold off reconcile() until the current transaction ends; call before writing upvotes or comments."""
+        db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": RECONCILE_LOCK_KEY})
+
+    def add(self, report_id: int, upvotes: int = 0, comments: int = 0, epoch: int = 0):
+        with self._lock:
+            delta = self._deltas[(report_id, epoch)]
+            delta[UPVOTES] += upvotes
+            delta[COMMENTS] += comments
+
+    def pending(self, report_id: int) -> tuple[int, int]:
+        with self._lock:
+            epochs = [epoch for (rid, epoch) in self._deltas if rid == report_id]
+            if not epochs:
+                return (0, 0)
+            # Deltas from an older epoch are superseded by a reconcile and will not be applied
+            delta = self._deltas[(report_id, max(epochs))]
+            return (delta[UPVOTES], delta[COMMENTS])
+
+    def apply_pending(self, reports: Iterable):
+        """Show this process's buffered deltas on loaded reports, like add_upvote's returned count.
+
+        Only deltas under the report's current epoch will ever be flushed. The counts are set as
+        committed values, so the session never writes them back on top of the deltas.
+        """
+        with self._lock:
+            pending = [(report, self._deltas.get((report.id, report.counters_epoch))) for report in reports]
+        for report, delta in pending:
+            if delta is not None:
+                set_committed_value(report, "upvote_count", report.upvote_count + delta[UPVOTES])
+                set_committed_value(report, "comment_count", report.comment_count + delta[COMMENTS])
+
+    def flush(self, db: Session) -> int:
+        with self._lock:
+            deltas, self._deltas = self._deltas, defaultdict(lambda: [0, 0])
+
+        rows = [(report_id, epoch, d[UPVOTES], d[COMMENTS])
+                for (report_id, epoch), d in deltas.items() if any(d)]
+        if not rows:
+            return 0
+
+        try:
+            db.execute(text("""
+                UPDATE reports SET
+                    upvote_count = reports.upvote_count + v.upvotes,
+                    comment_count = reports.comment_count + v.comments
+                FROM unnest(CAST(:ids AS integer[]), CAST(:epochs AS integer[]),
+                            CAST(:upvotes AS integer[]), CAST(:comments AS integer[]))
+                    AS v(id, epoch, upvotes, comments)
+                WHERE reports.id = v.id AND reports.counters_epoch = v.epoch
+            """), {
+                "ids": [row[0] for row in rows],
+                "epochs": [row[1] for row in rows],
+                "upvotes": [row[2] for row in rows],
+                "comments": [row[3] for row in rows]
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            for report_id, epoch, upvotes, comments in rows:
+                self.add(report_id, upvotes, comments, epoch)
+            raise
+        return len(rows)
+
+    def reconcile(self, db: Session, since_minutes: Optional[int] = None) -> int:
+        # Waits for in-flight upvote/comment transactions, so every committed row is counted below
+        # and every delta buffered for it carries an epoch older than the one set here
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+        recent = ""
+        if since_minutes is not None:
+            recent = """
+                AND reports.id IN (
+                    SELECT report_id FROM upvotes WHERE created_at >= now() - make_interval(mins => :minutes)
+                    UNION
+                    SELECT report_id FROM comments WHERE created_at >= now() - make_interval(mins => :minutes)
+                )
+            """
+        result = db.execute(text(f"""
+            UPDATE reports SET
+                upvote_count = counts.upvotes,
+                comment_count = counts.comments,
+                counters_epoch = reports.counters_epoch + 1
+            FROM (
+                SELECT
+                    reports.id,
+                    (SELECT COUNT(*) FROM upvotes WHERE upvotes.report_id = reports.id) AS upvotes,
+                    (SELECT COUNT(*) FROM comments WHERE comments.report_id = reports.id) AS comments
+                FROM reports
+                WHERE TRUE {recent}
+            ) AS counts
+            WHERE reports.id = counts.id
+        """), {"minutes": since_minutes})
+        db.commit()
+        return result.rowcount
+
+    def flush_with_session(self, session_factory: Callable[[], Session]):
+        db = session_factory()
+        try:
+            self.flush(db)
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session], interval_seconds: float):
+        async def run():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await asyncio.to_thread(self.flush_with_session, session_factory)
+                except Exception as e:
+                    print(f"Error flushing report counters: {e}")
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self, session_factory: Callable[[], Session]):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush_with_session, session_factory)
+
+counter_aggregator = CounterAggregator()
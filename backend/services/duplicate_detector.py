@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.report import Report, ReportStatus
+from config import settings
+
+METERS_PER_DEGREE = 111_320.0
+EARTH_RADIUS_METERS = 6_371_000.0
+
+def haversine_meters(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+class RecentReportIndex:
+    """Grid hash of recent open reports, for finding likely duplicates of a new report in memory.
+
+    Cells are radius_meters tall in latitude and the same number of degrees wide, so a lookup
+    scans the 3-row band around the point and as many columns as the radius spans at its latitude.
+    Each process keeps its own index; sync() pulls reports other processes created since the last
+    call, and callers confirm candidates against the database before merging into them.
+    """
+
+    def __init__(self, radius_meters: float, window_minutes: int):
+        self.radius_meters = radius_meters
+        self.window_seconds = window_minutes * 60
+        self.cell_degrees = radius_meters / METERS_PER_DEGREE
+        self._cells: dict[tuple[int, int], dict[int, tuple[float, float, float]]] = defaultdict(dict)
+        self._cell_of: dict[int, tuple[int, int]] = {}
+        self._last_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _cell(self, longitude: float, latitude: float) -> tuple[int, int]:
+        return (math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees))
+
+    def add(self, report_id: int, longitude: float, latitude: float, created_at: float):
+        cell = self._cell(longitude, latitude)
+        with self._lock:
+            self._add(report_id, cell, (longitude, latitude, created_at))
+
+    def _add(self, report_id: int, cell: tuple[int, int], entry: tuple[float, float, float]):
+        self._cells[cell][report_id] = entry
+        self._cell_of[report_id] = cell
+        if self._last_id is not None:
+            self._last_id = max(self._last_id, report_id)
+
+    def discard(self, report_id: int):
+        with self._lock:
+            cell = self._cell_of.pop(report_id, None)
+            if cell is not None:
+                self._cells[cell].pop(report_id, None)
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+    def candidates(self, longitude: float, latitude: float, now: Optional[float] = None) -> list[int]:
+        """Recent report ids within radius_meters of the point, nearest first."""
+        now = time.time() if now is None else now
+        row, col = self._cell(longitude, latitude)
+        # A degree of longitude shrinks with cos(latitude), so the radius spans more columns
+        span = math.ceil(1 / max(math.cos(math.radians(latitude)), 1e-6))
+        found = []
+        with self._lock:
+            for r in range(row - 1, row + 2):
+                for c in range(col - span, col + span + 1):
+                    for report_id, (lon, lat, created_at) in self._cells.get((r, c), {}).items():
+                        if now - created_at > self.window_seconds:
+                            continue
+                        distance = haversine_meters(longitude, latitude, lon, lat)
+                        if distance <= self.radius_meters:
+                            found.append((distance, report_id))
+        return [report_id for _, report_id in sorted(found)]
+
+    def sync(self, db: Session):
+        """Index open reports created since the last sync, and forget those past the window."""
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            last_id = self._last_id
+        query = select(Report.id, Report.longitude, Report.latitude, Report.created_at).where(
+            Report.status == ReportStatus.OPEN,
+            Report.created_at >= datetime.fromtimestamp(cutoff, timezone.utc)
+        )
+        if last_id is not None:
+            # A report committing after a higher id was synced is missed; fine for a duplicate heuristic
+            query = query.where(Report.id > last_id)
+        rows = db.execute(query).all()
+
+        with self._lock:
+            for report_id, longitude, latitude, created_at in rows:
+                self._add(report_id, self._cell(longitude, latitude), (longitude, latitude, created_at.timestamp()))
+            self._last_id = max([last_id or 0, self._last_id or 0] + [row.id for row in rows])
+            self._prune(cutoff)
+
+    def _prune(self, cutoff: float):
+        for cell in list(self._cells):
+            entries = self._cells[cell]
+            for report_id in [rid for rid, entry in entries.items() if entry[2] < cutoff]:
+                del entries[report_id]
+                del self._cell_of[report_id]
+            if not entries:
+                del self._cells[cell]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cell_of)
+
+recent_report_index = RecentReportIndex(settings.DUPLICATE_RADIUS_METERS, settings.DUPLICATE_WINDOW_MINUTES)
@@ -0,0 +1,88 @@
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from PIL import Image, ImageOps
+from config import settings
+from services.object_store import ObjectStoreBackend
+from object_paths import derivative_id, object_id_from_path
+from services.storage_service import storage_service
+
+# name -> (longest side in pixels, WebP quality)
+RENDITIONS = {
+    "thumb": (320, 70),
+    "medium": (1280, 80),
+}
+
+def generate_derivatives(object_id: str, backend: ObjectStoreBackend) -> list[str]:
+    """Store the missing WebP renditions of an image; runs in a worker process.
+
+    Renditions are re-encoded from pixels only, so EXIF (including GPS) never reaches them;
+    orientation is applied to the pixels first.
+    """
+    missing = [name for name in RENDITIONS if not backend.exists(derivative_id(object_id, name))]
+    if not missing:
+        return []
+
+    backend.staging_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=backend.staging_dir) as workdir:
+        source = backend.local_path(object_id)
+        if source is None:
+            source = Path(workdir) / object_id
+            backend.download(object_id, source)
+
+        largest = max(RENDITIONS[name][0] for name in missing)
+        with Image.open(source) as original:
+            # JPEG decodes straight to a reduced scale, skipping most of a phone photo's pixels
+            original.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        written = []
+        for name in missing:
+            size, quality = RENDITIONS[name]
+            rendition = image.copy()
+            rendition.thumbnail((size, size), Image.Resampling.LANCZOS)
+            rendition_path = Path(workdir) / f"{name}.webp"
+            rendition.save(rendition_path, "WEBP", quality=quality, method=4)
+            backend.put_file(derivative_id(object_id, name), rendition_path)
+            written.append(derivative_id(object_id, name))
+        return written
+
+class ImageDerivativeService:
+    """Generates thumbnails and medium renditions of uploaded images in a background process pool."""
+
+    def __init__(self, workers: int, backend: ObjectStoreBackend):
+        self.workers = workers
+        self.backend = backend
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def schedule(self, image_path: str) -> Optional[Future]:
+        object_id = object_id_from_path(image_path)
+        if object_id is None:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: the API process runs threads that a forked child would inherit mid-state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            future = self._executor.submit(generate_derivatives, object_id, self.backend)
+        future.add_done_callback(lambda f: self._report_failure(image_path, f))
+        return future
+
+    def _report_failure(self, image_path: str, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error generating derivatives for {image_path}: {future.exception()}")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+image_derivative_service = ImageDerivativeService(settings.IMAGE_DERIVATIVE_WORKERS, storage_service.backend)
@@ -0,0 +1,319 @@
+import errno
+import hashlib
+import hmac
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+from urllib.parse import quote
+from xml.etree import ElementTree
+import httpx
+from config import settings
+from object_paths import OBJECT_ID
+
+class ObjectInfo(NamedTuple):
+    size: int
+    modified: float
+
+class ObjectStoreError(Exception):
+    pass
+
+def shard_key(object_id: str) -> str:
+    # Two levels of 256-way fan-out keep every directory small even with millions of objects
+    return f"{object_id[:2]}/{object_id[2:4]}/{object_id}"
+
+def content_type_for(object_id: str) -> str:
+    return mimetypes.guess_type(object_id)[0] or "application/octet-stream"
+
+class ObjectStoreBackend(ABC):
+    """Immutable objects addressed by content hash.
+
+    put_file consumes the local file it is given; staging_dir is where callers should create
+    those files so the local backend can rename them into place.
+    """
+
+    staging_dir: Path
+
+    @abstractmethod
+    def put_file(self, object_id: str, path: Path):
+        pass
+
+    @abstractmethod
+    def stat(self, object_id: str) -> Optional[ObjectInfo]:
+        pass
+
+    def exists(self, object_id: str) -> bool:
+        return self.stat(object_id) is not None
+
+    @abstractmethod
+    def iter_range(self, object_id: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Bytes start..end inclusive."""
+
+    @abstractmethod
+    def download(self, object_id: str, path: Path):
+        pass
+
+    def local_path(self, object_id: str) -> Optional[Path]:
+        return None
+
+    @abstractmethod
+    def delete(self, object_id: str):
+        pass
+
+    @abstractmethod
+    def iter_objects(self) -> Iterator[tuple[str, ObjectInfo]]:
+        pass
+
+class LocalBackend(ObjectStoreBackend):
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.staging_dir = self.root / ".staging"
+
+    def _path(self, object_id: str) -> Path:
+        return self.root / shard_key(object_id)
+
+    def put_file(self, object_id: str, path: Path):
+        target = self._path(object_id)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            tmp_path = target.with_name(f".{target.name}.tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+            os.remove(path)
+
+    def stat(self, object_id: str) -> Optional[ObjectInfo]:
+        try:
+            st = os.stat(self._path(object_id))
+        except FileNotFoundError:
+            return None
+        return ObjectInfo(size=st.st_size, modified=st.st_mtime)
+
+    def iter_range(self, object_id: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(self._path(object_id), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def download(self, object_id: str, path: Path):
+        shutil.copyfile(self._path(object_id), path)
+
+    def local_path(self, object_id: str) -> Optional[Path]:
+        return self._path(object_id)
+
+    def delete(self, object_id: str):
+        try:
+            os.remove(self._path(object_id))
+        except FileNotFoundError:
+            pass
+
+    def iter_objects(self) -> Iterator[tuple[str, ObjectInfo]]:
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if not d.startswith(".")]
+            for name in files:
+                if OBJECT_ID.match(name):
+                    st = os.stat(os.path.join(directory, name))
+                    yield name, ObjectInfo(size=st.st_size, modified=st.st_mtime)
+
+class S3Backend(ObjectStoreBackend):
+    """S3-compatible object storage over plain HTTP with SigV4 signing and path-style addressing."""
+
+    def __init__(self, endpoint_url: str, bucket: str, access_key_id: str, secret_access_key: str,
+                 region: str = "us-east-1", part_size: int = 8 * 1024 * 1024,
+                 multipart_threshold: int = 8 * 1024 * 1024, timeout: float = 30.0):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = httpx.URL(self.endpoint_url).netloc.decode()
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.part_size = part_size
+        self.multipart_threshold = multipart_threshold
+        self.timeout = timeout
+        self.staging_dir = Path(tempfile.gettempdir())
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable for process pool workers, which open their own connection pool
+        state = self.__dict__.copy()
+        state["_client"], state["_lock"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def put_file(self, object_id: str, path: Path):
+        size = os.path.getsize(path)
+        headers = {"Content-Type": content_type_for(object_id)}
+        try:
+            if size <= self.multipart_threshold:
+                with open(path, "rb") as f:
+                    self._request("PUT", object_id, headers=headers, content=f.read())
+            else:
+                self._put_multipart(object_id, path, headers)
+        finally:
+            os.remove(path)
+
+    def _put_multipart(self, object_id: str, path: Path, headers: dict):
+        response = self._request("POST", object_id, query={"uploads": ""}, headers=headers)
+        upload_id = ElementTree.fromstring(response.content).findtext("{*}UploadId")
+        try:
+            parts = []
+            with open(path, "rb") as f:
+                while chunk := f.read(self.part_size):
+                    part_number = len(parts) + 1
+                    response = self._request(
+                        "PUT", object_id, query={"partNumber": str(part_number), "uploadId": upload_id}, content=chunk
+                    )
+                    parts.append((part_number, response.headers["ETag"]))
+            body = "<CompleteMultipartUpload>" + "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>" for number, etag in parts
+            ) + "</CompleteMultipartUpload>"
+            self._request("POST", object_id, query={"uploadId": upload_id}, content=body.encode())
+        except Exception:
+            self._request("DELETE", object_id, query={"uploadId": upload_id}, expected=(204, 404))
+            raise
+
+    def stat(self, object_id: str) -> Optional[ObjectInfo]:
+        response = self._request("HEAD", object_id, expected=(200, 404))
+        if response.status_code == 404:
+            return None
+        modified = response.headers.get("Last-Modified")
+        return ObjectInfo(
+            size=int(response.headers["Content-Length"]),
+            modified=parsedate_to_datetime(modified).timestamp() if modified else 0.0
+        )
+
+    def iter_range(self, object_id: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        request = self._build_request("GET", object_id, headers={"Range": f"bytes={start}-{end}"})
+        response = self._http().send(request, stream=True)
+        try:
+            self._check(response, (200, 206))
+            yield from response.iter_bytes(chunk_size)
+        finally:
+            response.close()
+
+    def download(self, object_id: str, path: Path):
+        request = self._build_request("GET", object_id)
+        response = self._http().send(request, stream=True)
+        try:
+            self._check(response, (200,))
+            with open(path, "wb") as f:
+                for chunk in response.iter_bytes(1024 * 1024):
+                    f.write(chunk)
+        finally:
+            response.close()
+
+    def delete(self, object_id: str):
+        self._request("DELETE", object_id, expected=(200, 204, 404))
+
+    def iter_objects(self) -> Iterator[tuple[str, ObjectInfo]]:
+        token = None
+        while True:
+            query = {"list-type": "2"}
+            if token:
+                query["continuation-token"] = token
+            root = ElementTree.fromstring(self._request("GET", query=query).content)
+            for item in root.iterfind("{*}Contents"):
+                name = item.findtext("{*}Key").rsplit("/", 1)[-1]
+                if OBJECT_ID.match(name):
+                    modified = datetime.fromisoformat(item.findtext("{*}LastModified").replace("Z", "+00:00"))
+                    yield name, ObjectInfo(size=int(item.findtext("{*}Size")), modified=modified.timestamp())
+            if root.findtext("{*}IsTruncated") != "true":
+                return
+            token = root.findtext("{*}NextContinuationToken")
+
+    def _http(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout)
+            return self._client
+
+    def _request(self, method: str, object_id: Optional[str] = None, query: Optional[dict] = None,
+                 headers: Optional[dict] = None, content: Optional[bytes] = None,
+                 expected: tuple = (200,)) -> httpx.Response:
+        response = self._http().send(self._build_request(method, object_id, query, headers, content))
+        self._check(response, expected)
+        return response
+
+    def _check(self, response: httpx.Response, expected: tuple):
+        if response.status_code not in expected:
+            response.read()
+            raise ObjectStoreError(
+                f"{response.request.method} {response.request.url.path} failed with {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+
+    def _build_request(self, method: str, object_id: Optional[str] = None, query: Optional[dict] = None,
+                       headers: Optional[dict] = None, content: Optional[bytes] = None) -> httpx.Request:
+        path = quote(f"/{self.bucket}" + (f"/{shard_key(object_id)}" if object_id else ""), safe="/-_.~")
+        canonical_query = "&".join(
+            f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}" for key, value in sorted((query or {}).items())
+        )
+        now = datetime.now(timezone.utc)
+        signed_headers = {
+            **{key.lower(): value for key, value in (headers or {}).items()},
+            "host": self.host,
+            "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+        }
+        signed_headers["authorization"] = self._authorization(method, path, canonical_query, signed_headers, now)
+        url = self.endpoint_url + path + (f"?{canonical_query}" if canonical_query else "")
+        return self._http().build_request(method, url, headers=signed_headers, content=content)
+
+    def _authorization(self, method: str, path: str, canonical_query: str, headers: dict, now: datetime) -> str:
+        names = sorted(headers)
+        canonical_request = "\n".join([
+            method,
+            path,
+            canonical_query,
+            "".join(f"{name}:{str(headers[name]).strip()}\n" for name in names),
+            ";".join(names),
+            headers["x-amz-content-sha256"],
+        ])
+        scope = f"{now:%Y%m%d}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            headers["x-amz-date"],
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in (f"{now:%Y%m%d}", self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+
+def create_backend(backend: str) -> ObjectStoreBackend:
+    if backend == "s3":
+        if not settings.S3_ENDPOINT_URL or not settings.S3_BUCKET:
+            raise ValueError("S3_ENDPOINT_URL and S3_BUCKET are required for the s3 object store backend")
+        return S3Backend(
+            settings.S3_ENDPOINT_URL,
+            settings.S3_BUCKET,
+            settings.S3_ACCESS_KEY_ID or "",
+            settings.S3_SECRET_ACCESS_KEY or "",
+            region=settings.S3_REGION,
+            part_size=settings.S3_PART_SIZE,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD
+        )
+    return LocalBackend(settings.OBJECT_STORE_DIR)
@@ -0,0 +1,172 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import MutableHeaders
+from config import settings
+
+WHITESPACE = re.compile(r"\s+")
+
+class RequestQueries:
+    """Queries run on behalf of one HTTP request."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+def _record_pool_wait(seconds: float):
+    request = _current_request.get()
+    if request is not None:
+        request.pool_wait_seconds += seconds
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that charges the time spent waiting for a checkout to the current request."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_pool_wait(time.perf_counter() - started)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_pool_wait(time.perf_counter() - started)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request = _current_request.get()
+    started = conn.info.pop("query_started", None)
+    if request is None or started is None:
+        return
+    request.count += 1
+    request.db_seconds += time.perf_counter() - started
+    request.statements[WHITESPACE.sub(" ", statement).strip()] += 1
+
+class QueryMetrics:
+    """Per-route query counts, DB time, pool wait and repeated-statement (N+1) patterns.
+
+    Statements are compared by their SQL text with bound parameters left in place, so the same
+    lazy load issued once per row shows up as one statement repeated many times.
+    """
+
+    SAMPLE_LENGTH = 300
+
+    def __init__(self, n_plus_one_threshold: int):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._routes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, engine):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def record(self, route: str, request: RequestQueries):
+        repeated = request.repeated_statements(self.n_plus_one_threshold)
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_seconds": 0.0,
+                    "pool_wait_seconds": 0.0,
+                    "max_pool_wait_seconds": 0.0,
+                    "n_plus_one_requests": 0,
+                    "repeated_statements": []
+                }
+            stats["requests"] += 1
+            stats["queries"] += request.count
+            stats["max_queries"] = max(stats["max_queries"], request.count)
+            stats["db_seconds"] += request.db_seconds
+            stats["pool_wait_seconds"] += request.pool_wait_seconds
+            stats["max_pool_wait_seconds"] = max(stats["max_pool_wait_seconds"], request.pool_wait_seconds)
+            if repeated:
+                stats["n_plus_one_requests"] += 1
+                stats["repeated_statements"] = [
+                    {"statement": statement[:self.SAMPLE_LENGTH], "count": count} for statement, count in repeated
+                ]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in self._routes.items()}
+        for stats in routes.values():
+            requests = stats["requests"]
+            stats["avg_queries"] = stats["queries"] / requests
+            stats["avg_db_ms"] = stats.pop("db_seconds") / requests * 1000
+            stats["avg_pool_wait_ms"] = stats.pop("pool_wait_seconds") / requests * 1000
+            stats["max_pool_wait_ms"] = stats.pop("max_pool_wait_seconds") * 1000
+        return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+class QueryMetricsMiddleware:
+    """Collects the queries of each HTTP request and optionally reports them in response headers."""
+
+    def __init__(self, app, metrics: QueryMetrics, debug_headers: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestQueries()
+        token = _current_request.set(request)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(request.count))
+                headers.append("Server-Timing", (
+                    f'db;dur={request.db_seconds * 1000:.1f};desc="{request.count} queries", '
+                    f'db-pool;dur={request.pool_wait_seconds * 1000:.1f}'
+                ))
+                repeated = request.repeated_statements(self.metrics.n_plus_one_threshold)
+                if repeated:
+                    headers.append("X-DB-N-Plus-One", str(len(repeated)))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if self.debug_headers else send)
+        finally:
+            _current_request.reset(token)
+            self.metrics.record(self._route_name(scope), request)
+
+    def _route_name(self, scope) -> str:
+        # Route templates rather than raw paths, so /reports/1 and /reports/2 aggregate together
+        route = scope.get("route")
+        if route is None:
+            endpoint = scope.get("endpoint")
+            app = scope.get("app")
+            route = next(
+                (r for r in getattr(app, "routes", []) if endpoint is not None and getattr(r, "endpoint", None) is endpoint),
+                None
+            )
+        path = getattr(route, "path", None) or "unmatched"
+        return f"{scope['method']} {path}"
+
+query_metrics = QueryMetrics(settings.N_PLUS_ONE_THRESHOLD)
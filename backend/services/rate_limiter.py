@@ -1,37 +1,252 @@
-from datetime import datetime, timedelta
-from typing import Dict
-from collections import defaultdict
+import asyncio
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+from config import settings
+
+class RateLimitBackend(ABC):
+    """Storage for sliding-window counters: one current and one previous window count per key."""
+
+    @abstractmethod
+    def increment(self, key: str, window_id: int, ttl_seconds: int) -> tuple[int, int]:
+        """Count a hit in window_id and return (current window count, previous window count)."""
+
+    @abstractmethod
+    def decrement(self, key: str, window_id: int):
+        pass
+
+    def cleanup(self):
+        pass
+
+class InMemoryBackend(RateLimitBackend):
+    PRUNE_EVERY = 10000
 
-class RateLimiter:
     def __init__(self):
-        self.requests: Dict[str, list[datetime]] = defaultdict(list)
-    
+        # key -> [window_id, current_count, previous_count, expires_at]
+        self._counters: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._operations = 0
+
+    def increment(self, key: str, window_id: int, ttl_seconds: int) -> tuple[int, int]:
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < window_id - 1:
+                counter = [window_id, 0, 0, 0.0]
+                self._counters[key] = counter
+            elif counter[0] == window_id - 1:
+                counter[0], counter[1], counter[2] = window_id, 0, counter[1]
+            counter[1] += 1
+            counter[3] = time.monotonic() + ttl_seconds
+
+            self._operations += 1
+            if self._operations % self.PRUNE_EVERY == 0:
+                self._prune()
+            return counter[1], counter[2]
+
+    def decrement(self, key: str, window_id: int):
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == window_id and counter[1] > 0:
+                counter[1] -= 1
+
+    def cleanup(self):
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, counter in self._counters.items() if counter[3] < now]:
+            del self._counters[key]
+
+class SQLiteBackend(RateLimitBackend):
+    """Shares counters between worker processes on one host through a WAL-mode SQLite file."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT NOT NULL,
+                window_id INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (key, window_id)
+            ) WITHOUT ROWID
+        """)
+        self._lock = threading.Lock()
+        self._operations = 0
+
+    def increment(self, key: str, window_id: int, ttl_seconds: int) -> tuple[int, int]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("""
+                    INSERT INTO rate_limits (key, window_id, count, expires_at) VALUES (?, ?, 1, ?)
+                    ON CONFLICT (key, window_id) DO UPDATE SET count = count + 1
+                """, (key, window_id, time.time() + ttl_seconds))
+                rows = dict(self._conn.execute(
+                    "SELECT window_id, count FROM rate_limits WHERE key = ? AND window_id IN (?, ?)",
+                    (key, window_id, window_id - 1)
+                ).fetchall())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._operations += 1
+            if self._operations % self.PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (time.time(),))
+            return rows.get(window_id, 0), rows.get(window_id - 1, 0)
+
+    def decrement(self, key: str, window_id: int):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE rate_limits SET count = count - 1 WHERE key = ? AND window_id = ? AND count > 0",
+                (key, window_id)
+            )
+
+    def cleanup(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (time.time(),))
+
+class RedisBackend(RateLimitBackend):
+    """Speaks the Redis protocol (RESP) directly, so any Redis-compatible server works."""
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def increment(self, key: str, window_id: int, ttl_seconds: int) -> tuple[int, int]:
+        current_key, previous_key = f"ratelimit:{key}:{window_id}", f"ratelimit:{key}:{window_id - 1}"
+        current, _, previous = self._pipeline(
+            ("INCR", current_key),
+            ("EXPIRE", current_key, ttl_seconds),
+            ("GET", previous_key)
+        )
+        return int(current), int(previous or 0)
+
+    def decrement(self, key: str, window_id: int):
+        self._pipeline(("DECR", f"ratelimit:{key}:{window_id}"))
+
+    def _pipeline(self, *commands) -> list:
+        with self._lock:
+            try:
+                self._connect()
+                self._sock.sendall(b"".join(self._encode(command) for command in commands))
+                return [self._read_reply() for _ in commands]
+            except (OSError, ConnectionError):
+                self._close()
+                raise
+
+    def _connect(self):
+        if self._sock is not None:
+            return
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._sock.sendall(b"".join(self._encode(command) for command in setup))
+            for _ in setup:
+                self._read_reply()
+
+    def _close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock, self._reader = None, None
+
+    def _encode(self, command: tuple) -> bytes:
+        parts = [str(arg).encode() for arg in command]
+        return b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(p), p) for p in parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by rate limit server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RuntimeError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2].decode()
+        if prefix == b"*":
+            return [self._read_reply() for _ in range(int(payload))]
+        raise ConnectionError(f"Unexpected reply from rate limit server: {line!r}")
+
+class RateLimiter:
+    """Sliding-window counter: the previous window's count is weighted by how much of it still overlaps.
+
+    While the configured backend is failing, hits are counted by an in-process fallback, so an
+    unavailable Redis or locked SQLite file limits per worker instead of failing requests.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or InMemoryBackend()
+        self.fallback = InMemoryBackend()
+
     def is_allowed(self, key: str, max_requests: int, window_minutes: int = 60) -> bool:
-        now = datetime.utcnow()
-        window_start = now - timedelta(minutes=window_minutes)
-        
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
-        ]
-        
-        if len(self.requests[key]) >= max_requests:
+        window_seconds = window_minutes * 60
+        now = time.time()
+        window_id = int(now // window_seconds)
+        elapsed = (now % window_seconds) / window_seconds
+
+        backend = self.backend
+        try:
+            current, previous = backend.increment(key, window_id, window_seconds * 2)
+        except Exception as e:
+            print(f"Error in rate limit backend, using in-process counters: {e}")
+            backend = self.fallback
+            current, previous = backend.increment(key, window_id, window_seconds * 2)
+        if previous * (1 - elapsed) + current > max_requests:
+            try:
+                backend.decrement(key, window_id)
+            except Exception as e:
+                print(f"Error in rate limit backend: {e}")
             return False
-        
-        self.requests[key].append(now)
         return True
-    
+
+    async def is_allowed_async(self, key: str, max_requests: int, window_minutes: int = 60) -> bool:
+        """is_allowed() for async routes; shared backends do blocking I/O, so they run in a thread."""
+        if isinstance(self.backend, InMemoryBackend):
+            return self.is_allowed(key, max_requests, window_minutes)
+        return await asyncio.to_thread(self.is_allowed, key, max_requests, window_minutes)
+
     def cleanup_old_entries(self):
-        now = datetime.utcnow()
-        cutoff = now - timedelta(hours=2)
-        
-        keys_to_delete = []
-        for key, timestamps in self.requests.items():
-            self.requests[key] = [t for t in timestamps if t > cutoff]
-            if not self.requests[key]:
-                keys_to_delete.append(key)
-        
-        for key in keys_to_delete:
-            del self.requests[key]
-
-rate_limiter = RateLimiter()
+        self.backend.cleanup()
+
+def create_backend(backend: str) -> RateLimitBackend:
+    if backend == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    if backend == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_REDIS_URL is required for the redis rate limit backend")
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryBackend()
+
+rate_limiter = RateLimiter(create_backend(settings.RATE_LIMIT_BACKEND))
@@ -1,18 +1,36 @@
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from geoalchemy2.functions import ST_Distance, ST_MakePoint, ST_DWithin
+from sqlalchemy import and_, or_, func, tuple_, select, delete
+from sqlalchemy.dialects.postgresql import insert
+from geoalchemy2.functions import ST_Distance, ST_DWithin
 from models.report import Report, ReportStatus
 from models.ward import Ward
-from datetime import datetime
+from models.upvote import Upvote
+from models.comment import Comment
+from models.audit_log import AuditAction, AuditLog
+from gis.ward_index import ward_index
+from gis.spatial_queries import as_geography, geography_point
+from gis.elevation_sampler import elevation_sampler
+from services.tile_service import tile_cache
+from services.ward_stats_service import WardStatsService
+from services.storage_service import StorageService
+from services.counter_aggregator import counter_aggregator
+from services.audit_log_writer import audit_log_writer
+from services.duplicate_detector import recent_report_index
+from services.pagination import CountCache, decode_cursor, encode_cursor, estimate_count
+from config import settings
+from datetime import datetime, timezone
+
+report_count_cache = CountCache(settings.REPORT_COUNT_CACHE_SECONDS)
 
 class ReportService:
     @staticmethod
     def create_report(db: Session, user_id: int, title: str, description: str, 
                      latitude: float, longitude: float, address: Optional[str],
-                     severity: str, image_path: Optional[str] = None) -> Report:
+                     severity: str, image_path: Optional[str] = None,
+                     elevation: Optional[float] = None) -> Report:
         
-        ward = ReportService.find_ward_for_location(db, latitude, longitude)
+        ward_id = ReportService.find_ward_id_for_location(db, latitude, longitude)
         
         report = Report(
             user_id=user_id,
@@ -22,29 +40,65 @@ class ReportService:
             longitude=longitude,
             location=f'POINT({longitude} {latitude})',
             address=address,
-            ward_id=ward.id if ward else None,
+            elevation=elevation,
+            ward_id=ward_id,
             severity=severity,
             image_path=image_path
         )
         db.add(report)
+        WardStatsService.record_report_created(db, ward_id)
+        StorageService.acquire(db, image_path)
         db.commit()
         db.refresh(report)
+        tile_cache.invalidate_point("reports", longitude, latitude)
+        recent_report_index.add(report.id, longitude, latitude, report.created_at.timestamp())
+        return report
+    
+    @staticmethod
+    def find_duplicate_report(db: Session, latitude: float, longitude: float) -> Optional[Report]:
+        """The nearest open report in the duplicate radius and time window, if any."""
+        recent_report_index.sync(db)
+        for report_id in recent_report_index.candidates(longitude, latitude):
+            report = db.get(Report, report_id)
+            if report is not None and report.status == ReportStatus.OPEN:
+                return report
+            recent_report_index.discard(report_id)
+        return None
+    
+    @staticmethod
+    def merge_duplicate(db: Session, report: Report, user_id: int) -> Report:
+        """Count a repeated report as the reporter's upvote on the open report it duplicates."""
+        if report.user_id != user_id:
+            ReportService.add_upvote(db, report.id, user_id)
+            db.refresh(report)
+        counter_aggregator.apply_pending([report])
         return report
     
+    @staticmethod
+    def find_ward_id_for_location(db: Session, latitude: float, longitude: float) -> Optional[int]:
+        ward_index.ensure_loaded(db)
+        return ward_index.find_ward_id(longitude, latitude)
+    
+    @staticmethod
+    def sample_elevation(latitude: float, longitude: float) -> Optional[float]:
+        try:
+            return elevation_sampler.sample_one(longitude, latitude)
+        except Exception as e:
+            print(f"Error sampling elevation: {e}")
+            return None
+    
     @staticmethod
     def find_ward_for_location(db: Session, latitude: float, longitude: float) -> Optional[Ward]:
-        from geoalchemy2.functions import ST_Contains
-        
-        ward = db.query(Ward).filter(
-            ST_Contains(Ward.geometry, ST_MakePoint(longitude, latitude))
-        ).first()
-        return ward
+        ward_id = ReportService.find_ward_id_for_location(db, latitude, longitude)
+        return db.get(Ward, ward_id) if ward_id is not None else None
     
     @staticmethod
     def get_reports(db: Session, skip: int = 0, limit: int = 100,
                    status: Optional[ReportStatus] = None,
                    ward_id: Optional[int] = None,
-                   severity: Optional[str] = None) -> tuple[list[Report], int]:
+                   severity: Optional[str] = None,
+                   cursor: Optional[str] = None,
+                   total_mode: str = "exact") -> tuple[list[Report], Optional[int], Optional[str]]:
         
         query = db.query(Report)
         
@@ -55,47 +109,212 @@ class ReportService:
         if severity:
             query = query.filter(Report.severity == severity)
         
-        total = query.count()
-        reports = query.order_by(Report.created_at.desc()).offset(skip).limit(limit).all()
+        total = ReportService._count_reports(db, query, total_mode, (status, ward_id, severity))
+        
+        query = query.order_by(Report.created_at.desc(), Report.id.desc())
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Report.created_at, Report.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        else:
+            query = query.offset(skip)
+        
+        reports = query.limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(reports) > limit:
+            reports = reports[:limit]
+            next_cursor = encode_cursor(reports[-1].created_at, reports[-1].id)
+        counter_aggregator.apply_pending(reports)
         
-        return reports, total
+        return reports, total, next_cursor
+    
+    @staticmethod
+    def _count_reports(db: Session, query, total_mode: str, filters: tuple) -> Optional[int]:
+        if total_mode == "none":
+            return None
+        if total_mode == "estimate":
+            return estimate_count(db, query)
+        if total_mode == "cached":
+            return report_count_cache.get_or_count(filters, query)
+        return query.count()
     
     @staticmethod
     def update_report_status(db: Session, report_id: int, new_status: ReportStatus,
                             user_id: int, notes: Optional[str] = None) -> Report:
-        from models.audit_log import AuditLog
-        
         report = db.query(Report).filter(Report.id == report_id).first()
         if not report:
             raise ValueError("Report not found")
         
         old_status = report.status
+        old_resolved_at = report.resolved_at
         report.status = new_status
+        if new_status != ReportStatus.OPEN:
+            recent_report_index.discard(report_id)
         
         if new_status == ReportStatus.RESOLVED:
-            report.resolved_at = datetime.utcnow()
+            report.resolved_at = datetime.now(timezone.utc)
+        
+        WardStatsService.record_status_change(db, report, old_status, old_resolved_at)
         
-        audit_log = AuditLog(
+        with audit_log_writer.journaled(
             report_id=report_id,
             user_id=user_id,
-            action="STATUS_UPDATE",
+            action=AuditAction.STATUS_UPDATE,
             old_status=old_status.value,
             new_status=new_status.value,
             notes=notes
-        )
-        db.add(audit_log)
-        db.commit()
+        ):
+            db.commit()
         db.refresh(report)
+        tile_cache.invalidate_point("reports", report.longitude, report.latitude)
+        
+        return report
+    
+    @staticmethod
+    def add_upvote(db: Session, report_id: int, user_id: int) -> Optional[int]:
+        inserted = insert(Upvote).values(
+            report_id=report_id, user_id=user_id
+        ).on_conflict_do_nothing(
+            constraint="unique_user_report_upvote"
+        ).returning(Upvote.report_id).cte("inserted")
+        
+        counter_aggregator.lock_for_write(db)
+        row = db.execute(
+            select(Report.upvote_count, Report.counters_epoch).join(inserted, Report.id == inserted.c.report_id)
+        ).first()
+        db.commit()
+        if row is None:
+            return None
+        
+        stored_count, epoch = row
+        counter_aggregator.add(report_id, upvotes=1, epoch=epoch)
+        return stored_count + counter_aggregator.pending(report_id)[0]
+    
+    @staticmethod
+    def remove_upvote(db: Session, report_id: int, user_id: int) -> Optional[int]:
+        deleted = delete(Upvote).where(
+            Upvote.report_id == report_id,
+            Upvote.user_id == user_id
+        ).returning(Upvote.report_id).cte("deleted")
+        
+        counter_aggregator.lock_for_write(db)
+        row = db.execute(
+            select(Report.upvote_count, Report.counters_epoch).join(deleted, Report.id == deleted.c.report_id)
+        ).first()
+        db.commit()
+        if row is None:
+            return None
         
+        stored_count, epoch = row
+        counter_aggregator.add(report_id, upvotes=-1, epoch=epoch)
+        return stored_count + counter_aggregator.pending(report_id)[0]
+    
+    @staticmethod
+    def get_report(db: Session, report_id: int) -> Optional[Report]:
+        report = db.get(Report, report_id)
+        if report is not None:
+            counter_aggregator.apply_pending([report])
         return report
     
+    @staticmethod
+    def get_comments(db: Session, report_id: int, limit: int = 50,
+                     cursor: Optional[str] = None,
+                     since: Optional[datetime] = None) -> tuple[list[dict], Optional[str]]:
+        """Newest-first page of a report's comments as plain column rows, walked by (created_at, id)."""
+        query = (
+            select(Comment.id, Comment.report_id, Comment.user_id, Comment.content, Comment.created_at)
+            .where(Comment.report_id == report_id)
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
+        )
+        if since:
+            query = query.where(Comment.created_at > since)
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Comment.created_at, Comment.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        
+        comments = [dict(row) for row in db.execute(query.limit(limit + 1)).mappings()]
+        
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(comments[-1]["created_at"], comments[-1]["id"])
+        
+        return comments, next_cursor
+    
+    @staticmethod
+    def get_audit_log(db: Session, report_id: int, limit: int = 50,
+                      cursor: Optional[str] = None,
+                      action: Optional[AuditAction] = None) -> tuple[list[dict], Optional[str]]:
+        query = (
+            select(
+                AuditLog.id, AuditLog.event_id, AuditLog.report_id, AuditLog.user_id, AuditLog.action,
+                AuditLog.old_status, AuditLog.new_status, AuditLog.details, AuditLog.notes, AuditLog.created_at
+            )
+            .where(AuditLog.report_id == report_id)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        )
+        if action:
+            query = query.where(AuditLog.action == action.value)
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(AuditLog.created_at, AuditLog.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        
+        entries = [dict(row) for row in db.execute(query.limit(limit + 1)).mappings()]
+        
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entries[-1]["created_at"], entries[-1]["id"])
+        
+        return entries, next_cursor
+    
+    @staticmethod
+    def add_comment(db: Session, report_id: int, user_id: int, content: str) -> Comment:
+        counter_aggregator.lock_for_write(db)
+        epoch = db.execute(select(Report.counters_epoch).where(Report.id == report_id)).scalar()
+        comment = Comment(report_id=report_id, user_id=user_id, content=content)
+        db.add(comment)
+        db.commit()
+        db.refresh(comment)
+        counter_aggregator.add(report_id, comments=1, epoch=epoch or 0)
+        return comment
+    
     @staticmethod
     def get_nearby_reports(db: Session, latitude: float, longitude: float, 
                           radius_km: float = 1.0) -> list[Report]:
         
-        point = ST_MakePoint(longitude, latitude)
+        point = geography_point(longitude, latitude)
         reports = db.query(Report).filter(
-            ST_DWithin(Report.location, point, radius_km * 1000)
+            ST_DWithin(as_geography(Report.location), point, radius_km * 1000)
         ).all()
+        counter_aggregator.apply_pending(reports)
         
         return reports
+    
+    @staticmethod
+    def get_nearest_reports(db: Session, latitude: float, longitude: float, limit: int = 20,
+                            status: Optional[ReportStatus] = None,
+                            radius_m: Optional[float] = None) -> list[tuple[Report, float]]:
+        """Closest reports first, with their distance in meters.
+        
+        Ordering by <-> alone lets the geography GiST index return rows nearest-first and stop at
+        the limit instead of sorting every candidate.
+        """
+        point = geography_point(longitude, latitude)
+        location = as_geography(Report.location)
+        
+        query = db.query(Report, ST_Distance(location, point).label("distance_m"))
+        if status:
+            query = query.filter(Report.status == status)
+        if radius_m is not None:
+            query = query.filter(ST_DWithin(location, point, radius_m))
+        
+        rows = query.order_by(location.op("<->")(point)).limit(limit).all()
+        counter_aggregator.apply_pending(report for report, _ in rows)
+        return [(report, distance) for report, distance in rows]
@@ -1,50 +1,210 @@
-import os
+import asyncio
 import hashlib
+import time
+import aiofiles
+import aiofiles.os
+import aiofiles.tempfile
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from pathlib import Path
 from fastapi import UploadFile
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
 from config import settings
+from database import AnySession, run_db
+from models.stored_object import StoredObject
+from object_paths import OBJECT_PATH_PREFIX, base_object_id, object_id_from_path, object_path
+from services.object_store import ObjectStoreBackend, create_backend
 
+# First key of the two-key pg_advisory_xact_lock taken per object by uploads and garbage collection
+OBJECT_LOCK_NAMESPACE = 0x4F424A
 class StorageService:
-    def __init__(self):
-        self.upload_dir = Path(settings.UPLOAD_DIR)
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    async def save_upload(self, file: UploadFile, prefix: str = "report") -> str:
+    """Uploaded images in a content-addressed object store, reference counted in stored_objects.
+
+    Objects are written on upload but only referenced when the row pointing at them commits;
+    collect_garbage removes what stays unreferenced past a grace period. Every upload claims its
+    object (a fresh stored_objects row) before checking whether it already exists, under the same
+    per-object lock garbage collection holds while it deletes, so content an upload reuses is
+    never collected from under it.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, backend: ObjectStoreBackend):
+        self.backend = backend
+
+    async def save_upload(self, file: UploadFile, db: AnySession) -> str:
+        """Stream an upload into the store under its SHA-256, skipping the write for known content."""
         if not self._is_allowed_extension(file.filename):
             raise ValueError(f"File type not allowed. Allowed: {settings.ALLOWED_EXTENSIONS}")
-        
-        file_content = await file.read()
-        
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise ValueError(f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes")
-        
-        file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-        extension = Path(file.filename).suffix
-        filename = f"{prefix}_{file_hash}{extension}"
-        
-        file_path = self.upload_dir / filename
-        
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        return str(file_path)
-    
+
+        await aiofiles.os.makedirs(self.backend.staging_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        async with aiofiles.tempfile.NamedTemporaryFile(
+            "wb", dir=self.backend.staging_dir, prefix=".upload_", suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_path = Path(tmp.name)
+            try:
+                while chunk := await file.read(self.CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.MAX_UPLOAD_SIZE:
+                        raise ValueError(f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes")
+                    digest.update(chunk)
+                    await tmp.write(chunk)
+            except BaseException:
+                await tmp.close()
+                await aiofiles.os.remove(tmp_path)
+                raise
+
+        object_id = f"{digest.hexdigest()}{Path(file.filename).suffix.lower()}"
+        try:
+            await run_db(db, self.claim, object_id)
+            if await asyncio.to_thread(self.backend.exists, object_id):
+                await aiofiles.os.remove(tmp_path)
+            else:
+                await asyncio.to_thread(self.backend.put_file, object_id, tmp_path)
+        except BaseException:
+            if await aiofiles.os.path.exists(tmp_path):
+                await aiofiles.os.remove(tmp_path)
+            raise
+
+        return object_path(object_id)
+
     def _is_allowed_extension(self, filename: str) -> bool:
         extension = Path(filename).suffix.lower()
         return extension in settings.ALLOWED_EXTENSIONS
-    
-    def get_file_path(self, filename: str) -> Optional[Path]:
-        file_path = self.upload_dir / filename
-        if file_path.exists():
-            return file_path
-        return None
-    
-    def delete_file(self, filename: str) -> bool:
-        file_path = self.upload_dir / filename
-        if file_path.exists():
-            file_path.unlink()
-            return True
-        return False
-
-storage_service = StorageService()
+
+    @staticmethod
+    def _lock_object(db: Session, object_id: str):
+        """Serialize an upload's claim with garbage collection of the same object and its derivatives."""
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:id))"),
+            {"namespace": OBJECT_LOCK_NAMESPACE, "id": base_object_id(object_id)}
+        )
+
+    @staticmethod
+    def claim(db: Session, object_id: str):
+        """Restart the grace period of an object that is about to be referenced."""
+        StorageService._lock_object(db, object_id)
+        statement = insert(StoredObject).values(id=object_id, ref_count=0)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[StoredObject.id],
+            set_={"updated_at": func.now()}
+        ))
+        db.commit()
+
+    @staticmethod
+    def acquire(db: Session, path: Optional[str]):
+        StorageService._adjust_references(db, path, 1)
+
+    @staticmethod
+    def release(db: Session, path: Optional[str]):
+        StorageService._adjust_references(db, path, -1)
+
+    @staticmethod
+    def _adjust_references(db: Session, path: Optional[str], delta: int):
+        object_id = object_id_from_path(path)
+        if object_id is None:
+            return
+        statement = insert(StoredObject).values(id=object_id, ref_count=delta)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[StoredObject.id],
+            set_={
+                "ref_count": StoredObject.ref_count + statement.excluded.ref_count,
+                "updated_at": func.now()
+            }
+        ))
+
+    @staticmethod
+    def reconcile_references(db: Session) -> int:
+        """Recompute every reference count from the report image columns."""
+        result = db.execute(text("""
+            WITH refs AS (
+                SELECT substr(path, :offset) AS id, COUNT(*) AS ref_count
+                FROM (
+                    SELECT image_path AS path FROM reports WHERE image_path LIKE :prefix
+                    UNION ALL
+                    SELECT resolution_image_path FROM reports WHERE resolution_image_path LIKE :prefix
+                ) paths
+                GROUP BY 1
+            ), upserted AS (
+                INSERT INTO stored_objects (id, ref_count, updated_at)
+                SELECT id, ref_count, now() FROM refs
+                ON CONFLICT (id) DO UPDATE SET ref_count = EXCLUDED.ref_count, updated_at = now()
+                WHERE stored_objects.ref_count IS DISTINCT FROM EXCLUDED.ref_count
+                RETURNING 1
+            ), cleared AS (
+                UPDATE stored_objects SET ref_count = 0, updated_at = now()
+                WHERE ref_count <> 0 AND id NOT IN (SELECT id FROM refs)
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM upserted) + (SELECT COUNT(*) FROM cleared)
+        """), {"offset": len(OBJECT_PATH_PREFIX) + 1, "prefix": OBJECT_PATH_PREFIX + "%"}).scalar()
+        db.commit()
+        return result
+
+    def collect_garbage(self, db: Session, grace_minutes: int, batch_size: int = 1000) -> dict:
+        """Delete objects unreferenced for grace_minutes, and stored objects no row refers to.
+
+        Derivatives go with their original: they are kept exactly as long as it has a row.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=grace_minutes)
+        candidates = db.execute(
+            select(StoredObject.id).where(StoredObject.ref_count <= 0, StoredObject.updated_at < cutoff)
+        ).scalars().all()
+        db.commit()
+        unreferenced = [object_id for object_id in candidates if self._delete_unreferenced(db, object_id, cutoff)]
+
+        orphans = 0
+        cutoff_timestamp = time.time() - grace_minutes * 60
+        batch = []
+        for object_id, info in self.backend.iter_objects():
+            if info.modified < cutoff_timestamp:
+                batch.append(object_id)
+            if len(batch) >= batch_size:
+                orphans += self._delete_orphans(db, batch)
+                batch = []
+        if batch:
+            orphans += self._delete_orphans(db, batch)
+
+        return {"unreferenced": len(unreferenced), "orphans": orphans}
+
+    def _delete_unreferenced(self, db: Session, object_id: str, cutoff: datetime) -> bool:
+        # Re-checked under the object lock and row lock: a claim or reference since the scan keeps it
+        self._lock_object(db, object_id)
+        deleted = db.execute(
+            delete(StoredObject)
+            .where(StoredObject.id == object_id, StoredObject.ref_count <= 0, StoredObject.updated_at < cutoff)
+            .returning(StoredObject.id)
+        ).scalar()
+        try:
+            if deleted is not None:
+                self.backend.delete(object_id)
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return deleted is not None
+
+    def _delete_orphans(self, db: Session, object_ids: list[str]) -> int:
+        bases = {object_id: base_object_id(object_id) for object_id in object_ids}
+        known = set(db.execute(
+            select(StoredObject.id).where(StoredObject.id.in_(set(bases.values())))
+        ).scalars())
+        db.commit()
+
+        orphans = 0
+        for object_id, base in bases.items():
+            if base in known:
+                continue
+            self._lock_object(db, object_id)
+            claimed = db.execute(select(StoredObject.id).where(StoredObject.id == base)).scalar()
+            if claimed is None:
+                self.backend.delete(object_id)
+                orphans += 1
+            db.commit()
+        return orphans
+
+storage_service = StorageService(create_backend(settings.OBJECT_STORE_BACKEND))
@@ -0,0 +1,101 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from config import settings
+
+MAX_ZOOM = 22
+
+LAYER_QUERIES = {
+    "reports": """
+        WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom),
+        features AS (
+            SELECT
+                ST_AsMVTGeom(ST_Transform(r.location, 3857), bounds.geom) AS geom,
+                r.id,
+                r.status::text AS status,
+                r.severity::text AS severity,
+                r.ward_id
+            FROM reports r, bounds
+            WHERE r.location && ST_Transform(bounds.geom, 4326)
+        )
+        SELECT ST_AsMVT(features.*, 'reports') FROM features
+    """,
+    "wards": """
+        WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom),
+        features AS (
+            SELECT
+                ST_AsMVTGeom(ST_Transform(w.geometry, 3857), bounds.geom) AS geom,
+                w.id,
+                w.ward_number,
+                w.ward_name,
+                w.risk_score
+            FROM wards w, bounds
+            WHERE w.geometry && ST_Transform(bounds.geom, 4326)
+        )
+        SELECT ST_AsMVT(features.*, 'wards') FROM features
+    """,
+}
+
+def tile_for_point(longitude: float, latitude: float, z: int) -> tuple[int, int]:
+    n = 2 ** z
+    lat_rad = math.radians(max(min(latitude, 85.0511), -85.0511))
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+class TileCache:
+    def __init__(self, max_tiles: int, ttl_seconds: int):
+        self.max_tiles = max_tiles
+        self.ttl_seconds = ttl_seconds
+        self._tiles: OrderedDict[tuple, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        key = (layer, z, x, y)
+        with self._lock:
+            entry = self._tiles.get(key)
+            if entry is None:
+                return None
+            expires_at, tile = entry
+            if expires_at < time.monotonic():
+                del self._tiles[key]
+                return None
+            self._tiles.move_to_end(key)
+            return tile
+
+    def set(self, layer: str, z: int, x: int, y: int, tile: bytes):
+        with self._lock:
+            self._tiles[(layer, z, x, y)] = (time.monotonic() + self.ttl_seconds, tile)
+            self._tiles.move_to_end((layer, z, x, y))
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def invalidate_point(self, layer: str, longitude: float, latitude: float):
+        with self._lock:
+            for z in range(MAX_ZOOM + 1):
+                x, y = tile_for_point(longitude, latitude, z)
+                self._tiles.pop((layer, z, x, y), None)
+
+    def invalidate_layer(self, layer: str):
+        with self._lock:
+            for key in [key for key in self._tiles if key[0] == layer]:
+                del self._tiles[key]
+
+tile_cache = TileCache(settings.TILE_CACHE_MAX_TILES, settings.TILE_CACHE_SECONDS)
+
+class TileService:
+    @staticmethod
+    def get_tile(db: Session, layer: str, z: int, x: int, y: int) -> bytes:
+        if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError("Tile coordinates out of range")
+
+        tile = tile_cache.get(layer, z, x, y)
+        if tile is None:
+            tile = db.execute(text(LAYER_QUERIES[layer]), {"z": z, "x": x, "y": y}).scalar()
+            tile = bytes(tile) if tile is not None else b""
+            tile_cache.set(layer, z, x, y, tile)
+        return tile
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Optional
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+from models.user import User
+from config import settings
+
+class UserCache:
+    """Bounded LRU of user column snapshots with a TTL, so authenticated requests skip the users table.
+
+    ORM events invalidate entries in this process only; sync() picks up changes other workers
+    made by polling users updated within the TTL and dropping snapshots whose updated_at differs.
+    Deleted users and raw SQL updates that leave updated_at alone still wait out the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def get_user(self, db: Session, user_id: int) -> Optional[User]:
+        """A session-attached User built from the cached snapshot, without querying the database."""
+        snapshot = self.get(user_id)
+        if snapshot is None:
+            return None
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def set(self, user: User):
+        snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def sync(self, db: Session) -> int:
+        rows = db.execute(
+            select(User.id, User.updated_at)
+            .where(User.updated_at >= func.now() - timedelta(seconds=self.ttl_seconds))
+        ).all()
+        dropped = 0
+        with self._lock:
+            for user_id, updated_at in rows:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[1]["updated_at"] != updated_at:
+                    del self._entries[user_id]
+                    self.invalidations += 1
+                    dropped += 1
+        return dropped
+
+    def sync_with_session(self, session_factory: Callable[[], Session]):
+        db = session_factory()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session], interval_seconds: float):
+        async def run():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await asyncio.to_thread(self.sync_with_session, session_factory)
+                except Exception as e:
+                    print(f"Error syncing user cache: {e}")
+
+        self._task = asyncio.create_task(run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+user_cache = UserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_SECONDS)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    user_cache.invalidate(target.id)
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from models.report import Report, ReportStatus
+from models.ward_stats import WardStats
+
+RESOLVED_STATUSES = (ReportStatus.RESOLVED, ReportStatus.CLOSED)
+
+def _hours_between(start: datetime, end: datetime) -> float:
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return (end - start).total_seconds() / 3600
+
+class WardStatsService:
+    @staticmethod
+    def apply_delta(db: Session, ward_id: int, total_reports: int = 0, open_reports: int = 0,
+                    resolved_reports: int = 0, resolution_hours: float = 0.0, resolution_count: int = 0):
+        statement = insert(WardStats).values(
+            ward_id=ward_id,
+            total_reports=total_reports,
+            open_reports=open_reports,
+            resolved_reports=resolved_reports,
+            resolution_hours_sum=resolution_hours,
+            resolution_count=resolution_count
+        )
+        excluded = statement.excluded
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[WardStats.ward_id],
+            set_={
+                "total_reports": WardStats.total_reports + excluded.total_reports,
+                "open_reports": WardStats.open_reports + excluded.open_reports,
+                "resolved_reports": WardStats.resolved_reports + excluded.resolved_reports,
+                "resolution_hours_sum": WardStats.resolution_hours_sum + excluded.resolution_hours_sum,
+                "resolution_count": WardStats.resolution_count + excluded.resolution_count,
+                "updated_at": func.now()
+            }
+        ))
+
+    @staticmethod
+    def record_report_created(db: Session, ward_id: Optional[int], status: ReportStatus = ReportStatus.OPEN):
+        if ward_id is None:
+            return
+        WardStatsService.apply_delta(
+            db, ward_id,
+            total_reports=1,
+            open_reports=int(status == ReportStatus.OPEN),
+            resolved_reports=int(status in RESOLVED_STATUSES)
+        )
+
+    @staticmethod
+    def record_status_change(db: Session, report: Report, old_status: ReportStatus,
+                             old_resolved_at: Optional[datetime]):
+        if report.ward_id is None:
+            return
+
+        resolution_hours, resolution_count = 0.0, 0
+        if report.resolved_at != old_resolved_at and report.resolved_at is not None:
+            resolution_hours = _hours_between(report.created_at, report.resolved_at)
+            if old_resolved_at is None:
+                resolution_count = 1
+            else:
+                resolution_hours -= _hours_between(report.created_at, old_resolved_at)
+
+        WardStatsService.apply_delta(
+            db, report.ward_id,
+            open_reports=int(report.status == ReportStatus.OPEN) - int(old_status == ReportStatus.OPEN),
+            resolved_reports=int(report.status in RESOLVED_STATUSES) - int(old_status in RESOLVED_STATUSES),
+            resolution_hours=resolution_hours,
+            resolution_count=resolution_count
+        )
+
+    @staticmethod
+    def rebuild(db: Session):
+        db.execute(text("DELETE FROM ward_stats"))
+        db.execute(text("""
+            INSERT INTO ward_stats (
+                ward_id, total_reports, open_reports, resolved_reports,
+                resolution_hours_sum, resolution_count, updated_at
+            )
+            SELECT
+                ward_id,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE status = 'OPEN'),
+                COUNT(*) FILTER (WHERE status IN ('RESOLVED', 'CLOSED')),
+                COALESCE(SUM(EXTRACT(epoch FROM resolved_at - created_at) / 3600)
+                    FILTER (WHERE resolved_at IS NOT NULL), 0),
+                COUNT(resolved_at),
+                now()
+            FROM reports
+            WHERE ward_id IS NOT NULL
+            GROUP BY ward_id
+        """))
+        db.commit()
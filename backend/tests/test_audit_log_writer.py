@@ -0,0 +1,136 @@
+import io
+import os
+from models.audit_log import AuditAction
+from services.audit_log_writer import AuditLogWriter, read_journal
+
+class RecordingWriter(AuditLogWriter):
+    """Collects batches instead of inserting them into Postgres."""
+    
+    def __init__(self, journal_dir, fail=False):
+        super().__init__(str(journal_dir))
+        self.inserted = []
+        self.fail = fail
+    
+    def _insert(self, db, events):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.inserted.extend(events)
+
+def journals(journal_dir):
+    return sorted(journal_dir.glob("audit-*.jsonl"))
+
+def test_events_are_journaled_before_flush(tmp_path):
+    writer = RecordingWriter(tmp_path)
+    with writer.journaled(1, 7, AuditAction.STATUS_UPDATE, old_status="OPEN", new_status="RESOLVED") as event_id:
+        pass
+    with writer.journaled(2, 7, AuditAction.AGENCY_ASSIGNED, details={"agency": "MCD"}):
+        pass
+    
+    [journal] = journals(tmp_path)
+    with open(journal) as f:
+        events = read_journal(f)
+    assert [e["event_id"] for e in events][0] == event_id
+    assert events[1]["details"] == {"agency": "MCD"}
+    assert [e["report_id"] for e in writer.pending(1)] == [1]
+    
+    assert writer.flush(db=None) == 2
+    assert journals(tmp_path) == []
+    assert writer.pending(1) == []
+
+def test_failed_flush_keeps_events_for_the_next_one(tmp_path):
+    writer = RecordingWriter(tmp_path, fail=True)
+    writer.resolve(writer.record(1, 7, AuditAction.STATUS_UPDATE))
+    
+    try:
+        writer.flush(db=None)
+    except RuntimeError:
+        pass
+    writer.resolve(writer.record(1, 7, AuditAction.RESOLUTION_IMAGE_UPLOADED))
+    assert len(journals(tmp_path)) == 2
+    assert len(writer.pending(1)) == 2
+    
+    writer.fail = False
+    assert writer.flush(db=None) == 2
+    assert [e["action"] for e in writer.inserted] == ["STATUS_UPDATE", "RESOLUTION_IMAGE_UPLOADED"]
+    assert journals(tmp_path) == []
+
+def test_rolled_back_event_is_dropped_from_the_journal(tmp_path):
+    writer = RecordingWriter(tmp_path)
+    try:
+        with writer.journaled(1, 7, AuditAction.STATUS_UPDATE):
+            raise RuntimeError("commit failed")
+    except RuntimeError:
+        pass
+    with writer.journaled(1, 7, AuditAction.AGENCY_ASSIGNED) as event_id:
+        pass
+    
+    [journal] = journals(tmp_path)
+    with open(journal) as f:
+        assert [e["event_id"] for e in read_journal(f)] == [event_id]
+    assert [e["event_id"] for e in writer.pending(1)] == [event_id]
+    assert writer.flush(db=None) == 1
+
+def test_flush_waits_for_uncommitted_events(tmp_path):
+    writer = RecordingWriter(tmp_path)
+    event_id = writer.record(1, 7, AuditAction.STATUS_UPDATE)
+    
+    assert writer.pending(1) == []
+    assert writer.flush(db=None) == 0
+    assert len(journals(tmp_path)) == 1
+    
+    writer.resolve(event_id)
+    assert writer.flush(db=None) == 1
+    assert [e["event_id"] for e in writer.inserted] == [event_id]
+    assert journals(tmp_path) == []
+
+def test_recover_skips_journals_owned_by_a_live_writer(tmp_path):
+    live = RecordingWriter(tmp_path)
+    live.record(1, 7, AuditAction.STATUS_UPDATE)
+    
+    recovering = RecordingWriter(tmp_path)
+    assert recovering.recover(db=None) == 0
+    assert len(journals(tmp_path)) == 1
+
+def test_journal_is_locked_before_it_matches_the_recover_glob(tmp_path, monkeypatch):
+    seen = []
+    rename = os.rename
+    def checking_rename(src, dst):
+        seen.append(journals(tmp_path))
+        rename(src, dst)
+    monkeypatch.setattr(os, "rename", checking_rename)
+    
+    RecordingWriter(tmp_path).record(1, 7, AuditAction.STATUS_UPDATE)
+    
+    assert seen == [[]]
+    assert len(journals(tmp_path)) == 1
+    assert RecordingWriter(tmp_path).recover(db=None) == 0
+
+def test_recover_replays_abandoned_journals(tmp_path):
+    crashed = RecordingWriter(tmp_path)
+    event_id = crashed.record(3, 7, AuditAction.STATUS_UPDATE)
+    crashed.resolve(event_id)
+    # A process exit releases the lock without deleting the journal
+    os.close(crashed._active.fd)
+    
+    recovering = RecordingWriter(tmp_path)
+    assert recovering.recover(db=None) == 1
+    assert [e["event_id"] for e in recovering.inserted] == [event_id]
+    assert journals(tmp_path) == []
+
+def test_recover_never_replays_events_whose_commit_was_not_marked(tmp_path):
+    crashed = RecordingWriter(tmp_path)
+    crashed.record(3, 7, AuditAction.STATUS_UPDATE)
+    # Crashed between journaling the event and committing its transaction
+    os.close(crashed._active.fd)
+    
+    recovering = RecordingWriter(tmp_path)
+    assert recovering.recover(db=None) == 0
+    assert recovering.inserted == []
+    assert journals(tmp_path) == []
+
+def test_torn_last_line_is_skipped():
+    journal = io.StringIO(
+        '{"event_id":"a","report_id":1,"created_at":"2026-10-18T10:00:00+00:00"}\n{"committed":"a"}\n'
+        '{"event_id":"b","report_id":1,"created_at":"2026-10-18T10:00:01+00:00"}\n{"commi'
+    )
+    assert [e["event_id"] for e in read_journal(journal)] == ["a"]
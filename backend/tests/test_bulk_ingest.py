@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from config import settings
+from services import bulk_ingest
+from services.bulk_ingest import BulkIngestService
+
+def report_row(**overrides):
+    row = {"title": "Waterlogged underpass", "description": "Knee-deep water near the market",
+           "latitude": 28.61, "longitude": 77.21}
+    row.update(overrides)
+    return row
+
+class CopyCursor:
+    def __init__(self):
+        self.rows = []
+    
+    def copy_expert(self, sql, buffer):
+        self.sql = sql
+        self.rows = list(csv.reader(buffer))
+    
+    def close(self):
+        pass
+
+class InsertCursor:
+    def __init__(self):
+        self.rows = []
+    
+    def executemany(self, sql, values):
+        self.sql = sql
+        self.rows = list(values)
+    
+    def close(self):
+        pass
+
+class StagingSession:
+    """Hands out a raw DBAPI cursor the way Session.connection().connection does."""
+    
+    def __init__(self, cursor):
+        self._connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    
+    def connection(self):
+        return self._connection
+
+class StubSampler:
+    def __init__(self, elevations=None, error=None):
+        self.elevations = elevations
+        self.error = error
+    
+    def sample(self, points):
+        if self.error:
+            raise self.error
+        return np.array(self.elevations)
+
+def test_jsonl_rows_are_numbered_by_line_and_errors_summarized():
+    content = "\n".join([
+        json.dumps(report_row()),
+        "",
+        "{not json",
+        json.dumps(report_row(latitude=95)),
+        json.dumps(report_row(severity="HIGH")),
+    ])
+    
+    valid, errors = BulkIngestService.parse_rows(content, "jsonl")
+    
+    assert [(row_no, r.severity.value) for row_no, r in valid] == [(1, "MEDIUM"), (5, "HIGH")]
+    assert errors[0] == {"row": 3, "error": "Invalid JSON"}
+    assert errors[1]["row"] == 4
+    assert errors[1]["error"].startswith("latitude:")
+
+def test_csv_blank_cells_fall_back_to_defaults():
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["title", "description", "latitude", "longitude", "address", "severity"])
+    writer.writeheader()
+    writer.writerow({**report_row(), "address": "", "severity": ""})
+    writer.writerow({**report_row(), "title": "Hi"})
+    
+    valid, errors = BulkIngestService.parse_rows(buffer.getvalue(), "csv")
+    
+    [(row_no, report)] = valid
+    assert (row_no, report.address, report.severity.value) == (1, None, "MEDIUM")
+    assert [e["row"] for e in errors] == [2]
+    assert errors[0]["error"].startswith("title:")
+
+def test_too_many_rows_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_REPORT_MAX_ROWS", 2)
+    content = "\n".join(json.dumps(report_row()) for _ in range(3))
+    
+    with pytest.raises(ValueError, match="Too many rows"):
+        BulkIngestService.parse_rows(content, "jsonl")
+
+def test_ingest_summary_interleaves_inserts_and_errors_by_row(monkeypatch):
+    monkeypatch.setattr(
+        BulkIngestService, "insert_reports",
+        staticmethod(lambda db, user_id, rows: [
+            {"row": row_no, "report_id": 100 + row_no, "ward_id": None} for row_no, _ in rows
+        ])
+    )
+    content = "\n".join([json.dumps(report_row()), "{not json", json.dumps(report_row())])
+    
+    summary = BulkIngestService.ingest(db=None, user_id=1, content=content, fmt="jsonl")
+    
+    assert (summary["inserted"], summary["failed"]) == (2, 1)
+    assert [r["row"] for r in summary["results"]] == [1, 2, 3]
+    assert summary["results"][1] == {"row": 2, "error": "Invalid JSON"}
+
+@pytest.mark.parametrize("cursor", [CopyCursor(), InsertCursor()], ids=["copy", "executemany"])
+def test_staging_rows_carry_sampled_elevations(monkeypatch, cursor):
+    monkeypatch.setattr(bulk_ingest, "elevation_sampler", StubSampler([212.5, np.nan]))
+    rows, _ = BulkIngestService.parse_rows(
+        "\n".join([json.dumps(report_row()), json.dumps(report_row(address="Ring Road"))]), "jsonl"
+    )
+    
+    BulkIngestService._copy_into_staging(StagingSession(cursor), rows)
+    
+    staged = [[str(value) if value is not None else "" for value in row] for row in cursor.rows]
+    assert [row[0] for row in staged] == ["1", "2"]
+    assert [row[5] for row in staged] == ["", "Ring Road"]
+    assert [row[7] for row in staged] == ["212.5", ""]
+
+def test_sampler_failure_stages_rows_without_elevation(monkeypatch):
+    monkeypatch.setattr(bulk_ingest, "elevation_sampler", StubSampler(error=OSError("tile unreadable")))
+    rows, _ = BulkIngestService.parse_rows("\n".join(json.dumps(report_row()) for _ in range(3)), "jsonl")
+    cursor = CopyCursor()
+    
+    BulkIngestService._copy_into_staging(StagingSession(cursor), rows)
+    
+    assert [row[7] for row in cursor.rows] == ["", "", ""]
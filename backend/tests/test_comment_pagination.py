@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import models.report, models.user  # noqa: F401 - resolve the comment foreign keys
+from models.comment import Comment
+from services.report_service import ReportService
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'comments.db'}")
+    Comment.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    start = datetime(2026, 10, 1, 12, 0, 0)
+    # Pairs share a timestamp so the id tiebreaker is exercised
+    db.add_all(
+        Comment(report_id=1, user_id=1, content=f"comment {i}", created_at=start + timedelta(minutes=i // 2))
+        for i in range(7)
+    )
+    db.add(Comment(report_id=2, user_id=1, content="other report", created_at=start))
+    db.commit()
+    return db, start
+
+def test_pages_walk_every_comment_once(tmp_path):
+    db, _ = make_session(tmp_path)
+    
+    seen, cursor = [], None
+    while True:
+        comments, cursor = ReportService.get_comments(db, 1, limit=3, cursor=cursor)
+        seen.extend(comments)
+        if cursor is None:
+            break
+    
+    assert [c["content"] for c in seen] == [f"comment {i}" for i in (6, 5, 4, 3, 2, 1, 0)]
+    assert all(isinstance(c, dict) for c in seen)
+
+def test_since_returns_only_newer_comments(tmp_path):
+    db, start = make_session(tmp_path)
+    
+    comments, cursor = ReportService.get_comments(db, 1, since=start + timedelta(minutes=2))
+    
+    assert [c["content"] for c in comments] == ["comment 6"]
+    assert cursor is None
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from database import create_async_session_factory, run_db
+
+pytest.importorskip("aiosqlite")
+
+QUERY_MS = 50
+CONCURRENCY = 10
+
+class QueryOverlap:
+    """Counts queries in flight at once, as seen from the database side."""
+    
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    def sleep_ms(self, ms: int) -> int:
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(ms / 1000)
+        finally:
+            with self._lock:
+                self.running -= 1
+        return ms
+
+def register_sleep(engine, overlap: QueryOverlap):
+    # A query that spends QUERY_MS in the database, like a slow PostGIS lookup would
+    @event.listens_for(engine, "connect")
+    def add_sleep_function(connection, record):
+        connection.create_function("sleep_ms", 1, overlap.sleep_ms)
+
+def slow_query(db: Session) -> int:
+    return db.execute(text("SELECT sleep_ms(:ms)"), {"ms": QUERY_MS}).scalar()
+
+def build_app(get_session) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/slow")
+    async def slow(db=Depends(get_session)):
+        return {"slept_ms": await run_db(db, slow_query)}
+    
+    return app
+
+async def run_concurrently(app: FastAPI):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/slow") for _ in range(CONCURRENCY)))
+    assert all(r.json() == {"slept_ms": QUERY_MS} for r in responses)
+
+def test_async_mode_serves_concurrent_queries(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    
+    sync_overlap = QueryOverlap()
+    sync_engine = create_engine(url, pool_size=CONCURRENCY)
+    register_sleep(sync_engine, sync_overlap)
+    SyncSession = sessionmaker(bind=sync_engine)
+    
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    async_overlap = QueryOverlap()
+    AsyncSession = create_async_session_factory(url, pool_size=CONCURRENCY)
+    register_sleep(AsyncSession.kw["bind"].sync_engine, async_overlap)
+    
+    async def get_async_db():
+        async with AsyncSession() as db:
+            yield db
+    
+    asyncio.run(run_concurrently(build_app(get_sync_db)))
+    asyncio.run(run_concurrently(build_app(get_async_db)))
+    
+    # Sync mode blocks the event loop for every query, so concurrent requests run one at a time
+    assert sync_overlap.peak == 1
+    assert async_overlap.peak > 1
+    
+    sync_engine.dispose()
+    asyncio.run(AsyncSession.kw["bind"].dispose())
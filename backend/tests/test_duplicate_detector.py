@@ -0,0 +1,37 @@
+import time
+from services.duplicate_detector import RecentReportIndex, haversine_meters
+
+# India Gate, New Delhi
+LON, LAT = 77.2295, 28.6129
+# Degrees of longitude per meter at this latitude
+LON_PER_METER = 1 / (111_320 * 0.8778)
+
+def test_haversine_matches_known_distance():
+    # One degree of latitude is about 111.2 km on the mean-radius sphere
+    assert abs(haversine_meters(LON, LAT, LON, LAT + 1) - 111_195) < 10
+
+def test_finds_reports_within_radius_across_cell_edges():
+    index = RecentReportIndex(radius_meters=100, window_minutes=60)
+    now = time.time()
+    index.add(1, LON + 60 * LON_PER_METER, LAT, now)
+    index.add(2, LON - 90 * LON_PER_METER, LAT, now)
+    index.add(3, LON + 150 * LON_PER_METER, LAT, now)
+    index.add(4, LON, LAT + 95 / 111_320, now)
+    
+    assert index.candidates(LON, LAT, now) == [1, 2, 4]
+
+def test_ignores_reports_outside_the_window():
+    index = RecentReportIndex(radius_meters=100, window_minutes=60)
+    now = time.time()
+    index.add(1, LON, LAT, now - 61 * 60)
+    index.add(2, LON, LAT, now - 59 * 60)
+    
+    assert index.candidates(LON, LAT, now) == [2]
+
+def test_discarded_reports_are_not_candidates():
+    index = RecentReportIndex(radius_meters=100, window_minutes=60)
+    index.add(1, LON, LAT, time.time())
+    index.discard(1)
+    
+    assert index.candidates(LON, LAT) == []
+    assert len(index) == 0
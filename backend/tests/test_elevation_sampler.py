@@ -0,0 +1,34 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_bounds
+from gis.elevation_sampler import ElevationSampler
+
+def write_dem(path, elevation, bounds, nodata=None):
+    height, width = elevation.shape
+    with rasterio.open(
+        path, "w", driver="GTiff", height=height, width=width, count=1,
+        dtype=elevation.dtype, crs="EPSG:4326", nodata=nodata,
+        transform=from_bounds(*bounds, width, height),
+    ) as dst:
+        dst.write(elevation, 1)
+
+def test_batch_sampling_across_tiles(tmp_path):
+    west = np.arange(16, dtype=np.float32).reshape(4, 4)
+    east = np.full((4, 4), 500.0, dtype=np.float32)
+    east[0, 0] = -9999.0
+    write_dem(tmp_path / "west.tif", west, (77.0, 28.0, 78.0, 29.0))
+    write_dem(tmp_path / "east.tif", east, (78.0, 28.0, 79.0, 29.0), nodata=-9999.0)
+    sampler = ElevationSampler(str(tmp_path), str(tmp_path / "cache"))
+    
+    elevations = sampler.sample([
+        (77.1, 28.9),
+        (77.9, 28.1),
+        (78.5, 28.5),
+        (78.1, 28.9),
+        (80.0, 28.5),
+    ])
+    
+    np.testing.assert_array_equal(elevations[:3], [0.0, 15.0, 500.0])
+    assert np.isnan(elevations[3])
+    assert np.isnan(elevations[4])
+    assert sampler.sample_one(80.0, 28.5) is None
@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import pytest
+from fastapi.testclient import TestClient
+from database import get_session
+from main import app
+from ml.heatmap_generator import HotspotCache
+from routes import analytics
+
+def write_heatmap(path, risk_score):
+    with open(path, "w") as f:
+        json.dump({
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "properties": {"id": 1, "ward_number": "001", "risk_score": risk_score},
+                "geometry": {"type": "Point", "coordinates": [77.1, 28.9]}
+            }]
+        }, f, indent=2)
+
+def test_serves_prediction_file_from_memory(tmp_path):
+    path = tmp_path / "risk_heatmap.geojson"
+    write_heatmap(path, 42.0)
+    cache = HotspotCache(str(path))
+    
+    first = cache.get(db=None)
+    second = cache.get(db=None)
+    
+    assert first is second
+    assert json.loads(first.body)["features"][0]["properties"]["risk_score"] == 42.0
+    assert gzip.decompress(first.gzip_body) == first.body
+
+def test_new_prediction_run_changes_etag(tmp_path):
+    path = tmp_path / "risk_heatmap.geojson"
+    write_heatmap(path, 42.0)
+    cache = HotspotCache(str(path))
+    before = cache.get(db=None)
+    
+    write_heatmap(path, 77.0)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    after = cache.get(db=None)
+    
+    assert after.etag != before.etag
+    assert json.loads(after.body)["features"][0]["properties"]["risk_score"] == 77.0
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    path = tmp_path / "risk_heatmap.geojson"
+    write_heatmap(path, 42.0)
+    monkeypatch.setattr(analytics, "hotspot_cache", HotspotCache(str(path)))
+    app.dependency_overrides[get_session] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_session, None)
+
+def test_gzip_and_identity_bodies_have_distinct_etags(client):
+    identity = client.get("/analytics/hotspots", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/analytics/hotspots", headers={"Accept-Encoding": "br, gzip;q=0.8"})
+    
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == identity.headers["etag"][:-1] + '-gz"'
+    assert gzipped.content == identity.content
+    
+    stale = client.get(
+        "/analytics/hotspots", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]}
+    )
+    assert stale.status_code == 200
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "GZIP; q=0.0, identity", "*;q=0", "deflate"])
+def test_refused_gzip_gets_the_identity_body(client, accept_encoding):
+    response = client.get("/analytics/hotspots", headers={"Accept-Encoding": accept_encoding})
+    
+    assert "content-encoding" not in response.headers
+    assert not response.headers["etag"].endswith('-gz"')
+
+def test_wildcard_encoding_gets_gzip(client):
+    response = client.get("/analytics/hotspots", headers={"Accept-Encoding": "*"})
+    
+    assert response.headers["content-encoding"] == "gzip"
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", W/{etag}', "*"])
+def test_if_none_match_forms_revalidate(client, if_none_match):
+    etag = client.get("/analytics/hotspots", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    
+    response = client.get(
+        "/analytics/hotspots",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match.format(etag=etag)}
+    )
+    
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
@@ -0,0 +1,13 @@
+import numpy as np
+from ml.hotspot_predictor import HotspotPredictor
+
+def test_score_wards_matches_weighting():
+    predictor = HotspotPredictor.__new__(HotspotPredictor)
+    
+    scores = predictor.score_wards(
+        elevation=np.array([150.0, 250.0, np.nan, 350.0]),
+        slope=np.array([0.2, 3.0, np.nan, 6.0]),
+        incident_density=np.array([11.0, 3.0, 0.1, 6.0])
+    )
+    
+    np.testing.assert_allclose(scores, [97.5, 43.5, 2.25, 34.0])
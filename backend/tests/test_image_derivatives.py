@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime
+from PIL import Image
+from models.report import ReportStatus, ReportSeverity
+from schemas.report import ReportResponse
+from services.image_derivatives import ImageDerivativeService, derivative_id, generate_derivatives
+from services.object_store import LocalBackend
+
+def store_photo(backend, size=(4000, 3000), orientation=None) -> str:
+    image = Image.new("RGB", size, (40, 120, 200))
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    if orientation:
+        exif[0x0112] = orientation
+    backend.staging_dir.mkdir(parents=True, exist_ok=True)
+    path = backend.staging_dir / "photo.jpg"
+    image.save(path, "JPEG", quality=95, exif=exif)
+    object_id = hashlib.sha256(path.read_bytes()).hexdigest() + ".jpg"
+    backend.put_file(object_id, path)
+    return object_id
+
+def test_renditions_are_small_webp_without_exif(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    photo = store_photo(backend)
+    
+    written = generate_derivatives(photo, backend)
+    
+    assert sorted(written) == sorted(derivative_id(photo, name) for name in ("thumb", "medium"))
+    with Image.open(backend.local_path(derivative_id(photo, "thumb"))) as thumb:
+        assert thumb.format == "WEBP"
+        assert max(thumb.size) == 320
+        assert not thumb.getexif()
+    with Image.open(backend.local_path(derivative_id(photo, "medium"))) as medium:
+        assert medium.size == (1280, 960)
+    assert backend.stat(derivative_id(photo, "thumb")).size * 10 < backend.stat(photo).size
+
+def test_orientation_is_applied_and_existing_renditions_skipped(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    # Orientation 6: stored landscape, displayed portrait
+    photo = store_photo(backend, size=(1600, 1200), orientation=6)
+    generate_derivatives(photo, backend)
+    with Image.open(backend.local_path(derivative_id(photo, "medium"))) as medium:
+        assert medium.size == (960, 1280)
+    
+    assert generate_derivatives(photo, backend) == []
+
+def test_schedule_runs_in_process_pool(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    photo = store_photo(backend, size=(800, 600))
+    service = ImageDerivativeService(workers=1, backend=backend)
+    try:
+        assert service.schedule("uploads/legacy.jpg") is None
+        assert len(service.schedule(f"objects/{photo}").result(timeout=60)) == 2
+    finally:
+        service.shutdown()
+    assert backend.exists(derivative_id(photo, "thumb"))
+
+def test_report_response_carries_rendition_paths():
+    object_id = "ab" * 32 + ".jpg"
+    response = ReportResponse(
+        id=1, user_id=1, title="Flooded underpass", description="Knee deep water", latitude=28.6,
+        longitude=77.2, address=None, ward_id=None, status=ReportStatus.OPEN,
+        severity=ReportSeverity.HIGH, assigned_agency=None, image_path=f"objects/{object_id}",
+        resolution_image_path="uploads/resolution_legacy.jpg", upvote_count=0, comment_count=0,
+        created_at=datetime(2024, 7, 1), updated_at=None, resolved_at=None
+    )
+    data = response.model_dump()
+    assert data["image_thumbnail_path"] == f"objects/{object_id}.thumb.webp"
+    assert data["image_medium_path"] == f"objects/{object_id}.medium.webp"
+    assert data["resolution_image_thumbnail_path"] is None
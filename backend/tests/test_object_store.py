@@ -0,0 +1,225 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes import objects
+from services.object_store import LocalBackend, ObjectStoreBackend, S3Backend, shard_key
+from services.storage_service import storage_service
+
+def object_id(content: bytes, extension: str = ".jpg") -> str:
+    return hashlib.sha256(content).hexdigest() + extension
+
+def put(backend, tmp_path, content: bytes, extension: str = ".jpg") -> str:
+    oid = object_id(content, extension)
+    backend.staging_dir.mkdir(parents=True, exist_ok=True)
+    path = backend.staging_dir / "upload.tmp"
+    path.write_bytes(content)
+    backend.put_file(oid, path)
+    assert not path.exists()
+    return oid
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """Just enough of the S3 REST API (path-style) to exercise S3Backend."""
+    
+    def log_message(self, *args):
+        pass
+    
+    def _parse(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        _, bucket, *key = unquote(url.path).split("/", 2)
+        assert self.headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=test/")
+        return bucket, key[0] if key else None, query
+    
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+    
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    
+    def do_PUT(self):
+        _, key, query = self._parse()
+        body = self._body()
+        if "uploadId" in query:
+            self.server.uploads[query["uploadId"]][int(query["partNumber"])] = body
+            self.server.part_sizes.append(len(body))
+            return self._send(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+        self.server.objects[key] = (body, datetime.now(timezone.utc))
+        self._send(200)
+    
+    def do_POST(self):
+        _, key, query = self._parse()
+        body = self._body()
+        if "uploads" in query:
+            upload_id = f"upload-{len(self.server.uploads)}"
+            self.server.uploads[upload_id] = {}
+            return self._send(200, f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+        parts = self.server.uploads.pop(query["uploadId"])
+        numbers = [int(n.text) for n in ElementTree.fromstring(body).iter("PartNumber")]
+        self.server.objects[key] = (b"".join(parts[n] for n in numbers), datetime.now(timezone.utc))
+        self._send(200, b"<CompleteMultipartUploadResult/>")
+    
+    def do_HEAD(self):
+        _, key, _ = self._parse()
+        if key not in self.server.objects:
+            return self._send(404)
+        body, modified = self.server.objects[key]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", format_datetime(modified, usegmt=True))
+        self.end_headers()
+    
+    def do_GET(self):
+        _, key, query = self._parse()
+        if key is None:
+            return self._list(query)
+        if key not in self.server.objects:
+            return self._send(404)
+        body, _ = self.server.objects[key]
+        if self.headers.get("Range"):
+            start, end = map(int, self.headers["Range"].removeprefix("bytes=").split("-"))
+            return self._send(206, body[start:end + 1])
+        self._send(200, body)
+    
+    def do_DELETE(self):
+        _, key, query = self._parse()
+        if "uploadId" in query:
+            self.server.uploads.pop(query["uploadId"], None)
+        else:
+            self.server.objects.pop(key, None)
+        self._send(204)
+    
+    def _list(self, query):
+        keys = sorted(self.server.objects)
+        start = int(query.get("continuation-token", 0))
+        page = keys[start:start + 2]
+        contents = "".join(
+            f"<Contents><Key>{k}</Key><Size>{len(self.server.objects[k][0])}</Size>"
+            f"<LastModified>{self.server.objects[k][1].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified></Contents>"
+            for k in page
+        )
+        truncated = start + 2 < len(keys)
+        token = f"<NextContinuationToken>{start + 2}</NextContinuationToken>" if truncated else ""
+        body = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"{contents}<IsTruncated>{str(truncated).lower()}</IsTruncated>{token}</ListBucketResult>"
+        )
+        self._send(200, body.encode())
+
+@pytest.fixture
+def s3_backend():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeS3Handler)
+    server.daemon_threads = True
+    server.objects, server.uploads, server.part_sizes = {}, {}, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    backend = S3Backend(
+        f"http://127.0.0.1:{server.server_address[1]}", "images", "test", "secret",
+        part_size=5, multipart_threshold=8
+    )
+    yield backend, server
+    server.shutdown()
+    server.server_close()
+
+def test_local_backend_shards_and_serves_ranges(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    content = b"0123456789" * 10
+    oid = put(backend, tmp_path, content)
+    
+    assert (tmp_path / shard_key(oid)).read_bytes() == content
+    assert shard_key(oid).startswith(f"{oid[:2]}/{oid[2:4]}/")
+    assert backend.stat(oid).size == 100
+    assert b"".join(backend.iter_range(oid, 5, 24, chunk_size=7)) == content[5:25]
+    assert [name for name, _ in backend.iter_objects()] == [oid]
+    
+    backend.delete(oid)
+    assert backend.stat(oid) is None
+
+def test_s3_backend_round_trip_with_multipart(s3_backend, tmp_path):
+    backend, server = s3_backend
+    small = put(backend, tmp_path, b"tiny")
+    large_content = bytes(range(23))
+    large = put(backend, tmp_path, large_content)
+    
+    assert server.objects[f"{shard_key(large)}"][0] == large_content
+    assert server.part_sizes == [5, 5, 5, 5, 3]
+    assert backend.stat(large).size == 23
+    assert backend.stat(object_id(b"missing")) is None
+    assert b"".join(backend.iter_range(large, 3, 9)) == large_content[3:10]
+    
+    backend.download(small, tmp_path / "copy")
+    assert (tmp_path / "copy").read_bytes() == b"tiny"
+    
+    put(backend, tmp_path, b"third")
+    assert sorted(name for name, _ in backend.iter_objects()) == sorted([small, large, object_id(b"third")])
+    
+    backend.delete(small)
+    assert not backend.exists(small)
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    backend = LocalBackend(str(tmp_path))
+    monkeypatch.setattr(storage_service, "backend", backend)
+    app = FastAPI()
+    app.include_router(objects.router)
+    return TestClient(app), backend
+
+def test_object_route_serves_ranges(client, tmp_path):
+    client, backend = client
+    content = bytes(range(256)) * 4
+    oid = put(backend, tmp_path, content)
+    
+    response = client.get(f"/objects/{oid}")
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["accept-ranges"] == "bytes"
+    
+    response = client.get(f"/objects/{oid}", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == content[100:200]
+    assert response.headers["content-range"] == "bytes 100-199/1024"
+    
+    response = client.get(f"/objects/{oid}", headers={"Range": "bytes=-24"})
+    assert response.content == content[-24:]
+    
+    response = client.get(f"/objects/{oid}", headers={"Range": "bytes=2000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1024"
+    
+    response = client.get(f"/objects/{oid}", headers={"If-None-Match": f'"{oid}"'})
+    assert response.status_code == 304
+    
+    response = client.head(f"/objects/{oid}")
+    assert response.headers["content-length"] == "1024"
+
+def test_missing_rendition_redirects_to_original(client, tmp_path):
+    client, backend = client
+    oid = put(backend, tmp_path, b"photo")
+    
+    response = client.get(f"/objects/{oid}.thumb.webp", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == oid
+    
+    assert client.get(f"/objects/{object_id(b'unknown')}").status_code == 404
+    assert client.get("/objects/..%2F..%2Fetc%2Fpasswd").status_code == 404
+
+def test_backend_missing_a_method_fails_at_construction():
+    class ReadOnlyBackend(ObjectStoreBackend):
+        def stat(self, object_id):
+            return None
+    
+    with pytest.raises(TypeError):
+        ReadOnlyBackend()
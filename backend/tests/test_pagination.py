@@ -0,0 +1,27 @@
+import pytest
+from datetime import datetime, timezone
+from services.pagination import CountCache, decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 7, 14, 18, 30, 5, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 4217)
+    
+    assert decode_cursor(cursor) == (created_at, 4217)
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_count_cache_reuses_value():
+    class CountingQuery:
+        calls = 0
+        def count(self):
+            self.calls += 1
+            return 42
+    
+    cache = CountCache(ttl_seconds=60)
+    query = CountingQuery()
+    
+    assert cache.get_or_count(("OPEN", None, None), query) == 42
+    assert cache.get_or_count(("OPEN", None, None), query) == 42
+    assert query.calls == 1
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+from services.auth_service import pwd_context
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    
+    async def run():
+        hashed = await hasher.hash("secret")
+        return hashed, await hasher.verify_and_update("secret", hashed), await hasher.verify_and_update("wrong", hashed)
+    
+    hashed, correct, wrong = asyncio.run(run())
+    hasher.shutdown()
+    assert hashed.startswith("$2b$")
+    assert correct == (True, None)
+    assert wrong == (False, None)
+
+def test_outdated_hash_is_upgraded():
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("secret")
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    
+    valid, new_hash = asyncio.run(hasher.verify_and_update("secret", weak_hash))
+    hasher.shutdown()
+    assert valid
+    assert new_hash is not None and not pwd_context.needs_update(new_hash)
+
+def test_event_loop_keeps_running_while_hashing():
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    
+    async def run():
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(hasher.hash("a"), hasher.hash("b"))
+        task.cancel()
+        return ticks
+    
+    assert asyncio.run(run()) > 0
+    hasher.shutdown()
+
+def test_rejects_when_queue_is_full(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr("services.password_hasher.get_password_hash", lambda password: release.wait(5) and "hash")
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    
+    async def run():
+        first = asyncio.create_task(hasher.hash("a"))
+        second = asyncio.create_task(hasher.hash("b"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("c")
+        release.set()
+        return await asyncio.gather(first, second)
+    
+    assert asyncio.run(run()) == ["hash", "hash"]
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["pending"] == 0
+    hasher.shutdown()
@@ -0,0 +1,79 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from services.query_metrics import InstrumentedQueuePool, QueryMetrics, QueryMetricsMiddleware
+
+def build_client(tmp_path, metrics: QueryMetrics) -> TestClient:
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=InstrumentedQueuePool, pool_size=2)
+    metrics.instrument(engine)
+    Session = sessionmaker(bind=engine)
+    
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    app.add_middleware(QueryMetricsMiddleware, metrics=metrics, debug_headers=True)
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, db=Depends(get_db)):
+        return {"id": db.execute(text("SELECT :id"), {"id": item_id}).scalar()}
+    
+    @app.get("/items")
+    def list_items(db=Depends(get_db)):
+        # One query per row, the pattern the detector is for
+        return [db.execute(text("SELECT :id"), {"id": i}).scalar() for i in range(6)]
+    
+    return TestClient(app)
+
+def test_headers_report_queries_per_request(tmp_path):
+    client = build_client(tmp_path, QueryMetrics(n_plus_one_threshold=5))
+    
+    response = client.get("/items/3")
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+    assert "X-DB-N-Plus-One" not in response.headers
+    
+    response = client.get("/items")
+    assert response.headers["X-DB-Query-Count"] == "6"
+    assert response.headers["X-DB-N-Plus-One"] == "1"
+
+def test_routes_aggregate_by_template(tmp_path):
+    metrics = QueryMetrics(n_plus_one_threshold=5)
+    client = build_client(tmp_path, metrics)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items")
+    
+    routes = metrics.snapshot()
+    assert routes["GET /items/{item_id}"]["requests"] == 2
+    assert routes["GET /items/{item_id}"]["avg_queries"] == 1
+    assert routes["GET /items/{item_id}"]["n_plus_one_requests"] == 0
+    
+    listing = routes["GET /items"]
+    assert listing["max_queries"] == 6
+    assert listing["n_plus_one_requests"] == 1
+    assert listing["repeated_statements"] == [{"statement": "SELECT ?", "count": 6}]
+    assert listing["avg_pool_wait_ms"] >= 0
+
+def test_queries_outside_requests_are_not_counted(tmp_path):
+    metrics = QueryMetrics(n_plus_one_threshold=5)
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=InstrumentedQueuePool)
+    metrics.instrument(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert metrics.snapshot() == {}
+
+def test_db_metrics_require_authentication():
+    from main import app
+    client = TestClient(app)
+    
+    headers = {"Authorization": "Bearer not-a-token"}
+    
+    assert client.get("/metrics/db", headers=headers).status_code == 401
+    assert client.delete("/metrics/db", headers=headers).status_code == 401
+    assert client.get("/metrics/cache", headers=headers).status_code == 401
@@ -0,0 +1,101 @@
+import asyncio
+import socketserver
+import threading
+import time
+import pytest
+from services.rate_limiter import RateLimiter, RateLimitBackend, InMemoryBackend, SQLiteBackend, RedisBackend
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for the rate limiter: INCR, DECR, GET and EXPIRE."""
+    
+    def handle(self):
+        store = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2].decode())
+            command, key = args[0].upper(), args[1] if len(args) > 1 else None
+            with self.server.lock:
+                if command in ("INCR", "DECR"):
+                    store[key] = int(store.get(key, 0)) + (1 if command == "INCR" else -1)
+                    reply = b":%d\r\n" % store[key]
+                elif command == "GET":
+                    value = store.get(key)
+                    reply = b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(str(value)), str(value).encode())
+                elif command == "EXPIRE":
+                    reply = b":1\r\n"
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    block_on_close = False
+
+@pytest.fixture
+def redis_url():
+    server = FakeRedisServer(("127.0.0.1", 0), FakeRedisHandler)
+    server.store, server.lock = {}, threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def limiter(request, tmp_path, redis_url):
+    if request.param == "sqlite":
+        return RateLimiter(SQLiteBackend(str(tmp_path / "rate_limits.db")))
+    if request.param == "redis":
+        return RateLimiter(RedisBackend(redis_url))
+    return RateLimiter(InMemoryBackend())
+
+def test_limit_enforced_per_key(limiter):
+    results = [limiter.is_allowed("report_1", max_requests=3, window_minutes=60) for _ in range(5)]
+    
+    assert results == [True, True, True, False, False]
+    assert limiter.is_allowed("report_2", max_requests=3, window_minutes=60)
+
+def test_rejected_hits_do_not_consume_quota(limiter):
+    for _ in range(10):
+        limiter.is_allowed("comment_1", max_requests=2, window_minutes=60)
+    
+    current, _ = limiter.backend.increment("comment_1", _window_id(60), 7200)
+    assert current == 3
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    first, second = RateLimiter(SQLiteBackend(path)), RateLimiter(SQLiteBackend(path))
+    
+    assert first.is_allowed("report_1", max_requests=2, window_minutes=60)
+    assert second.is_allowed("report_1", max_requests=2, window_minutes=60)
+    assert not first.is_allowed("report_1", max_requests=2, window_minutes=60)
+
+def _window_id(window_minutes):
+    return int(time.time() // (window_minutes * 60))
+
+def test_backend_missing_a_method_fails_at_construction():
+    class IncrementOnly(RateLimitBackend):
+        def increment(self, key, window_id, ttl_seconds):
+            return (1, 0)
+    
+    with pytest.raises(TypeError):
+        IncrementOnly()
+
+def test_unreachable_backend_falls_back_to_in_process_counters():
+    server_gone = RedisBackend("redis://127.0.0.1:1/0", timeout=0.2)
+    limiter = RateLimiter(server_gone)
+    
+    results = [limiter.is_allowed("report_1", max_requests=2, window_minutes=60) for _ in range(3)]
+    
+    assert results == [True, True, False]
+
+def test_async_check_counts_like_is_allowed(limiter):
+    async def check():
+        return [await limiter.is_allowed_async("report_1", max_requests=1, window_minutes=60) for _ in range(2)]
+    
+    assert asyncio.run(check()) == [True, False]
@@ -0,0 +1,32 @@
+import math
+from fastapi.testclient import TestClient
+from main import app
+from routes.analytics import _cluster_grid
+
+def test_grid_cells_halve_with_each_zoom_level():
+    cell_10, _ = _cluster_grid((77.0, 28.4, 77.4, 28.8), 10)
+    cell_11, _ = _cluster_grid((77.0, 28.4, 77.4, 28.8), 11)
+    
+    assert cell_10 == 360 / (1024 * 4)
+    assert cell_11 == cell_10 / 2
+
+def test_bbox_grows_to_whole_global_cells():
+    cell, (min_lon, min_lat, max_lon, max_lat) = _cluster_grid((77.01, 28.41, 77.39, 28.79), 8)
+    
+    for edge in (min_lon, min_lat, max_lon, max_lat):
+        assert math.isclose(edge / cell, round(edge / cell))
+    assert min_lon <= 77.01 and min_lat <= 28.41 and max_lon >= 77.39 and max_lat >= 28.79
+
+def test_rejects_bbox_with_too_many_cells_for_zoom():
+    client = TestClient(app)
+    
+    response = client.get("/analytics/report-clusters", params={"bbox": "-180,-85,180,85", "zoom": 12})
+    
+    assert response.status_code == 400
+
+def test_rejects_malformed_bbox():
+    client = TestClient(app)
+    
+    response = client.get("/analytics/report-clusters", params={"bbox": "77,28", "zoom": 12})
+    
+    assert response.status_code == 400
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from main import app
+from models.report import ReportSeverity, ReportStatus
+from routes import analytics
+
+class StreamingSession:
+    """Returns canned partitions for the streamed select and keeps the statement it was given."""
+    
+    def __init__(self, partitions):
+        self._partitions = partitions
+        self.closed = False
+    
+    def execute(self, statement):
+        self.statement = statement
+        return self
+    
+    def partitions(self):
+        return iter(self._partitions)
+    
+    def close(self):
+        self.closed = True
+
+def report_row(report_id):
+    return SimpleNamespace(
+        id=report_id, title=f"Report {report_id}", status=ReportStatus.OPEN, severity=ReportSeverity.HIGH,
+        upvote_count=report_id, created_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        longitude=77.2 + report_id / 100, latitude=28.6
+    )
+
+def fetch(monkeypatch, partitions, **params):
+    session = StreamingSession(partitions)
+    monkeypatch.setattr(analytics, "SessionLocal", lambda: session)
+    response = TestClient(app).get("/analytics/reports-geojson", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/geo+json")
+    return json.loads(response.text), session
+
+@pytest.mark.parametrize("partitions", [
+    [],
+    [[report_row(1)]],
+    [[report_row(1), report_row(2)], [report_row(3)], [report_row(4), report_row(5)]],
+], ids=["no rows", "one partition", "several partitions"])
+def test_streamed_chunks_join_into_one_feature_collection(monkeypatch, partitions):
+    collection, session = fetch(monkeypatch, partitions)
+    
+    assert collection["type"] == "FeatureCollection"
+    expected = [row.id for partition in partitions for row in partition]
+    assert [feature["properties"]["id"] for feature in collection["features"]] == expected
+    for feature in collection["features"]:
+        assert feature["type"] == "Feature"
+        assert feature["geometry"]["type"] == "Point"
+        assert len(feature["geometry"]["coordinates"]) == 2
+    assert session.closed
+
+def test_bbox_and_time_filters_reach_the_query(monkeypatch):
+    _, session = fetch(
+        monkeypatch, [], bbox="77.0,28.4,77.4,28.8",
+        since="2026-10-01T00:00:00+00:00", until="2026-10-08T00:00:00+00:00", status="OPEN"
+    )
+    
+    compiled = session.statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "reports.location && ST_MakeEnvelope(" in sql
+    assert "reports.created_at >= " in sql and "reports.created_at < " in sql
+    params = compiled.params
+    assert {77.0, 28.4, 77.4, 28.8} <= set(params.values())
+    assert datetime(2026, 10, 1, tzinfo=timezone.utc) in params.values()
+    assert datetime(2026, 10, 8, tzinfo=timezone.utc) in params.values()
+    assert ReportStatus.OPEN in params.values()
+
+def test_unfiltered_query_has_no_where_clause(monkeypatch):
+    _, session = fetch(monkeypatch, [])
+    
+    assert session.statement.whereclause is None
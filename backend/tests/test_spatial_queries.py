@@ -0,0 +1,21 @@
+from sqlalchemy.dialects import postgresql
+from models.report import Report
+from gis.spatial_queries import as_geography, geography_point
+
+def compile_pg(expression) -> str:
+    return str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def test_geography_queries_match_the_expression_index():
+    # The planner only uses the index for the exact expression it was built on
+    [index] = [i for i in Report.__table__.indexes if i.name == "ix_reports_location_geography"]
+    
+    assert compile_pg(index.expressions[0]) == compile_pg(as_geography(Report.location))
+    assert compile_pg(as_geography(Report.location)) == "CAST(reports.location AS geography(GEOMETRY,4326))"
+
+def test_knn_ordering_uses_distance_operator():
+    order = as_geography(Report.location).op("<->")(geography_point(77.2, 28.6))
+    
+    assert compile_pg(order) == (
+        "CAST(reports.location AS geography(GEOMETRY,4326)) <-> "
+        "CAST(ST_SetSRID(ST_MakePoint(77.2, 28.6), 4326) AS geography(GEOMETRY,4326))"
+    )
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import io
+import pytest
+from fastapi import UploadFile
+from config import settings
+from services.object_store import LocalBackend, shard_key
+from services.storage_service import StorageService, base_object_id, object_id_from_path
+
+def make_service(tmp_path) -> StorageService:
+    return StorageService(LocalBackend(str(tmp_path)))
+
+def upload(content: bytes, filename: str = "photo.JPG") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+class RecordingSession:
+    """Stands in for a sync Session; records statements and commits in order."""
+
+    def __init__(self):
+        self.log = []
+
+    def execute(self, statement, params=None):
+        self.log.append(("execute", str(statement)))
+
+    def commit(self):
+        self.log.append(("commit", None))
+
+    def rollback(self):
+        self.log.append(("rollback", None))
+
+def stored_files(tmp_path):
+    return sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file())
+
+def test_upload_is_stored_under_its_content_hash(tmp_path):
+    service = make_service(tmp_path)
+    content = b"x" * (StorageService.CHUNK_SIZE * 3 + 17)
+    
+    path = asyncio.run(service.save_upload(upload(content), RecordingSession()))
+    
+    object_id = hashlib.sha256(content).hexdigest() + ".jpg"
+    assert path == f"objects/{object_id}"
+    assert object_id_from_path(path) == object_id
+    assert stored_files(tmp_path) == [shard_key(object_id)]
+    assert (tmp_path / shard_key(object_id)).read_bytes() == content
+
+def test_identical_content_is_not_rewritten(tmp_path):
+    service = make_service(tmp_path)
+    first = asyncio.run(service.save_upload(upload(b"same image"), RecordingSession()))
+    stored = tmp_path / shard_key(object_id_from_path(first))
+    mtime = stored.stat().st_mtime_ns
+    
+    second = asyncio.run(service.save_upload(upload(b"same image", filename="again.jpg"), RecordingSession()))
+    
+    assert first == second
+    assert stored.stat().st_mtime_ns == mtime
+    assert len(stored_files(tmp_path)) == 1
+
+def test_dedupe_hit_claims_the_object_before_reusing_it(tmp_path, monkeypatch):
+    service = make_service(tmp_path)
+    asyncio.run(service.save_upload(upload(b"same image"), RecordingSession()))
+    db = RecordingSession()
+    exists = service.backend.exists
+    monkeypatch.setattr(service.backend, "exists", lambda object_id: db.log.append(("exists", object_id)) or exists(object_id))
+    
+    asyncio.run(service.save_upload(upload(b"same image"), db))
+    
+    assert [entry[0] for entry in db.log] == ["execute", "execute", "commit", "exists"]
+    assert "pg_advisory_xact_lock" in db.log[0][1]
+    assert "ON CONFLICT (id) DO UPDATE" in db.log[1][1]
+
+def test_oversized_upload_aborts_and_leaves_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", StorageService.CHUNK_SIZE * 2)
+    service = make_service(tmp_path)
+    
+    with pytest.raises(ValueError, match="File too large"):
+        asyncio.run(service.save_upload(upload(b"x" * (StorageService.CHUNK_SIZE * 5)), RecordingSession()))
+    assert stored_files(tmp_path) == []
+
+def test_disallowed_extension_rejected(tmp_path):
+    with pytest.raises(ValueError, match="File type not allowed"):
+        asyncio.run(make_service(tmp_path).save_upload(upload(b"data", filename="script.exe"), RecordingSession()))
+
+def test_object_paths():
+    object_id = "a" * 64 + ".jpg"
+    assert object_id_from_path("uploads/report_abc.jpg") is None
+    assert object_id_from_path("objects/../../etc/passwd") is None
+    assert base_object_id(object_id + ".thumb.webp") == object_id
+    assert base_object_id(object_id) == object_id
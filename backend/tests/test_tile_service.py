@@ -0,0 +1,109 @@
+import math
+import time
+from datetime import datetime, timezone
+import pytest
+from services import report_service
+from services.duplicate_detector import RecentReportIndex
+from services.report_service import ReportService
+from services.tile_service import MAX_ZOOM, TileCache, tile_for_point
+
+def tile_bounds(z, x, y):
+    """(west, south, east, north) of a slippy-map tile."""
+    n = 2 ** z
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+@pytest.mark.parametrize("longitude, latitude", [
+    (77.2090, 28.6139),
+    (-73.9857, 40.7484),
+    (151.2093, -33.8688),
+    (0.0001, 0.0001),
+])
+def test_point_falls_inside_its_tile_at_every_zoom(longitude, latitude):
+    for z in range(MAX_ZOOM + 1):
+        x, y = tile_for_point(longitude, latitude, z)
+        west, south, east, north = tile_bounds(z, x, y)
+        assert west <= longitude < east, z
+        assert south < latitude <= north, z
+
+def test_tile_math_edges():
+    assert tile_for_point(0.0, 0.0, 0) == (0, 0)
+    assert tile_for_point(0.0, 0.0, 1) == (1, 1)
+    # The antimeridian and the poles clamp onto the last tile instead of running off the grid
+    assert tile_for_point(180.0, 89.9, 3) == (7, 0)
+    assert tile_for_point(-180.0, -89.9, 3) == (0, 7)
+
+def test_lru_evicts_least_recently_used_tile():
+    cache = TileCache(max_tiles=2, ttl_seconds=60)
+    cache.set("reports", 1, 0, 0, b"a")
+    cache.set("reports", 1, 0, 1, b"b")
+    cache.get("reports", 1, 0, 0)
+    cache.set("reports", 1, 1, 0, b"c")
+    
+    assert cache.get("reports", 1, 0, 1) is None
+    assert cache.get("reports", 1, 0, 0) == b"a"
+    assert cache.get("reports", 1, 1, 0) == b"c"
+
+def test_expired_tiles_miss():
+    cache = TileCache(max_tiles=10, ttl_seconds=0)
+    cache.set("reports", 0, 0, 0, b"a")
+    time.sleep(0.01)
+    
+    assert cache.get("reports", 0, 0, 0) is None
+
+def test_invalidate_point_drops_only_the_covering_tiles():
+    cache = TileCache(max_tiles=1000, ttl_seconds=60)
+    longitude, latitude = 77.2090, 28.6139
+    for z in range(MAX_ZOOM + 1):
+        x, y = tile_for_point(longitude, latitude, z)
+        cache.set("reports", z, x, y, b"stale")
+        cache.set("wards", z, x, y, b"wards")
+    neighbour = tile_for_point(longitude + 1.0, latitude, 8)
+    cache.set("reports", 8, *neighbour, b"neighbour")
+    
+    cache.invalidate_point("reports", longitude, latitude)
+    
+    for z in range(MAX_ZOOM + 1):
+        x, y = tile_for_point(longitude, latitude, z)
+        assert cache.get("reports", z, x, y) is None
+        assert cache.get("wards", z, x, y) == b"wards"
+    assert cache.get("reports", 8, *neighbour) == b"neighbour"
+
+def test_invalidate_layer_after_risk_rewrite_keeps_other_layers():
+    cache = TileCache(max_tiles=10, ttl_seconds=60)
+    cache.set("wards", 4, 11, 6, b"old risk")
+    cache.set("wards", 5, 22, 13, b"old risk")
+    cache.set("reports", 4, 11, 6, b"reports")
+    
+    cache.invalidate_layer("wards")
+    
+    assert cache.get("wards", 4, 11, 6) is None
+    assert cache.get("wards", 5, 22, 13) is None
+    assert cache.get("reports", 4, 11, 6) == b"reports"
+
+class CreatingSession:
+    def add(self, report):
+        self.report = report
+    
+    def commit(self):
+        pass
+    
+    def refresh(self, report):
+        report.id = 1
+        report.created_at = datetime.now(timezone.utc)
+
+def test_report_creation_invalidates_its_tiles(monkeypatch):
+    cache = TileCache(max_tiles=100, ttl_seconds=60)
+    monkeypatch.setattr(report_service, "tile_cache", cache)
+    monkeypatch.setattr(report_service, "recent_report_index", RecentReportIndex(100, 180))
+    monkeypatch.setattr(ReportService, "find_ward_id_for_location", staticmethod(lambda db, lat, lon: None))
+    x, y = tile_for_point(77.2090, 28.6139, 14)
+    cache.set("reports", 14, x, y, b"before")
+    
+    ReportService.create_report(
+        CreatingSession(), user_id=1, title="Waterlogged underpass", description="Knee-deep water",
+        latitude=28.6139, longitude=77.2090, address=None, severity="MEDIUM"
+    )
+    
+    assert cache.get("reports", 14, x, y) is None
@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import get_session
+from models.user import User, UserRole
+from routes.auth import get_current_user
+from services import report_service
+from services.counter_aggregator import CounterAggregator
+from services.report_service import ReportService
+
+class UpvoteSession(Session):
+    """Plays the upvotes table for the single-statement upvote CTEs.
+    
+    The insert/delete CTE only yields the report's counters when it changed the table, the way
+    ON CONFLICT DO NOTHING and DELETE ... RETURNING behave in Postgres.
+    """
+    
+    def __init__(self, reports=(1,), upvotes=(), upvote_count=0):
+        super().__init__()
+        self.reports = set(reports)
+        self.upvotes = set(upvotes)
+        self.upvote_count = upvote_count
+        self.statements = []
+    
+    def execute(self, statement, params=None, **kwargs):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        self.row = None
+        if "inserted" in sql or "deleted" in sql:
+            # Both CTEs bind report_id, then user_id
+            values = statement.compile(dialect=postgresql.dialect()).params
+            key = tuple(values.values())[:2]
+            if "inserted" in sql:
+                if key[0] not in self.reports:
+                    raise IntegrityError(sql, values, Exception("violates foreign key constraint"))
+                if key not in self.upvotes:
+                    self.upvotes.add(key)
+                    self.row = (self.upvote_count, 0)
+            elif key in self.upvotes:
+                self.upvotes.remove(key)
+                self.row = (self.upvote_count, 0)
+        return self
+    
+    def first(self):
+        return self.row
+    
+    def commit(self):
+        pass
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    aggregator = CounterAggregator()
+    monkeypatch.setattr(report_service, "counter_aggregator", aggregator)
+    return aggregator
+
+def test_upvote_inserts_on_conflict_do_nothing_and_counts_once(aggregator):
+    db = UpvoteSession(upvote_count=4)
+    
+    assert ReportService.add_upvote(db, 1, user_id=7) == 5
+    assert ReportService.add_upvote(db, 1, user_id=7) is None
+    
+    assert aggregator.pending(1) == (1, 0)
+    assert "ON CONFLICT ON CONSTRAINT unique_user_report_upvote DO NOTHING" in db.statements[1]
+    assert db.upvotes == {(1, 7)}
+
+def test_un_upvote_decrements_once(aggregator):
+    db = UpvoteSession(upvotes={(1, 7)}, upvote_count=4)
+    
+    assert ReportService.remove_upvote(db, 1, user_id=7) == 3
+    assert ReportService.remove_upvote(db, 1, user_id=7) is None
+    
+    assert aggregator.pending(1) == (-1, 0)
+    assert db.upvotes == set()
+
+def test_un_upvote_of_a_report_never_upvoted_changes_nothing(aggregator):
+    db = UpvoteSession(upvotes={(1, 8)}, upvote_count=1)
+    
+    assert ReportService.remove_upvote(db, 1, user_id=7) is None
+    assert aggregator.pending(1) == (0, 0)
+    assert db.upvotes == {(1, 8)}
+
+@pytest.fixture
+def client(aggregator):
+    from main import app
+    db = UpvoteSession(reports={1})
+    app.dependency_overrides[get_session] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=7, email="user7@example.com", hashed_password="x", full_name="Test User",
+        role=UserRole.CITIZEN, is_active=True
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_routes_map_upvote_outcomes_to_status_codes(client):
+    first = client.post("/reports/1/upvote")
+    assert first.status_code == 201
+    assert first.json()["upvote_count"] == 1
+    
+    assert client.post("/reports/1/upvote").status_code == 400
+    assert client.delete("/reports/1/upvote").status_code == 200
+    assert client.delete("/reports/1/upvote").status_code == 404
+
+def test_upvoting_a_missing_report_is_not_found(client):
+    response = client.post("/reports/404/upvote")
+    
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Report not found"
@@ -0,0 +1,73 @@
+import time
+from datetime import datetime, timezone
+from models.user import User, UserRole
+from services.user_cache import UserCache
+
+def make_user(user_id):
+    return User(id=user_id, email=f"user{user_id}@example.com", hashed_password="x",
+                full_name="Test User", role=UserRole.CITIZEN, is_active=True)
+
+def test_hit_returns_snapshot_and_counts():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    assert cache.get(1) is None
+    cache.set(make_user(1))
+    
+    snapshot = cache.get(1)
+    assert snapshot["email"] == "user1@example.com"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+def test_expired_entries_miss():
+    cache = UserCache(max_entries=10, ttl_seconds=0)
+    cache.set(make_user(1))
+    time.sleep(0.01)
+    assert cache.get(1) is None
+    assert cache.stats()["size"] == 0
+
+def test_lru_eviction_and_invalidation():
+    cache = UserCache(max_entries=2, ttl_seconds=60)
+    cache.set(make_user(1))
+    cache.set(make_user(2))
+    cache.get(1)
+    cache.set(make_user(3))
+    
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["invalidations"] == 1
+
+class UpdatedUsersSession:
+    """Answers the sync() query with (id, updated_at) rows, as another worker's writes left them."""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def execute(self, statement):
+        return self
+    
+    def all(self):
+        return self.rows
+
+def test_sync_drops_users_changed_by_another_process():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    cache.set(make_user(1))
+    cache.set(make_user(2))
+    changed_at = datetime.now(timezone.utc)
+    
+    assert cache.sync(UpdatedUsersSession([(1, changed_at)])) == 1
+    
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert cache.stats()["invalidations"] == 1
+
+def test_sync_keeps_snapshots_taken_after_the_change():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    changed_at = datetime.now(timezone.utc)
+    user = make_user(1)
+    user.updated_at = changed_at
+    cache.set(user)
+    
+    assert cache.sync(UpdatedUsersSession([(1, changed_at)])) == 0
+    assert cache.get(1) is not None
@@ -0,0 +1,78 @@
+import math
+import time
+from shapely import wkt
+from gis import ward_index as ward_index_module
+from gis.ward_index import WardIndex
+
+NARELA = "MULTIPOLYGON(((77.05 28.85, 77.15 28.85, 77.15 28.95, 77.05 28.95, 77.05 28.85)))"
+ROHINI = "MULTIPOLYGON(((77.05 28.70, 77.15 28.70, 77.15 28.80, 77.05 28.80, 77.05 28.70)))"
+
+def build_index(max_distance_meters: float = 500.0) -> WardIndex:
+    index = WardIndex(max_distance_meters)
+    index.build([(1, wkt.loads(NARELA)), (2, wkt.loads(ROHINI))])
+    return index
+
+def test_point_inside_ward():
+    index = build_index()
+    assert index.find_ward_id(77.10, 28.90) == 1
+    assert index.find_ward_id(77.10, 28.75) == 2
+
+def test_nearest_fallback_just_outside_boundary():
+    index = build_index()
+    assert index.find_ward_id(77.152, 28.75) == 2
+
+def test_far_point_has_no_ward():
+    index = build_index()
+    assert index.find_ward_id(77.50, 28.75) is None
+
+def test_unloaded_index_returns_none():
+    assert WardIndex(500.0).find_ward_id(77.10, 28.90) is None
+
+def test_nearest_fallback_measures_longitude_in_meters():
+    index = build_index(max_distance_meters=500.0)
+    meters_per_degree_lon = ward_index_module.METERS_PER_DEGREE * math.cos(math.radians(28.75))
+    
+    assert index.find_ward_id(77.15 + 450 / meters_per_degree_lon, 28.75) == 2
+    assert index.find_ward_id(77.15 + 550 / meters_per_degree_lon, 28.75) is None
+    assert index.find_ward_id(77.10, 28.95 + 450 / ward_index_module.METERS_PER_DEGREE) == 1
+    assert index.find_ward_id(77.10, 28.95 + 550 / ward_index_module.METERS_PER_DEGREE) is None
+
+class WardsTable:
+    """Stands in for the wards table another process may rewrite."""
+    
+    def __init__(self, wards):
+        self.wards = wards
+        self.version_checks = 0
+
+class TableBackedIndex(WardIndex):
+    def table_version(self, db):
+        db.version_checks += 1
+        return len(db.wards), tuple(ward_id for ward_id, _ in db.wards)
+    
+    def rebuild(self, db):
+        self.build(db.wards)
+        self._version = self.table_version(db)
+        self._next_check = time.monotonic() + self.check_interval_seconds
+
+def test_index_built_empty_is_rebuilt_once_wards_are_loaded():
+    index = TableBackedIndex(500.0, check_interval_seconds=0)
+    table = WardsTable([])
+    index.ensure_loaded(table)
+    assert index.find_ward_id(77.10, 28.90) is None
+    
+    table.wards = [(1, wkt.loads(NARELA))]
+    index.ensure_loaded(table)
+    
+    assert index.find_ward_id(77.10, 28.90) == 1
+
+def test_version_is_checked_at_most_once_per_interval():
+    index = TableBackedIndex(500.0, check_interval_seconds=60)
+    table = WardsTable([(1, wkt.loads(NARELA))])
+    index.ensure_loaded(table)
+    checks = table.version_checks
+    
+    table.wards = [(1, wkt.loads(NARELA)), (2, wkt.loads(ROHINI))]
+    index.ensure_loaded(table)
+    
+    assert table.version_checks == checks
+    assert index.find_ward_id(77.10, 28.75) is None
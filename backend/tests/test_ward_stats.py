@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import pytest
+from models.report import Report, ReportStatus
+from services import report_service
+from services.audit_log_writer import AuditLogWriter
+from services.duplicate_detector import RecentReportIndex
+from services.report_service import ReportService
+from services.tile_service import TileCache
+from services.ward_stats_service import RESOLVED_STATUSES, WardStatsService
+
+FIELDS = ("total_reports", "open_reports", "resolved_reports", "resolution_hours", "resolution_count")
+
+class ReportsSession:
+    """Serves update_report_status's lookup from a dict of reports."""
+    
+    def __init__(self, reports):
+        self.reports = {report.id: report for report in reports}
+    
+    def query(self, model):
+        return self
+    
+    def filter(self, criterion):
+        self.report_id = criterion.right.value
+        return self
+    
+    def first(self):
+        return self.reports.get(self.report_id)
+    
+    def commit(self):
+        pass
+    
+    def refresh(self, report):
+        pass
+
+def rebuilt(reports) -> dict:
+    """What WardStatsService.rebuild computes from the reports table."""
+    stats = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+    for report in reports:
+        ward = stats[report.ward_id]
+        ward["total_reports"] += 1
+        ward["open_reports"] += report.status == ReportStatus.OPEN
+        ward["resolved_reports"] += report.status in RESOLVED_STATUSES
+        if report.resolved_at is not None:
+            ward["resolution_hours"] += (report.resolved_at - report.created_at).total_seconds() / 3600
+            ward["resolution_count"] += 1
+    return dict(stats)
+
+@pytest.fixture
+def ledger(monkeypatch, tmp_path):
+    """Accumulates apply_delta calls per ward instead of upserting ward_stats."""
+    stats = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+    def apply_delta(db, ward_id, **delta):
+        for field, value in delta.items():
+            stats[ward_id][field] += value
+    monkeypatch.setattr(WardStatsService, "apply_delta", staticmethod(apply_delta))
+    monkeypatch.setattr(report_service, "audit_log_writer", AuditLogWriter(str(tmp_path)))
+    monkeypatch.setattr(report_service, "tile_cache", TileCache(max_tiles=10, ttl_seconds=60))
+    monkeypatch.setattr(report_service, "recent_report_index", RecentReportIndex(100, 180))
+    return stats
+
+def test_incremental_stats_match_a_rebuild_through_status_transitions(ledger):
+    created_at = datetime.now(timezone.utc) - timedelta(hours=30)
+    reports = [
+        Report(id=report_id, ward_id=ward_id, status=ReportStatus.OPEN, created_at=created_at,
+               longitude=77.2, latitude=28.6)
+        for report_id, ward_id in [(1, 10), (2, 10), (3, 10), (4, 20)]
+    ]
+    for report in reports:
+        WardStatsService.record_report_created(None, report.ward_id)
+    db = ReportsSession(reports)
+    
+    transitions = [
+        (1, ReportStatus.RESOLVED),
+        (1, ReportStatus.OPEN),
+        (1, ReportStatus.IN_PROGRESS),
+        (1, ReportStatus.RESOLVED),
+        (2, ReportStatus.IN_PROGRESS),
+        (2, ReportStatus.CLOSED),
+        (4, ReportStatus.RESOLVED),
+        (4, ReportStatus.CLOSED),
+    ]
+    for report_id, status in transitions:
+        ReportService.update_report_status(db, report_id, status, user_id=1)
+        
+        expected = rebuilt(reports)
+        assert set(ledger) == set(expected)
+        for ward_id, stats in expected.items():
+            assert ledger[ward_id] == pytest.approx(stats), (report_id, status)
+    
+    assert ledger[10]["open_reports"] == 1
+    assert ledger[10]["resolved_reports"] == 2
+    assert ledger[10]["resolution_count"] == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_bounds
+from shapely.geometry import box
+from gis.zonal_stats import ZonalStatsEngine
+
+def write_dem(path, elevation, nodata=None):
+    height, width = elevation.shape
+    with rasterio.open(
+        path, "w", driver="GTiff", height=height, width=width, count=1,
+        dtype=elevation.dtype, crs="EPSG:4326", nodata=nodata,
+        transform=from_bounds(77.0, 28.0, 78.0, 29.0, width, height),
+    ) as dst:
+        dst.write(elevation, 1)
+
+def test_per_ward_stats_in_one_pass(tmp_path):
+    elevation = np.arange(100, dtype=np.float32).reshape(10, 10)
+    write_dem(tmp_path / "dem.tif", elevation)
+    engine = ZonalStatsEngine(str(tmp_path), str(tmp_path / "cache"))
+    
+    stats = engine.compute([
+        (7, box(77.0, 28.5, 77.5, 29.0)),
+        (9, box(77.5, 28.0, 78.0, 28.5)),
+        (11, box(80.0, 10.0, 81.0, 11.0)),
+    ])
+    
+    top_left = elevation[:5, :5]
+    assert stats[7]["pixel_count"] == 25
+    assert stats[7]["elevation_mean"] == float(top_left.mean())
+    assert stats[7]["elevation_min"] == 0.0
+    assert stats[7]["elevation_max"] == 44.0
+    assert stats[7]["elevation_p50"] == float(np.percentile(top_left, 50))
+    assert stats[9]["elevation_min"] == 55.0
+    assert stats[11] is None
+    assert list((tmp_path / "cache").glob("ward_labels_*.npy"))
+
+def test_nodata_excluded(tmp_path):
+    elevation = np.full((10, 10), 200.0, dtype=np.float32)
+    elevation[0, :] = -9999.0
+    write_dem(tmp_path / "dem.tif", elevation, nodata=-9999.0)
+    engine = ZonalStatsEngine(str(tmp_path))
+    
+    stats = engine.compute([(1, box(77.0, 28.0, 78.0, 29.0))])
+    
+    assert stats[1]["pixel_count"] == 90
+    assert stats[1]["elevation_min"] == 200.0
+    assert stats[1]["slope_mean"] == 0.0
@@ -8,6 +8,7 @@ export default function ReportDetail() {
     const navigate = useNavigate();
     const [report, setReport] = useState<Report | null>(null);
     const [comments, setComments] = useState<Comment[]>([]);
+    const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
     const [newComment, setNewComment] = useState('');
     const [loading, setLoading] = useState(true);
 
@@ -32,7 +33,30 @@ export default function ReportDetail() {
     const loadComments = async () => {
         try {
             const response = await reportsAPI.getComments(Number(id));
-            setComments(response.data);
+            setComments(response.data.comments);
+            setCommentsCursor(response.data.next_cursor);
+        } catch (error) {
+            console.error('Error loading comments:', error);
+        }
+    };
+
+    const loadOlderComments = async () => {
+        if (!commentsCursor) return;
+        try {
+            const response = await reportsAPI.getComments(Number(id), { cursor: commentsCursor });
+            setComments((current) => [...current, ...response.data.comments]);
+            setCommentsCursor(response.data.next_cursor);
+        } catch (error) {
+            console.error('Error loading comments:', error);
+        }
+    };
+
+    const loadNewComments = async () => {
+        if (comments.length === 0) return loadComments();
+        try {
+            const response = await reportsAPI.getComments(Number(id), { since: comments[0].created_at, limit: 100 });
+            const seen = new Set(comments.map((comment) => comment.id));
+            setComments((current) => [...response.data.comments.filter((comment) => !seen.has(comment.id)), ...current]);
         } catch (error) {
             console.error('Error loading comments:', error);
         }
@@ -54,7 +78,7 @@ export default function ReportDetail() {
         try {
             await reportsAPI.addComment(Number(id), newComment);
             setNewComment('');
-            loadComments();
+            loadNewComments();
             loadReport();
         } catch (error: any) {
             alert(error.response?.data?.detail || 'Failed to add comment');
@@ -127,7 +151,7 @@ export default function ReportDetail() {
                     <div className="mb-6">
                         <h3 className="font-semibold mb-2">Photo:</h3>
                         <img
-                            src={`/api/${report.image_path}`}
+                            src={`/api/${report.image_medium_path ?? report.image_path}`}
                             alt="Report"
                             className="max-w-full h-auto rounded-lg"
                         />
@@ -138,7 +162,7 @@ export default function ReportDetail() {
                     <div className="mb-6">
                         <h3 className="font-semibold mb-2">Resolution Photo:</h3>
                         <img
-                            src={`/api/${report.resolution_image_path}`}
+                            src={`/api/${report.resolution_image_medium_path ?? report.resolution_image_path}`}
                             alt="Resolution"
                             className="max-w-full h-auto rounded-lg"
                         />
@@ -187,6 +211,15 @@ export default function ReportDetail() {
                     ))}
                 </div>
 
+                {commentsCursor && (
+                    <button
+                        onClick={loadOlderComments}
+                        className="mt-4 text-primary-600 hover:text-primary-700"
+                    >
+                        Load older comments
+                    </button>
+                )}
+
                 {comments.length === 0 && (
                     <p className="text-gray-500 text-center py-4">No comments yet. Be the first to comment!</p>
                 )}
@@ -57,7 +57,13 @@ export default function ReportForm() {
                 formDataToSend.append('image', image);
             }
 
-            await reportsAPI.create(formDataToSend);
+            const response = await reportsAPI.create(formDataToSend);
+            if (response.status === 200) {
+                // The server merged this into an open report nearby as an upvote
+                alert('A similar open report already exists nearby, so your report was added as an upvote to it.');
+                navigate(`/reports/${response.data.id}`);
+                return;
+            }
             navigate('/reports');
         } catch (err: any) {
             setError(err.response?.data?.detail || 'Failed to submit report');
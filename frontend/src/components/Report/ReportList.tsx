@@ -31,12 +31,17 @@ export default function ReportList() {
         severity: '',
     });
     const [page, setPage] = useState(1);
-    const [total, setTotal] = useState(0);
+    // null when the backend skipped the count (total_mode=none), and an estimate can undercount,
+    // so a full page always allows Next
+    const [total, setTotal] = useState<number | null>(null);
 
     useEffect(() => {
         loadReports();
     }, [filters, page]);
 
+    const pageCount = total === null ? null : Math.max(1, Math.ceil(total / 20));
+    const hasNextPage = reports.length === 20 || (pageCount !== null && page < pageCount);
+
     const loadReports = async () => {
         setLoading(true);
         try {
@@ -166,11 +171,11 @@ export default function ReportList() {
                             Previous
                         </button>
                         <span className="px-4 py-2">
-                            Page {page} of {Math.ceil(total / 20)}
+                            {pageCount === null ? `Page ${page}` : `Page ${page} of ${pageCount}`}
                         </span>
                         <button
                             onClick={() => setPage(page + 1)}
-                            disabled={page >= Math.ceil(total / 20)}
+                            disabled={!hasNextPage}
                             className="px-4 py-2 bg-gray-200 rounded-md disabled:opacity-50"
                         >
                             Next
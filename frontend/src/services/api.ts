@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { User, Report, Comment, Ward, WardAnalytics } from '../types';
+import { User, Report, NearbyReport, Comment, Ward, WardAnalytics } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'https://hack4delhi-zc9t.onrender.com';
 
@@ -48,20 +48,26 @@ export const reportsAPI = {
             headers: { 'Content-Type': 'multipart/form-data' },
         }),
 
-    getAll: (params?: { skip?: number; limit?: number; status?: string; ward_id?: number; severity?: string }) =>
-        api.get<{ reports: Report[]; total: number; page: number; page_size: number }>('/reports/', { params }),
+    getAll: (params?: { skip?: number; limit?: number; status?: string; ward_id?: number; severity?: string; cursor?: string; total_mode?: 'exact' | 'estimate' | 'cached' | 'none' }) =>
+        api.get<{ reports: Report[]; total: number | null; page: number | null; page_size: number; next_cursor: string | null }>('/reports/', { params }),
+
+    getNearby: (params: { latitude: number; longitude: number; limit?: number; status?: string; radius_m?: number }) =>
+        api.get<NearbyReport[]>('/reports/nearby', { params }),
 
     getById: (id: number) =>
         api.get<Report>(`/reports/${id}`),
 
     upvote: (id: number) =>
-        api.post(`/reports/${id}/upvote`),
+        api.post<{ message: string; upvote_count: number }>(`/reports/${id}/upvote`),
+
+    removeUpvote: (id: number) =>
+        api.delete<{ message: string; upvote_count: number }>(`/reports/${id}/upvote`),
 
     addComment: (id: number, content: string) =>
         api.post<Comment>(`/reports/${id}/comments`, { content }),
 
-    getComments: (id: number) =>
-        api.get<Comment[]>(`/reports/${id}/comments`),
+    getComments: (id: number, params?: { limit?: number; cursor?: string; since?: string }) =>
+        api.get<{ comments: Comment[]; next_cursor: string | null }>(`/reports/${id}/comments`, { params }),
 };
 
 export const authorityAPI = {
@@ -76,8 +82,8 @@ export const authorityAPI = {
         });
     },
 
-    getAuditLog: (id: number) =>
-        api.get(`/authority/reports/${id}/audit-log`),
+    getAuditLog: (id: number, params?: { limit?: number; cursor?: string; action?: string }) =>
+        api.get(`/authority/reports/${id}/audit-log`, { params }),
 };
 
 export const analyticsAPI = {
@@ -92,6 +98,9 @@ export const analyticsAPI = {
 
     getReportsGeoJSON: (status?: string) =>
         api.get('/analytics/reports-geojson', { params: { status } }),
+
+    getReportClusters: (bbox: [number, number, number, number], zoom: number, status?: string) =>
+        api.get('/analytics/report-clusters', { params: { bbox: bbox.join(','), zoom, status } }),
 };
 
 export default api;
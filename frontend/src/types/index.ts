@@ -22,6 +22,10 @@ export interface Report {
     assigned_agency?: 'MCD' | 'PWD' | 'NDMC' | 'DDA' | 'OTHER';
     image_path?: string;
     resolution_image_path?: string;
+    image_thumbnail_path?: string;
+    image_medium_path?: string;
+    resolution_image_thumbnail_path?: string;
+    resolution_image_medium_path?: string;
     upvote_count: number;
     comment_count: number;
     created_at: string;
@@ -29,6 +33,11 @@ export interface Report {
     resolved_at?: string;
 }
 
+export interface NearbyReport {
+    report: Report;
+    distance_m: number;
+}
+
 export interface Comment {
     id: number;
     report_id: number;